@@ -0,0 +1,58 @@
+# fidelity.py
+"""Compare calc_E_rear fidelity levels for speed and deviation.
+
+Run from the repository root:
+
+    python benchmarks/fidelity.py
+
+Uses the hourly test data in tests/data and reports the runtime of
+each fidelity level and the relative E_rear deviation of
+fidelity='shade_polygon' from the closed form, for several quadrature
+sizes.
+"""
+
+import pathlib
+import timeit
+import numpy as np
+import pandas as pd
+from bifi_outboard import outboard_sat
+
+data_file = (
+    pathlib.Path(__file__).parent.parent / 'tests' / 'data'
+    / 'bdta_aug_qc.csv')
+params = {'height': 2.0, 'offset': 1.0, 'GCR': 0.493, 'NearAlbedo': 0.2}
+pitch = 5.0
+
+
+def main():
+    bdta = pd.read_csv(data_file, index_col='Timestamp')
+    inputs = {
+        k: bdta[k]
+        for k in (
+            'AzSol', 'HSol', 'PhiAng', 'GlobHor', 'GlobGnd', 'BkVFLss'
+            , 'DifSBak', 'BmIncBk')}
+
+    def run(**kwargs) -> pd.DataFrame:
+        return outboard_sat.calc_E_rear(**params, **inputs, **kwargs)
+
+    closed = run()
+    t = min(timeit.repeat(run, number=5, repeat=5)) / 5
+    print(f'{len(bdta)} rows')
+    print(f'closed_form              {t * 1e3:9.2f} ms')
+    for n_points in (256, 1024, 4096):
+        kwargs = {
+            'fidelity': 'shade_polygon'
+            , 'pitch': pitch
+            , 'quadrature_points': n_points}
+        polygon = run(**kwargs)
+        t = min(timeit.repeat(lambda: run(**kwargs), number=1, repeat=3))
+        rel = (polygon['E_rear'] - closed['E_rear']) / closed['E_rear']
+        print(
+            f'shade_polygon n={n_points:5d}  {t * 1e3:9.2f} ms  '
+            f'rel. dev. median {np.median(rel):+.4f} '
+            f'p95 |dev| {np.quantile(np.abs(rel), 0.95):.4f} '
+            f'max |dev| {np.abs(rel).max():.4f}')
+
+
+if __name__ == '__main__':
+    main()
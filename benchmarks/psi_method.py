@@ -0,0 +1,101 @@
+# psi_method.py
+"""Compare the atan2 and arccos formulations of psi.
+
+Run from the repository root:
+
+    python benchmarks/psi_method.py
+
+Accuracy is measured against an extended precision (np.longdouble)
+evaluation of the atan2 form near phi -> 0, phi -> pi/2 and phi -> pi,
+and speed with timeit on uniformly distributed phi.
+"""
+
+import timeit
+import numpy as np
+from bifi_outboard import outboard_sat
+
+height = 2.0
+offsets = (0.5, 1.0, -100.0)
+n_timing = 1_000_000
+
+
+def psi_reference(phi_rad: np.ndarray, offset: float) -> np.ndarray:
+    phi = phi_rad.astype(np.longdouble)
+    s_phi = np.sin(phi)
+    return np.arctan2(height * s_phi, offset * s_phi + height * np.cos(phi))
+
+
+def accuracy_table() -> list[tuple]:
+    regions = {
+        'phi->0': np.geomspace(1e-9, 1e-2, 2000)
+        , 'phi->pi/2': np.pi / 2 + np.linspace(-1e-3, 1e-3, 2001)
+        , 'phi->pi': np.pi - np.geomspace(1e-9, 1e-2, 2000)}
+    rows = []
+    for offset in offsets:
+        for region, phi_rad in regions.items():
+            ref = psi_reference(phi_rad, offset)
+            for psi_method in ('arccos', 'atan2'):
+                with np.errstate(invalid='ignore'):
+                    psi = outboard_sat.calc_psi(
+                        phi_rad
+                        , height=height
+                        , offset=offset
+                        , backend='numpy'
+                        , psi_method=psi_method)
+                err = np.abs(psi - ref)
+                rows.append((
+                    offset
+                    , region
+                    , psi_method
+                    , float(np.nanmax(err))
+                    , float(np.nanmax(err / np.abs(ref)))
+                    , int(np.isnan(psi).sum())))
+    return rows
+
+
+def timing_table() -> list[tuple]:
+    rng = np.random.default_rng(0)
+    phi_rad = rng.uniform(0.0, np.pi, n_timing)
+    AzSol = rng.uniform(0.0, 360.0, n_timing)
+    HSol = rng.uniform(1.0, 80.0, n_timing)
+    ts = {
+        k: rng.uniform(0.0, 1000.0, n_timing)
+        for k in ('GlobHor', 'GlobGnd', 'BkVFLss', 'DifSBak', 'BmIncBk')}
+    rows = []
+    for psi_method in ('arccos', 'atan2'):
+        def run_psi():
+            outboard_sat.calc_psi(
+                phi_rad
+                , height=height
+                , offset=1.0
+                , backend='numpy'
+                , psi_method=psi_method)
+
+        def run_E_rear():
+            outboard_sat.calc_E_rear_ndarray(
+                height=height
+                , offset=1.0
+                , AzSol=AzSol
+                , HSol=HSol
+                , PhiAng=AzSol / 6.0 - 30.0
+                , GCR=0.493
+                , NearAlbedo=0.2
+                , columns=('psi_rad', 'W', 'E_rear')
+                , backend='numpy'
+                , psi_method=psi_method
+                , **ts)
+
+        for label, fun in (('calc_psi', run_psi), ('E_rear', run_E_rear)):
+            t = min(timeit.repeat(fun, number=5, repeat=5)) / 5
+            rows.append((label, psi_method, t * 1e3))
+    return rows
+
+
+if __name__ == '__main__':
+    print('offset  region     method  max abs err  max rel err  NaN')
+    for row in accuracy_table():
+        print('{:6.1f}  {:9s}  {:6s}  {:11.1e}  {:11.1e}  {:3d}'.format(*row))
+    print()
+    print(f'{n_timing} values, numpy backend')
+    for label, psi_method, ms in timing_table():
+        print(f'{label:8s}  {psi_method:6s}  {ms:7.1f} ms')
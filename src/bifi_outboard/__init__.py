@@ -1,5 +1,8 @@
 # __init__.py
 
 from . import pvsystcsv
+from . import pvsystcache
 from . import outboard_sat
+from . import outboard_ft
+from . import outboard_mc
 from . import captest_prototype
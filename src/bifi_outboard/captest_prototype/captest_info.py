@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass
 from typing import Callable, Any, TypeVar, TypeAlias, Optional, ClassVar, Iterator
-from collections.abc import Hashable, Iterator
+from collections.abc import Hashable, Iterable, Iterator
 import numpy as np
 import pandas as pd
 import pandas.core.groupby.generic as pdgeneric
@@ -11,6 +11,7 @@ import matplotlib.figure as mfig
 import matplotlib.pyplot as plt
 import plotnine as p9
 from ruamel.yaml import YAML, yaml_object
+from bifi_outboard import outboard_sat
 from bifi_outboard.captest_prototype import column_selection
 from bifi_outboard.captest_prototype import model_ols
 from .model import ReferenceCondition  # model prototypes
@@ -162,6 +163,43 @@ class OLSCapTestInfo:
     model_rc_spec: ModelOLSRCSpec
     computed_set_data: column_selection.QCComputedSetData
 
+    def _seek_cols(
+        self
+    ) -> tuple[set[str], set[str], set[str], set[str], set[str]]:
+        # retrieve the input and output columns from the model
+        model_cols = (
+            set(
+                self
+                .model_rc_spec
+                .reference_spec
+                .reference_variables)
+            | {self.model_rc_spec.output_col_name})
+        c_cols, c_missing_cols = (
+            self
+            .computed_set_data
+            .seek_cols(missing_cols=model_cols))
+        r_cols, r_missing_cols = (
+            self
+            .computed_set_data
+            .redundant_data
+            .seek_cols(missing_cols=c_missing_cols))
+        return model_cols, c_cols, c_missing_cols, r_cols, r_missing_cols
+
+    def input_columns(self) -> set[str]:
+        """Identify the dataset columns model_runner needs.
+
+        Follows the same resolution as model_runner: model variables are
+        satisfied by computed columns, whose inputs are satisfied by
+        redundant columns, and whatever remains must be present in the
+        input data.
+
+        Returns
+        -------
+        set[str]
+            Column names the input data must provide.
+        """
+        return self._seek_cols()[-1]
+
     def model_runner(
         self
         , gdf: Iterator[tuple[K, pd.DataFrame]]
@@ -169,6 +207,7 @@ class OLSCapTestInfo:
         , model_extractor: Callable[
             [ModelOLSRCSpec, RedundantCalcData, RedundantCalcColumnInfo], T] = me_fitconf
         , gdf_columns: Optional[set[str]] | Optional[list[str]] = None
+        , sun: Optional[outboard_sat.SunGeometry] = None
     ) -> Iterator[tuple[K, T]]:
         # handle DataFrame like it is a grouped dataframe
         _gdf: DataframeDictIterator = (
@@ -186,23 +225,8 @@ class OLSCapTestInfo:
                     "also supply the column names in gdf_columns.")
             elif not isinstance(gdf_columns, set):
                 gdf_columns = set(gdf_columns)
-        # retrieve the input and output columns from the model
-        model_cols = (
-            set(
-                self
-                .model_rc_spec
-                .reference_spec
-                .reference_variables)
-            | set(self.model_rc_spec.output_col_name))
-        c_cols, c_missing_cols = (
-            self
-            .computed_set_data
-            .seek_cols(missing_cols=model_cols))
-        r_cols, r_missing_cols = (
-            self
-            .computed_set_data
-            .redundant_data
-            .seek_cols(missing_cols=c_missing_cols))
+        model_cols, c_cols, c_missing_cols, r_cols, r_missing_cols = (
+            self._seek_cols())
         ds_cols, ds_missing_cols = column_selection.seek_dataset_cols(
             gdf_columns
             , missing_cols=r_missing_cols)
@@ -221,15 +245,28 @@ class OLSCapTestInfo:
             _qc_fun = lambda dta_key, df: df
         else:
             _qc_fun = qc_fun
+        # built once, executed per group
+        plan = self.compile_plan(rcci)
         return (
             (k, self._apply_model_extractor(
                 dta_key=k
                 , df=df
                 , qc_fun=_qc_fun
                 , model_extractor=model_extractor
-                , rcci=rcci))
+                , rcci=rcci
+                , plan=plan
+                , sun=sun))
             for k, df in _gdf)
 
+    def compile_plan(
+        self
+        , rcci: RedundantCalcColumnInfo
+    ) -> column_selection.ComputedSetPlan:
+        """Compile the redundant and computed columns for model_runner."""
+        return self.computed_set_data.compile(
+            redundant_extra_cols=sorted(rcci.r_missing_cols - rcci.r_cols)
+            , computed_extra_cols=sorted(rcci.c_missing_cols - rcci.r_cols))
+
     def _apply_model_extractor(
         self
         , dta_key: Hashable
@@ -238,15 +275,13 @@ class OLSCapTestInfo:
         , model_extractor: Callable[
             [ModelOLSRCSpec, RedundantCalcData, RedundantCalcColumnInfo], T]
         , rcci: RedundantCalcColumnInfo
+        , plan: Optional[column_selection.ComputedSetPlan] = None
+        , sun: Optional[outboard_sat.SunGeometry] = None
     ) -> T:
-        # separate out redundant values
-        qcdta_redundant = self.computed_set_data.redundant_data.combine(
-            qc_fun(dta_key, df)
-            , list(rcci.r_missing_cols - rcci.r_cols))
-        # apply computations to redundant values
-        qcdta_computed = self.computed_set_data.compute(
-            qcdta_redundant
-            , list(rcci.c_missing_cols - rcci.r_cols))
+        _plan = self.compile_plan(rcci) if plan is None else plan
+        # combine redundant values and apply computations to them
+        qcdta_redundant, qcdta_computed = _plan.execute(
+            qc_fun(dta_key, df), sun=sun)
         return model_extractor(
             self.model_rc_spec
             , RedundantCalcData(                
@@ -435,6 +470,60 @@ def full_model_extractor(
         , fit=model_obj.fit())
 
 
+def period_chunks(
+    chunks: Iterable[pd.DataFrame]
+    , period_label: str
+    , key: Hashable = True
+) -> DataframeDictIterator:
+    """Regroup time-ordered chunks so each yielded frame is whole periods.
+
+    Chunked readers split the data at arbitrary rows, so a period may
+    straddle two chunks. Rows of the last (possibly incomplete) period
+    of each chunk are held back and joined to the next chunk, so that
+    PeriodicCaptest never sees part of a period. At most one period
+    plus one chunk of rows is held in memory.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        Dataframes with a Timestamp index, in increasing time order.
+    period_label : str
+        One of the keys in ct_periods, e.g. "Monthly".
+    key : Hashable, optional
+        Key to pair with each frame, by default True (as in onegroup).
+
+    Yields
+    ------
+    tuple[Hashable, pd.DataFrame]
+        key and a dataframe holding one or more complete periods,
+        suitable as the qcdta_iterator of PeriodicCaptest.
+    """
+    offset_alias = ct_periods[period_label]['offset_alias']
+    pending: Optional[pd.DataFrame] = None
+    for chunk in chunks:
+        if 0 == len(chunk):
+            continue
+        if pending is not None:
+            if chunk.index[0] <= pending.index[-1]:
+                raise ValueError(
+                    'period_chunks: chunks must be in increasing time '
+                    f'order, got {chunk.index[0]} after '
+                    f'{pending.index[-1]}')
+            chunk = pd.concat([pending, chunk])
+        # rows in the same period as the last row may continue
+        period_number = (
+            chunk
+            .groupby(pd.Grouper(freq=offset_alias))
+            .ngroup()
+            .to_numpy())
+        complete = period_number < period_number[-1]
+        if complete.any():
+            yield key, chunk.loc[complete]
+        pending = chunk.loc[~complete]
+    if pending is not None and 0 < len(pending):
+        yield key, pending
+
+
 @dataclass
 class PeriodicCaptest():
     """Divide dataframes by periods.
@@ -2,7 +2,9 @@
 
 from dataclasses import dataclass
 #import pathlib
-from typing import Any, Callable, ClassVar, Iterable, Set, AnyStr
+from typing import Any, Callable, ClassVar, Iterable, Optional, Set, AnyStr
+import warnings
+import numpy as np
 # from numpy.typing import ArrayLike
 import pandas as pd
 # import statsmodels.api as sm
@@ -10,6 +12,7 @@ import pandas as pd
 from io import StringIO
 from ruamel.yaml import YAML, yaml_object, ScalarNode
 from bifi_outboard import outboard_sat
+from bifi_outboard import outboard_ft
 
 
 yaml = YAML(typ='safe', pure=True)
@@ -77,11 +80,13 @@ def cf_outboard_pvsyst_sat_poa(
     df: pd.DataFrame
     , computed_value_columns: dict[str, float]
     , cf_params: dict[str, float]
+    , sun: Optional[outboard_sat.SunGeometry] = None
 ) -> pd.Series:
     float_parms = {'height', 'offset', 'GCR', 'NearAlbedo'}
+    # NearAlbedo may optionally be a column (time-varying albedo)
     cv_cols = {
         'AzSol', 'HSol', 'PhiAng', 'GlobHor', 'GlobGnd'
-        , 'BkVFLss', 'DifSBak', 'BmIncBk'}
+        , 'BkVFLss', 'DifSBak', 'BmIncBk', 'NearAlbedo'}
     missing_cols = [
         cvk
         for cvk in computed_value_columns.keys()
@@ -97,9 +102,45 @@ def cf_outboard_pvsyst_sat_poa(
     dta_cols = {
         k: df[k]
         for k, v in computed_value_columns.items()}
+    if sun is not None:
+        # sun position columns are not needed when precomputed
+        dta_cols = {'AzSol': None, 'HSol': None} | dta_cols
     return outboard_sat.calc_E_rear(**{
-        **dta_cols
-        , **cf_params})['E_rear']
+        **cf_params
+        , **dta_cols
+        , 'sun': sun})['E_rear']
+
+
+def cf_outboard_pvsyst_ft_poa(
+    df: pd.DataFrame
+    , computed_value_columns: dict[str, float]
+    , cf_params: dict[str, float | str]
+) -> pd.Series:
+    ft_parms = {
+        'height', 'offset', 'tilt', 'GCR', 'NearAlbedo', 'plane_azimuth'
+        , 'end'}
+    # NearAlbedo may optionally be a column (time-varying albedo)
+    cv_cols = {
+        'AzSol', 'HSol', 'GlobHor', 'GlobGnd', 'BkVFLss', 'DifSBak'
+        , 'BmIncBk', 'NearAlbedo'}
+    missing_cols = [
+        cvk
+        for cvk in computed_value_columns.keys()
+        if cvk not in cv_cols]
+    if 0 < len(missing_cols):
+        raise ValueError(f"argument specification is missing required columns for Outboard_PVsyst_FT: {missing_cols}")
+    missing_parms = [
+            cpk
+            for cpk in cf_params.keys()
+            if cpk not in ft_parms]
+    if 0 < len(missing_parms):
+        raise ValueError(f"argument specification is missing required parameters for Outboard_PVsyst_FT: {missing_parms}")
+    dta_cols = {
+        k: df[k]
+        for k, v in computed_value_columns.items()}
+    return outboard_ft.calc_E_rear(**{
+        **cf_params
+        , **dta_cols})['E_rear']
 
 
 @yaml_object(yaml)
@@ -132,14 +173,35 @@ class SCADAComputedColumn:
                 , pd.Series]]
     ] = {
         'Linear': cf_linear
-        , 'Outboard_PVsyst_SAT_POA': cf_outboard_pvsyst_sat_poa}
+        , 'Outboard_PVsyst_SAT_POA': cf_outboard_pvsyst_sat_poa
+        , 'Outboard_PVsyst_FT_POA': cf_outboard_pvsyst_ft_poa}
+    # functions that accept precomputed sun terms as a sun argument
+    sun_functions: ClassVar[set[str]] = {'Outboard_PVsyst_SAT_POA'}
 
     computed_function: str
     computed_value_columns: dict[str, float]
     cf_params: dict[str, float]
 
 
-    def compute(self, df: pd.DataFrame) -> pd.Series:
+    def compute(
+        self
+        , df: pd.DataFrame
+        , sun: Optional[outboard_sat.SunGeometry] = None
+    ) -> pd.Series:
+        """Evaluate the computed function on df.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Input data with the computed_value_columns.
+        sun : outboard_sat.SunGeometry, optional
+            Precomputed sun terms shared by the functions in
+            sun_functions, by default None. Ignored by other functions.
+
+        Returns
+        -------
+        pd.Series
+        """
         def safe_lookup(
             computed_function: str
         ) -> Callable[
@@ -155,11 +217,120 @@ class SCADAComputedColumn:
                     'in SCADAComputedColumn.compute_functions')
             return SCADAComputedColumn.compute_functions[computed_function]
     
+        kwargs = (
+            {'sun': sun}
+            if sun is not None
+            and self.computed_function in SCADAComputedColumn.sun_functions
+            else {})
         return (
             safe_lookup(computed_function=self.computed_function)(
                 df
                 , self.computed_value_columns
-                , self.cf_params))
+                , self.cf_params
+                , **kwargs))
+
+
+@dataclass
+class LinearProjector:
+    """Evaluate many Linear computed columns as one product X @ C.
+
+    Equivalent to calling cf_linear for each column: missing values in
+    the inputs count as zero, as in the skip-NaN sum of cf_linear, and
+    an infinite input only affects the outputs it has a nonzero
+    coefficient in. Outputs that are a single input with coefficient
+    1.0 (renames) are copied by project_columns as float64 without the
+    product when that input has no missing values.
+
+    Parameters
+    ----------
+    output_columns : list[str]
+        Names of the Linear computed columns.
+    input_columns : list[str]
+        Distinct input columns, in row order of coefs.
+    coefs : np.ndarray
+        Coefficients, shape (len(input_columns), len(output_columns)).
+    renames : dict[str, str]
+        Input column of each output that is a pure rename.
+    """
+    output_columns: list[str]
+    input_columns: list[str]
+    coefs: np.ndarray
+    renames: dict[str, str]
+
+    @classmethod
+    def from_computed_columns(
+        cls
+        , computed_columns: dict[str, 'SCADAComputedColumn']
+    ) -> 'LinearProjector':
+        """Collect the Linear columns that have at least one input."""
+        linear = {
+            k: scc.computed_value_columns
+            for k, scc in computed_columns.items()
+            if 'Linear' == scc.computed_function
+            and 0 < len(scc.computed_value_columns)}
+        input_columns = list(dict.fromkeys(
+            vc for cvc in linear.values() for vc in cvc))
+        row = {c: k for k, c in enumerate(input_columns)}
+        coefs = np.zeros((len(input_columns), len(linear)))
+        for j, cvc in enumerate(linear.values()):
+            for vc, coef in cvc.items():
+                coefs[row[vc], j] = coef
+        return cls(
+            output_columns=list(linear)
+            , input_columns=input_columns
+            , coefs=coefs
+            , renames={
+                k: next(iter(cvc))
+                for k, cvc in linear.items()
+                if 1 == len(cvc) and 1.0 == next(iter(cvc.values()))})
+
+    @staticmethod
+    def _product(X: np.ndarray, coefs: np.ndarray) -> np.ndarray:
+        finite = np.isfinite(X)
+        if finite.all():
+            return X @ coefs
+        result = np.where(finite, X, 0.0) @ coefs
+        # rows with infinite inputs are summed term by term, skipping
+        # NaN terms such as inf * 0 as the skip-NaN sum of cf_linear does
+        rows = np.flatnonzero(np.isinf(X).any(axis=1))
+        if 0 < len(rows):
+            with np.errstate(invalid='ignore'):
+                result[rows] = np.nansum(
+                    X[rows, :, np.newaxis] * coefs, axis=1)
+        return result
+
+    def project_array(self, X: np.ndarray) -> np.ndarray:
+        """Evaluate all outputs from X, columns as in input_columns."""
+        return self._product(X, self.coefs)
+
+    def project_columns(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        """Evaluate all outputs from the columns of df.
+
+        Returns
+        -------
+        dict[str, pd.Series]
+            Outputs by name, as new float64 Series.
+        """
+        result: dict[str, pd.Series] = {}
+        for k, vc in self.renames.items():
+            col = df[vc]
+            if not col.isna().any():
+                result[k] = pd.Series(
+                    col.to_numpy(dtype=np.float64, copy=True)
+                    , index=df.index
+                    , name=k)
+        rest = [k for k in self.output_columns if k not in result]
+        if rest:
+            j = [self.output_columns.index(k) for k in rest]
+            # only the inputs of the remaining outputs
+            used = np.flatnonzero(self.coefs[:, j].any(axis=1))
+            values = self._product(
+                df[[self.input_columns[i] for i in used]]
+                .to_numpy(dtype=np.float64)
+                , self.coefs[np.ix_(used, j)])
+            for m, k in enumerate(rest):
+                result[k] = pd.Series(values[:, m], index=df.index, name=k)
+        return {k: result[k] for k in self.output_columns}
 
 
 def rf_median(
@@ -305,15 +476,228 @@ class QCComputedSetData:
                 for v in self.computed_columns.values()]))
         return c_cols, (missing_cols - c_cols) | cv_cols
 
-    def compute(self, df: pd.DataFrame, extra_cols: list[str]) -> pd.DataFrame:
-        ccdta = pd.DataFrame(
+    def compute(
+        self
+        , df: pd.DataFrame
+        , extra_cols: list[str]
+        , sun: Optional[outboard_sat.SunGeometry] = None
+    ) -> pd.DataFrame:
+        # all Linear columns at once; renames are not copied
+        linear = (
+            LinearProjector
+            .from_computed_columns(self.computed_columns)
+            .project_columns(df))
+        ccdta = {
+            dest_computed_col: (
+                linear[dest_computed_col]
+                if dest_computed_col in linear
+                else scc.compute(df, sun=sun))
+            for dest_computed_col, scc in self.computed_columns.items()}
+        missing_cols = list(set(extra_cols) - set(ccdta))
+        return pd.DataFrame(
             {
-                dest_computed_col: scc.compute(df)
-                for dest_computed_col, scc in self.computed_columns.items()})
-        missing_cols = list(set(extra_cols) - set(ccdta.columns.to_list()))
-        return pd.concat(
-            [ccdta, df[missing_cols]]
-            , axis=1)
+                **ccdta
+                , **{c: df[c] for c in missing_cols}}
+            , index=df.index
+            , copy=False)
+
+    def compile(
+        self
+        , redundant_extra_cols: Iterable[str]
+        , computed_extra_cols: Iterable[str]
+    ) -> 'ComputedSetPlan':
+        """Compile this specification into a ComputedSetPlan.
+
+        Parameters
+        ----------
+        redundant_extra_cols : Iterable[str]
+            extra_cols of the equivalent redundant_data.combine call.
+        computed_extra_cols : Iterable[str]
+            extra_cols of the equivalent compute call.
+
+        Returns
+        -------
+        ComputedSetPlan
+        """
+        rcs = self.redundant_data.redundant_columns
+        r_extra = list(dict.fromkeys(redundant_extra_cols))
+        c_names = list(self.computed_columns)
+        passthrough = [
+            c
+            for c in dict.fromkeys(computed_extra_cols)
+            if c not in self.computed_columns]
+        stage1_columns = list(rcs) + [c for c in r_extra if c not in rcs]
+        linear = LinearProjector.from_computed_columns(self.computed_columns)
+        missing_cols = (
+            set(passthrough) | set(linear.input_columns)) - set(stage1_columns)
+        if missing_cols:
+            raise ValueError(
+                f'Columns {sorted(missing_cols)} needed by '
+                'QCComputedSetData.compile are neither redundant columns '
+                'nor redundant_extra_cols.')
+        # only inputs of medians and of the projector are cast to float
+        linear_passthrough = [
+            c for c in linear.input_columns if c not in rcs]
+        input_columns = list(dict.fromkeys(
+            [
+                vc
+                for v in rcs.values()
+                if 'median' == v.redundant_function
+                for vc in v.redundant_value_columns]
+            + linear_passthrough))
+        input_pos = {c: k for k, c in enumerate(input_columns)}
+        stage1_sources: list[tuple[str, Any]] = []
+        for c in rcs:
+            if (
+                'median' == rcs[c].redundant_function
+                and 0 < len(rcs[c].redundant_value_columns)
+            ):
+                stage1_sources.append((
+                    'median'
+                    , [input_pos[vc] for vc in rcs[c].redundant_value_columns]))
+            else:
+                stage1_sources.append(('call', rcs[c]))
+        for c in linear_passthrough:
+            stage1_sources.append(('input', input_pos[c]))
+        float_pos = {
+            c: k
+            for k, c in enumerate(list(rcs) + linear_passthrough)}
+        return ComputedSetPlan(
+            input_columns=input_columns
+            , stage1_columns=stage1_columns
+            , computed_columns=c_names
+            , computed_passthrough=passthrough
+            , stage1_sources=stage1_sources
+            , n_redundant=len(rcs)
+            , linear=linear
+            , linear_positions=np.array(
+                [c_names.index(c) for c in linear.output_columns]
+                , dtype=np.intp)
+            , linear_inputs=np.array(
+                [float_pos[c] for c in linear.input_columns]
+                , dtype=np.intp)
+            , other_computed=[
+                (j, scc)
+                for j, (c, scc) in enumerate(self.computed_columns.items())
+                if c not in set(linear.output_columns)])
+
+
+@dataclass
+class ComputedSetPlan:
+    """Compiled evaluation of a QCComputedSetData and its redundant set.
+
+    Built once by QCComputedSetData.compile and executed per group. The
+    distinct inputs of median redundant columns and of Linear computed
+    columns are copied once into a float64 array, and the redundant and
+    computed columns are written into one preallocated float64 array
+    that the result frames view. Pass-through columns are taken from
+    the input frame with their own dtypes, as in the uncompiled path.
+
+    The output array holds the computed columns, then one float column
+    per stage-one source: the redundant columns, then pass-through
+    inputs of Linear computed columns. Median redundant columns use
+    np.nanmedian and Linear computed columns are evaluated together
+    by a LinearProjector; other functions are called with the input
+    frame (redundant) or the stage-one frame (computed).
+
+    Parameters
+    ----------
+    input_columns : list[str]
+        Distinct columns read from the input frame as float64.
+    stage1_columns : list[str]
+        Names of the stage-one columns (redundant columns, then
+        pass-through inputs), in output order.
+    computed_columns : list[str]
+        Names of the computed columns, in output order.
+    computed_passthrough : list[str]
+        Stage-one columns following the computed columns in the
+        computed frame.
+    stage1_sources : list[tuple[str, Any]]
+        Per float stage-one column: ('median', input positions),
+        ('call', SCADARedundantColumn) or ('input', input position).
+    n_redundant : int
+        Number of leading stage-one columns that are redundant columns.
+    linear : LinearProjector
+        Linear computed columns.
+    linear_positions : np.ndarray
+        Positions of linear.output_columns.
+    linear_inputs : np.ndarray
+        Float stage-one positions of linear.input_columns.
+    other_computed : list[tuple[int, SCADAComputedColumn]]
+        Non-linear computed columns and their positions.
+    """
+    input_columns: list[str]
+    stage1_columns: list[str]
+    computed_columns: list[str]
+    computed_passthrough: list[str]
+    stage1_sources: list[tuple[str, Any]]
+    n_redundant: int
+    linear: LinearProjector
+    linear_positions: np.ndarray
+    linear_inputs: np.ndarray
+    other_computed: list[tuple[int, 'SCADAComputedColumn']]
+
+    def execute(
+        self
+        , df: pd.DataFrame
+        , sun: Optional[outboard_sat.SunGeometry] = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Evaluate the plan for one group of rows.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Input data with at least the columns of the specification.
+        sun : outboard_sat.SunGeometry, optional
+            Precomputed sun terms for the computed columns, by default
+            None. See SCADAComputedColumn.compute.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, pd.DataFrame]
+            Results of QCRedundantSetData.combine and of
+            QCComputedSetData.compute (columns in plan order). Redundant
+            and computed columns are float64 views of one array;
+            pass-through columns keep the dtypes of df.
+        """
+        n_c = len(self.computed_columns)
+        X = df[self.input_columns].to_numpy(dtype=np.float64)
+        out = np.empty((len(df), n_c + len(self.stage1_sources)))
+        stage1 = out[:, n_c:]
+        for j, (kind, source) in enumerate(self.stage1_sources):
+            if 'input' == kind:
+                stage1[:, j] = X[:, source]
+            elif 'median' == kind:
+                if 1 == len(source):
+                    stage1[:, j] = X[:, source[0]]
+                else:
+                    with warnings.catch_warnings():
+                        # all-NaN rows give NaN, as DataFrame.median
+                        warnings.simplefilter('ignore', RuntimeWarning)
+                        stage1[:, j] = np.nanmedian(X[:, source], axis=1)
+            else:
+                stage1[:, j] = source.combine(df)
+        stage1_df = pd.DataFrame(
+            stage1[:, :self.n_redundant]
+            , columns=self.stage1_columns[:self.n_redundant]
+            , index=df.index
+            , copy=False)
+        # added as separate blocks, so the float columns stay views
+        for c in self.stage1_columns[self.n_redundant:]:
+            stage1_df[c] = df[c].array
+        if 0 < len(self.linear_positions):
+            out[:, self.linear_positions] = self.linear.project_array(
+                stage1[:, self.linear_inputs])
+        for j, scc in self.other_computed:
+            out[:, j] = scc.compute(stage1_df, sun=sun)
+        qcdta_computed = pd.DataFrame(
+            out[:, :n_c]
+            , columns=self.computed_columns
+            , index=df.index
+            , copy=False)
+        for c in self.computed_passthrough:
+            qcdta_computed[c] = stage1_df[c].array
+        return stage1_df, qcdta_computed
 
 
 def seek_dataset_cols(
@@ -1,8 +1,40 @@
 # io.py
 """Input/output routines."""
 
-from typing import Optional
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+import functools
+import multiprocessing
+import os
+import pathlib
+from typing import Callable, Iterable, Iterator, Optional
 import pandas as pd
+from .. import pvsystcsv
+
+
+RunInfoKey = tuple[str, str]  # (PRJ, Variant)
+
+# sheets of the inventory workbook and the columns that index them
+inventory_sheet_index = {
+    'PVsyst Runs': ['prj_file', 'variant']
+    , 'Systems': 'SystemLabel'
+    , 'Sites': 'SiteLabel'}
+
+# types of the run columns used to read and interpret simulations
+run_info_dtypes = {
+    'VCn': 'int64'
+    , 'bifi_sim': 'bool'
+    , 'NearAlbedo': 'float64'
+    , 'Bifaciality': 'float64'
+    , 'Height': 'float64'
+    , 'dayfirst': 'bool'
+    , 'StrucShd': 'float64'
+    , 'BakMismatch': 'float64'}
+
+# values of blank run cells, matching the defaults of pvsystcsv.read_pvsyst
+run_info_fill = {
+    'dayfirst': False}
 
 
 def read_pvsyst_hourly(
@@ -10,13 +42,225 @@ def read_pvsyst_hourly(
     , sep: str = ';'
     , dayfirst: bool = True
     , date_format: Optional[str] = None
+    , usecols: Optional[Iterable[str]] = None
+    , cache=None
 ) -> pd.DataFrame:
-    return pd.read_csv(
+    return pvsystcsv.read_pvsyst(
         con
+        , sep=sep
+        , dayfirst=dayfirst
         , encoding='windows-1252'
-        , skiprows=list(range(10))+[11, 12]
+        , date_format=date_format
+        , usecols=usecols
+        , cache=cache)[0]
+
+
+def read_run_infos(fname: str | os.PathLike) -> pd.DataFrame:
+    """Read the simulation run information from an inventory workbook.
+
+    Parameters
+    ----------
+    fname : str or pathlib.Path
+        Workbook with the sheets in inventory_sheet_index, such as
+        data/Inventory.xlsx.
+
+    Returns
+    -------
+    pd.DataFrame
+        'PVsyst Runs' rows indexed by (prj_file, variant), joined with
+        their 'Systems' and 'Sites' rows. Blank cells of the columns in
+        run_info_fill take those values, columns in run_info_dtypes
+        have those types and a missing date_format is None.
+    """
+    shts = pd.read_excel(
+        fname
+        , sheet_name=list(inventory_sheet_index)
+        , header=0)
+    shts = {
+        name: sht.set_index(inventory_sheet_index[name])
+        for name, sht in shts.items()}
+    runs = shts['PVsyst Runs']
+    if not runs.index.is_unique:
+        raise ValueError(
+            'Duplicate (prj_file, variant) rows in read_run_infos: '
+            f'{runs.index[runs.index.duplicated()].to_list()}')
+    # before the casts: a blank cell would otherwise become True
+    runs = runs.fillna(
+        {k: v for k, v in run_info_fill.items() if k in runs.columns})
+    runs = runs.astype(
+        {k: v for k, v in run_info_dtypes.items() if k in runs.columns})
+    runs['date_format'] = (
+        runs['date_format']
+        .astype(object)
+        .where(runs['date_format'].notna(), None))
+    return (
+        runs
+        .join(other=shts['Systems'], how='left', on='SystemLabel')
+        .join(other=shts['Sites'], how='left', on='SiteLabel'))
+
+
+def run_info_csv_path(
+    run_info: pd.Series
+    , data_dir: str | os.PathLike
+) -> pathlib.Path:
+    """Locate the hourly results file of a run.
+
+    Parameters
+    ----------
+    run_info : pd.Series
+        Row of read_run_infos. Csvfile is relative to data_dir, with
+        backslash separators.
+    data_dir : str or pathlib.Path
+        Directory Csvfile is relative to.
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return pathlib.Path(data_dir).joinpath(*run_info['Csvfile'].split('\\'))
+
+
+def _read_run(
+    fname: str | os.PathLike
+    , sep: str
+    , dayfirst: bool
+    , date_format: Optional[str]
+    , usecols: Optional[list[str]]
+    , cache
+) -> pd.DataFrame:
+    """Read one hourly results file (runs in worker processes)."""
+    return pvsystcsv.read_pvsyst(
+        fname
         , sep=sep
-        , parse_dates=True
         , dayfirst=dayfirst
-        , index_col=0
-        , date_format=date_format)
+        , encoding='windows-1252'
+        , date_format=date_format
+        , usecols=usecols
+        , cache=cache)[0]
+
+
+class LazySimData(Mapping):
+    """Simulation results keyed by run, materialized when first used.
+
+    Values are supplied as futures (loads already running elsewhere) or
+    as callables (loads deferred until the key is accessed).
+    """
+
+    def __init__(
+        self
+        , sources: dict[RunInfoKey, Future | Callable[[], pd.DataFrame]]
+    ):
+        self._sources = sources
+        self._data: dict[RunInfoKey, pd.DataFrame] = {}
+
+    def __getitem__(self, key: RunInfoKey) -> pd.DataFrame:
+        if key not in self._data:
+            source = self._sources[key]
+            self._data[key] = (
+                source.result()
+                if isinstance(source, Future)
+                else source())
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[RunInfoKey]:
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def is_loaded(self, key: RunInfoKey) -> bool:
+        """Whether the value of key is available without waiting."""
+        if key in self._data:
+            return True
+        source = self._sources[key]
+        return isinstance(source, Future) and source.done()
+
+
+@dataclass
+class Inventory:
+    """Simulation run information and the corresponding results.
+
+    Parameters
+    ----------
+    run_infos : pd.DataFrame
+        Result of read_run_infos.
+    sim_data : LazySimData
+        Hourly results keyed like run_infos.
+    """
+    run_infos: pd.DataFrame
+    sim_data: LazySimData
+
+    def run_info(self, key: RunInfoKey) -> pd.Series:
+        """Look up the run information of one (PRJ, Variant)."""
+        return self.run_infos.loc[key, :]  # type: ignore
+
+
+def load_inventory(
+    fname: str | os.PathLike
+    , data_dir: Optional[str | os.PathLike] = None
+    , usecols: Optional[
+        Iterable[str] | dict[RunInfoKey, Iterable[str]]] = None
+    , max_workers: Optional[int] = None
+    , cache=None
+) -> Inventory:
+    """Load an inventory workbook and all simulations it lists.
+
+    Each hourly results file is read with the sep, dayfirst and
+    date_format of its row. The reads are submitted to a process pool
+    at once, and each result is retrieved when its key is first used.
+
+    Parameters
+    ----------
+    fname : str or pathlib.Path
+        Inventory workbook, see read_run_infos.
+    data_dir : str or pathlib.Path, optional
+        Directory the Csvfile paths are relative to, by default the
+        directory of fname.
+    usecols : Iterable[str] or dict, optional
+        Value columns to read from every file, or per (PRJ, Variant)
+        (e.g. from sim_study.plan_usecols). By default None (all).
+    max_workers : int, optional
+        Worker processes, by default None (the ProcessPoolExecutor
+        default). 1 reads each file in the calling process when its
+        key is first used. Workers are started with the 'spawn' method.
+    cache : pvsystcache.PVsystCache, optional
+        Cache of parsed files, by default None.
+
+    Returns
+    -------
+    Inventory
+    """
+    run_infos = read_run_infos(fname)
+    _data_dir = (
+        pathlib.Path(fname).parent
+        if data_dir is None
+        else data_dir)
+    reads = {}
+    for key, run_info in run_infos.iterrows():
+        _usecols = (
+            usecols.get(key)
+            if isinstance(usecols, dict)
+            else usecols)
+        reads[key] = functools.partial(
+            _read_run
+            , run_info_csv_path(run_info, _data_dir)
+            , sep=run_info['sep']
+            , dayfirst=run_info['dayfirst']
+            , date_format=run_info['date_format']
+            , usecols=None if _usecols is None else list(_usecols)
+            , cache=cache)
+    if 1 == max_workers:
+        return Inventory(run_infos=run_infos, sim_data=LazySimData(reads))
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers
+        # the cache reads and writes with pyarrow, whose thread pools
+        # are not safe to fork once the caller has used them
+        , mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {
+            key: executor.submit(read.func, *read.args, **read.keywords)
+            for key, read in reads.items()}
+    finally:
+        # submitted reads still complete; workers exit afterwards
+        executor.shutdown(wait=False)
+    return Inventory(run_infos=run_infos, sim_data=LazySimData(futures))
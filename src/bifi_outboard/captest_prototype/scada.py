@@ -0,0 +1,254 @@
+# scada.py
+"""Chunked input of SCADA exports.
+
+Field data exports hold one-minute values from dozens of redundant
+sensors and inverters and are often too large to load at once. The
+readers here stream an export in chunks of rows, keeping only the
+columns a capacity test specification refers to, with explicit float
+dtypes, and yield frames indexed by time in increasing order.
+read_scada_periods regroups the chunks into whole periods with
+captest_info.period_chunks, ready for PeriodicCaptest or
+OLSCapTestInfo.model_runner.
+"""
+
+import os
+import pathlib
+from typing import Iterable, Iterator, Optional
+import pandas as pd
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+from . import captest_info
+from . import column_selection
+
+
+scada_dtypes = ('float32', 'float64')
+
+# file name suffixes of the supported export formats
+scada_formats = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+
+def spec_columns(
+    spec: (
+        captest_info.OLSCapTestInfo
+        | column_selection.QCComputedSetData
+        | column_selection.QCRedundantSetData)
+) -> list[str]:
+    """Identify the SCADA columns a specification reads.
+
+    Parameters
+    ----------
+    spec : OLSCapTestInfo, QCComputedSetData or QCRedundantSetData
+        For a test info, all input columns of model_runner; otherwise
+        the redundant_value_columns of every redundant column.
+
+    Returns
+    -------
+    list[str]
+        Sorted column names.
+    """
+    if isinstance(spec, captest_info.OLSCapTestInfo):
+        return sorted(spec.input_columns())
+    if isinstance(spec, column_selection.QCComputedSetData):
+        spec = spec.redundant_data
+    return sorted(
+        set()
+        .union(*[
+            set(v.redundant_value_columns)
+            for v in spec.redundant_columns.values()]))
+
+
+def _scada_format(
+    source: str | os.PathLike
+    , file_format: Optional[str]
+) -> str:
+    if file_format is not None:
+        if file_format not in set(scada_formats.values()):
+            raise ValueError(
+                f'Unknown file_format "{file_format}" in read_scada_chunks, '
+                f'expected one of {sorted(set(scada_formats.values()))}')
+        return file_format
+    suffix = pathlib.Path(source).suffix.lower()
+    if suffix not in scada_formats:
+        raise ValueError(
+            f'Cannot infer the format of "{source}" in read_scada_chunks, '
+            'pass file_format')
+    return scada_formats[suffix]
+
+
+def _check_columns(
+    available: Iterable[str]
+    , wanted: list[str]
+):
+    missing_cols = set(wanted) - set(available)
+    if missing_cols:
+        raise ValueError(
+            f'Columns {sorted(missing_cols)} requested in '
+            'read_scada_chunks are not in the file.')
+
+
+def _csv_chunks(
+    source: str | os.PathLike
+    , time_column: str
+    , value_cols: list[str]
+    , dtype: dict[str, str]
+    , chunk_rows: int
+    , sep: str
+    , encoding: Optional[str]
+) -> Iterator[pd.DataFrame]:
+    header = pd.read_csv(source, sep=sep, encoding=encoding, nrows=0)
+    _check_columns(header.columns, [time_column] + value_cols)
+    yield from pd.read_csv(
+        source
+        , sep=sep
+        , encoding=encoding
+        , usecols=[time_column] + value_cols
+        , dtype={time_column: 'str', **dtype}
+        , chunksize=chunk_rows)
+
+
+def _parquet_chunks(
+    source: str | os.PathLike
+    , time_column: str
+    , value_cols: list[str]
+    , chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    if pyarrow is None:
+        raise ImportError(
+            'read_scada_chunks requires the pyarrow package for Parquet.')
+    pf = pyarrow.parquet.ParquetFile(source)
+    _check_columns(pf.schema_arrow.names, [time_column] + value_cols)
+    for batch in pf.iter_batches(
+        batch_size=chunk_rows
+        , columns=[time_column] + value_cols
+    ):
+        # the time column stays a column even if it was a pandas index
+        yield batch.to_pandas(ignore_metadata=True)
+
+
+def read_scada_chunks(
+    source: str | os.PathLike
+    , columns: Iterable[str]
+    , time_column: str = 'Timestamp'
+    , dtype: str | dict[str, str] = 'float32'
+    , chunk_rows: int = 100_000
+    , time_format: Optional[str] = None
+    , file_format: Optional[str] = None
+    , sep: str = ','
+    , encoding: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """Stream selected columns of a SCADA export in time order.
+
+    Rows within a chunk are sorted by time if needed. Chunks cannot be
+    reordered without reading the whole file, so a chunk starting at or
+    before the end of the previous chunk raises ValueError.
+
+    Parameters
+    ----------
+    source : str or pathlib.Path
+        CSV or Parquet export with one row per timestamp.
+    columns : Iterable[str]
+        Value columns to read, e.g. from spec_columns. Other columns
+        are not parsed.
+    time_column : str, optional
+        Name of the timestamp column, by default 'Timestamp'.
+    dtype : str or dict[str, str], optional
+        One of scada_dtypes for all columns, or per column (others are
+        float32). By default 'float32'.
+    chunk_rows : int, optional
+        Rows per chunk, by default 100,000.
+    time_format : str, optional
+        Format of text timestamps, by default None (inferred).
+    file_format : str, optional
+        'csv' or 'parquet', by default None (from the file suffix).
+    sep : str, optional
+        CSV separator, by default ','.
+    encoding : str, optional
+        CSV text encoding, by default None (pandas default).
+
+    Yields
+    ------
+    pd.DataFrame
+        Chunks indexed by time_column with the requested columns in the
+        order given and the requested dtypes.
+    """
+    value_cols = list(dict.fromkeys(columns))
+    _dtype = (
+        {name: dtype for name in value_cols}
+        if isinstance(dtype, str)
+        else {name: dtype.get(name, 'float32') for name in value_cols})
+    bad_dtypes = {k: v for k, v in _dtype.items() if v not in scada_dtypes}
+    if bad_dtypes:
+        raise ValueError(
+            f'Unsupported dtypes {bad_dtypes} in read_scada_chunks, '
+            f'expected one of {scada_dtypes}')
+    if 'csv' == _scada_format(source, file_format):
+        chunks = _csv_chunks(
+            source
+            , time_column=time_column
+            , value_cols=value_cols
+            , dtype=_dtype
+            , chunk_rows=chunk_rows
+            , sep=sep
+            , encoding=encoding)
+    else:
+        chunks = _parquet_chunks(
+            source
+            , time_column=time_column
+            , value_cols=value_cols
+            , chunk_rows=chunk_rows)
+    last: Optional[pd.Timestamp] = None
+    for chunk in chunks:
+        times = chunk.pop(time_column)
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            times = pd.to_datetime(times, format=time_format)
+        chunk.index = pd.DatetimeIndex(times, name=time_column)
+        chunk = chunk.astype(_dtype, copy=False)[value_cols]
+        if 0 == len(chunk):
+            continue
+        if not chunk.index.is_monotonic_increasing:
+            chunk = chunk.sort_index(kind='stable')
+        if last is not None and chunk.index[0] <= last:
+            raise ValueError(
+                'read_scada_chunks: rows are not in increasing time order '
+                f'across chunks, got {chunk.index[0]} after {last}')
+        last = chunk.index[-1]
+        yield chunk
+
+
+def read_scada_periods(
+    source: str | os.PathLike
+    , spec: (
+        captest_info.OLSCapTestInfo
+        | column_selection.QCComputedSetData
+        | column_selection.QCRedundantSetData)
+    , period_label: str
+    , key=True
+    , **kwargs
+) -> captest_info.DataframeDictIterator:
+    """Stream the columns of a specification as whole periods.
+
+    Parameters
+    ----------
+    source : str or pathlib.Path
+        Export, see read_scada_chunks.
+    spec : OLSCapTestInfo, QCComputedSetData or QCRedundantSetData
+        Specification selecting the columns, see spec_columns.
+    period_label : str
+        One of the keys in captest_info.ct_periods, e.g. "Monthly".
+    key : Hashable, optional
+        Key to pair with each frame, by default True.
+    **kwargs
+        Passed to read_scada_chunks.
+
+    Yields
+    ------
+    tuple[Hashable, pd.DataFrame]
+        Suitable as the qcdta_iterator of PeriodicCaptest.
+    """
+    return captest_info.period_chunks(
+        read_scada_chunks(source, columns=spec_columns(spec), **kwargs)
+        , period_label=period_label
+        , key=key)
@@ -1,9 +1,10 @@
 # sim_study.py
 
 
-from typing import Optional, Iterator, Any, Callable, TypeAlias \
-    , TypeVar, Hashable
+from typing import Optional, Iterable, Iterator, Any, Callable \
+    , TypeAlias, TypeVar, Hashable
 from dataclasses import dataclass
+import warnings
 import numpy as np
 import pandas as pd
 import statsmodels.formula.api as smf
@@ -11,6 +12,7 @@ from . import captest_info
 from . import column_selection
 from . import model
 from .. import outboard_sat
+from .. import outboard_ft
 
 T = TypeVar('T')  # generator value type
 
@@ -222,59 +224,509 @@ e_rear_info_map = {
     , 'NearAlbedo': 'NearAlbedo'}
 
 
+# parameters taken from the timeseries instead of e_rear_info_map when
+# the mapped column is present (e.g. seasonal albedo)
+e_rear_ts_param_map = {
+    'NearAlbedo': 'NearAlbedo'}
+
+
+def missing_run_geometry(
+    infodta: pd.Series
+    , infomap: dict[str, str]
+    , tsdta_columns: Iterable[str] = ()
+    , tsparammap: Optional[dict[str, str]] = None
+) -> list[str]:
+    """Identify run information needed to simulate the sensor but blank.
+
+    Parameters
+    ----------
+    infodta : pd.Series
+        Simulation run information.
+    infomap : dict[str, str]
+        Parameter names mapped to infodta entries, e.g. e_rear_info_map.
+    tsdta_columns : Iterable[str], optional
+        Columns of the simulation timeseries. Parameters mapped to one
+        of them by tsparammap are not needed from infodta.
+    tsparammap : dict[str, str], optional
+        By default e_rear_ts_param_map.
+
+    Returns
+    -------
+    list[str]
+        infodta entries without a value, in infomap order.
+    """
+    _tsparammap = e_rear_ts_param_map if tsparammap is None else tsparammap
+    from_ts = {
+        k
+        for k, v in _tsparammap.items()
+        if v in set(tsdta_columns)}
+    return [
+        v
+        for k, v in infomap.items()
+        if k not in from_ts
+        and pd.api.types.is_scalar(infodta[v])
+        and pd.isna(infodta[v])]
+
+
+def _check_run_geometry(
+    caller: str
+    , infodta: pd.Series
+    , infomap: dict[str, str]
+    , tsdta: pd.DataFrame
+    , tsparammap: dict[str, str]
+) -> None:
+    """Reject runs missing a value needed to simulate the sensor."""
+    missing = missing_run_geometry(
+        infodta, infomap, tsdta.columns, tsparammap)
+    if missing:
+        raise ValueError(
+            f'{caller}: run {infodta.name!r} (SystemLabel '
+            f'"{infodta.get("SystemLabel")}") has no value for {missing}')
+
+
 def calc_E_rear_from_info(
     tsdta: pd.DataFrame
     , infodta: pd.Series
     , offset: float
     , tsmap: Optional[dict[str, str]] = None
     , infomap: Optional[dict[str, str]] = None
+    , sun: Optional[outboard_sat.SunGeometry] = None
+    , skip_night: bool = False
+    , tsparammap: Optional[dict[str, str]] = None
 ) -> pd.Series:
     _tsmap = e_rear_ts_map if tsmap is None else tsmap
     _infomap = e_rear_info_map if infomap is None else infomap
+    _tsparammap = e_rear_ts_param_map if tsparammap is None else tsparammap
+    kwargs_ts = {
+        k: tsdta[v]
+        for k, v in _tsmap.items()}
+    kwargs_info = {
+        k: infodta[v]
+        for k, v in _infomap.items()}
+    kwargs_ts_param = {
+        k: tsdta[v]
+        for k, v in _tsparammap.items()
+        if v in tsdta.columns}
+    _check_run_geometry(
+        'calc_E_rear_from_info', infodta, _infomap, tsdta, _tsparammap)
+    kwargs = kwargs_ts | kwargs_info | kwargs_ts_param
+    result = outboard_sat.calc_E_rear(
+        offset=offset
+        , sun=sun
+        , skip_night=skip_night
+        , **kwargs)['E_rear'] # type: ignore
+    return result
+
+
+e_rear_ft_ts_map = {
+    k: v
+    for k, v in e_rear_ts_map.items()
+    if 'PhiAng' != k}
+
+
+e_rear_ft_info_map = e_rear_info_map | {
+    'tilt': 'Tilt'
+    , 'plane_azimuth': 'Azimuth'}
+
+
+def plane_azimuth_mismatch(
+    tsdta: pd.DataFrame
+    , plane_azimuth: float
+    , tsmap: Optional[dict[str, str]] = None
+) -> float:
+    """Compare a plane azimuth with the profile angles PVsyst reports.
+
+    The profile angle of a fixed plane is
+    atan2(tan(HSol), cos(AzSol - plane_azimuth)), so the AngProf column
+    of a run identifies the azimuth the run was simulated with.
+
+    Parameters
+    ----------
+    tsdta : pd.DataFrame
+        Simulation timeseries with AngProf and the sun position.
+    plane_azimuth : float
+        Azimuth of the plane, PVsyst convention (deg).
+    tsmap : dict[str, str], optional
+        Column map for AzSol and HSol, by default e_rear_ft_ts_map.
+
+    Returns
+    -------
+    float
+        Median absolute difference between AngProf and the profile angle
+        of plane_azimuth with the sun up (deg), NaN if there is no such
+        row.
+    """
+    _tsmap = e_rear_ft_ts_map if tsmap is None else tsmap
+    AzSol = np.radians(tsdta[_tsmap['AzSol']].to_numpy(dtype=float))
+    HSol = np.radians(tsdta[_tsmap['HSol']].to_numpy(dtype=float))
+    day = HSol > 0
+    AngProf = np.degrees(np.arctan2(
+        np.tan(HSol[day])
+        , np.cos(AzSol[day] - np.radians(plane_azimuth))))
+    diff = np.abs(tsdta['AngProf'].to_numpy(dtype=float)[day] - AngProf)
+    if not np.isfinite(diff).any():
+        return np.nan
+    return float(np.nanmedian(diff))
+
+
+def _check_plane_azimuth(
+    caller: str
+    , infodta: pd.Series
+    , plane_azimuth: float
+    , tsdta: pd.DataFrame
+    , tsmap: dict[str, str]
+    , tolerance: float = 1.0
+) -> None:
+    """Reject runs whose profile angles contradict the plane azimuth."""
+    if 'AngProf' not in tsdta.columns:
+        warnings.warn(
+            f'{caller}: run {infodta.name!r} has no AngProf, cannot check '
+            f'plane azimuth {plane_azimuth}')
+        return
+    mismatch = plane_azimuth_mismatch(tsdta, plane_azimuth, tsmap)
+    if mismatch > tolerance:
+        raise ValueError(
+            f'{caller}: run {infodta.name!r} AngProf differs from the '
+            f'profile angle for Azimuth {plane_azimuth} of SystemLabel '
+            f'"{infodta.get("SystemLabel")}" by {mismatch:.1f} deg, the '
+            'run was simulated with a different plane azimuth')
+
+
+def calc_E_rear_ft_from_info(
+    tsdta: pd.DataFrame
+    , infodta: pd.Series
+    , offset: float
+    , end: str = 'east'
+    , tsmap: Optional[dict[str, str]] = None
+    , infomap: Optional[dict[str, str]] = None
+    , skip_night: bool = False
+    , tsparammap: Optional[dict[str, str]] = None
+) -> pd.Series:
+    """Simulate a fixed-tilt outboard sensor, see outboard_ft.calc_E_rear.
+
+    Parameters
+    ----------
+    tsdta : pd.DataFrame
+        Simulation timeseries.
+    infodta : pd.Series
+        Simulation run information (PVsyst Runs joined with Systems).
+    offset : float
+        Horizontal distance from the row end to the sensor (m).
+    end : str, optional
+        Row end the sensor is beyond, by default 'east'.
+    tsmap, infomap, tsparammap : dict[str, str], optional
+        Column maps as in calc_E_rear_from_info, by default
+        e_rear_ft_ts_map, e_rear_ft_info_map and e_rear_ts_param_map.
+    skip_night : bool, optional
+        Passed to outboard_ft.calc_E_rear, by default False.
+
+    Returns
+    -------
+    pd.Series
+        E_rear at the outboard sensor (W/m2).
+
+    Raises
+    ------
+    ValueError
+        If infodta has no value for a mapped parameter, e.g. a missing
+        Height in the inventory, or if the AngProf column of tsdta does
+        not match the plane azimuth (e.g. a variant simulated at another
+        azimuth than its Systems row).
+    """
+    _tsmap = e_rear_ft_ts_map if tsmap is None else tsmap
+    _infomap = e_rear_ft_info_map if infomap is None else infomap
+    _tsparammap = e_rear_ts_param_map if tsparammap is None else tsparammap
     kwargs_ts = {
         k: tsdta[v]
         for k, v in _tsmap.items()}
     kwargs_info = {
         k: infodta[v]
         for k, v in _infomap.items()}
-    kwargs = kwargs_ts | kwargs_info
-    result = outboard_sat.calc_E_rear(offset=offset, **kwargs)['E_rear'] # type: ignore
+    kwargs_ts_param = {
+        k: tsdta[v]
+        for k, v in _tsparammap.items()
+        if v in tsdta.columns}
+    _check_run_geometry(
+        'calc_E_rear_ft_from_info', infodta, _infomap, tsdta, _tsparammap)
+    _check_plane_azimuth(
+        'calc_E_rear_ft_from_info'
+        , infodta
+        , kwargs_info['plane_azimuth']
+        , tsdta
+        , _tsmap)
+    kwargs = kwargs_ts | kwargs_info | kwargs_ts_param
+    return outboard_ft.calc_E_rear(
+        offset=offset
+        , end=end
+        , skip_night=skip_night
+        , **kwargs)['E_rear']
+
+
+def calc_E_rear_sensors_from_info(
+    tsdta: pd.DataFrame
+    , infodta: pd.Series
+    , sensors: pd.DataFrame
+    , tsmap: Optional[dict[str, str]] = None
+    , infomap: Optional[dict[str, str]] = None
+    , sun: Optional[outboard_sat.SunGeometry] = None
+    , skip_night: bool = False
+    , prefix: str = 'E_rear_outboard_'
+) -> pd.DataFrame:
+    """Simulate several outboard sensors in one evaluation.
+
+    Parameters
+    ----------
+    tsdta : pd.DataFrame
+        Simulation timeseries, as in calc_E_rear_from_info.
+    infodta : pd.Series
+        Simulation run information, as in calc_E_rear_from_info.
+    sensors : pd.DataFrame
+        One row per sensor, indexed by sensor label, with an 'offset'
+        column and optionally any of 'height', 'GCR' and 'NearAlbedo'
+        overriding the values from infodta.
+    tsmap, infomap : dict[str, str], optional
+        Column maps as in calc_E_rear_from_info.
+    sun : outboard_sat.SunGeometry, optional
+        Precomputed sun terms, by default None.
+    skip_night : bool, optional
+        Passed to outboard_sat.calc_E_rear, by default False.
+    prefix : str, optional
+        Prefix for result column names, by default 'E_rear_outboard_'.
+
+    Returns
+    -------
+    pd.DataFrame
+        E_rear for each sensor in columns named prefix + sensor label,
+        ready to be combined by outboard_redundant_column.
+    """
+    _tsmap = e_rear_ts_map if tsmap is None else tsmap
+    _infomap = e_rear_info_map if infomap is None else infomap
+    kwargs_ts = {
+        k: tsdta[v]
+        for k, v in _tsmap.items()}
+    kwargs_info = {
+        k: sensors[k] if k in sensors.columns else infodta[v]
+        for k, v in _infomap.items()}
+    result = outboard_sat.calc_E_rear(
+        offset=sensors['offset']
+        , sensors=sensors.index
+        , sun=sun
+        , skip_night=skip_night
+        , **kwargs_ts
+        , **kwargs_info)['E_rear'] # type: ignore
+    result.columns = [f'{prefix}{sensor}' for sensor in result.columns]
     return result
 
 
+def outboard_redundant_column(
+    sensor_columns: list[str]
+    , redundant_function: str = 'median'
+) -> column_selection.SCADARedundantColumn:
+    """Combine simulated outboard sensor columns as redundant values.
+
+    Parameters
+    ----------
+    sensor_columns : list[str]
+        Column names, e.g. from calc_E_rear_sensors_from_info.
+    redundant_function : str, optional
+        Key of column_selection.SCADARedundantColumn.redundant_functions,
+        by default 'median'.
+
+    Returns
+    -------
+    column_selection.SCADARedundantColumn
+    """
+    return column_selection.SCADARedundantColumn(
+        redundant_function=redundant_function
+        , redundant_value_columns=list(sensor_columns)
+        , rf_params={})
+
+
 def augment_sim_data(
     er_df: pd.DataFrame
     , run_info: pd.Series
     , offset: float
+    , sun: Optional[outboard_sat.SunGeometry] = None
+    , skip_night: bool = False
 ) -> pd.DataFrame:
+    """Add the derived columns in augmented_columns to simulation output.
+
+    E_rear_outboard is simulated with calc_E_rear_from_info or
+    calc_E_rear_ft_from_info. If the run information lacks a value the
+    simulation needs (e.g. a blank Height in the inventory),
+    GlobBakUnshd is used instead and a warning is issued.
+    """
     result = er_df.copy()
     result['DiffuseFraction'] = (
         result['DiffHor'] / result['GlobHor'])
-    result['Tilt'] = np.abs(result['PhiAng'])
+    if 'PhiAng' in result.columns:
+        result['Tilt'] = np.abs(result['PhiAng'])
+    else:
+        # fixed tilt output has no rotation angle
+        result['Tilt'] = float(run_info['Tilt'])
     if run_info['bifi_sim']:
         result['GlobBakUnshd'] = (
             result['GlobBak'] + result['BackShd'])
         result['GlobCell'] = (
             result['GlobInc']
             + run_info['Bifaciality'] * result['GlobBak'])
-        if 'SAT' in run_info['SystemLabel']:
-            result['E_rear_outboard'] = calc_E_rear_from_info(
-                er_df
-                , run_info
-                , offset=offset)
-        elif 'FT' in run_info['SystemLabel']:
-            # needs further review
-            result['E_rear_outboard'] = result['GlobBakUnshd']
-        else:
+        fixed_tilt = 'FT' in run_info['SystemLabel']
+        if not (fixed_tilt or 'SAT' in run_info['SystemLabel']):
             raise ValueError(
                 'Cannot determine array orientation in '
                 'augment_system_data for SystemLabel '
                 f'"{run_info["SystemLabel"]}"')
+        missing = missing_run_geometry(
+            run_info
+            , e_rear_ft_info_map if fixed_tilt else e_rear_info_map
+            , er_df.columns)
+        if missing:
+            warnings.warn(
+                f'augment_sim_data: run {run_info.name!r} has no value for '
+                f'{missing}, using GlobBakUnshd as E_rear_outboard')
+            result['E_rear_outboard'] = result['GlobBakUnshd']
+        elif fixed_tilt:
+            result['E_rear_outboard'] = calc_E_rear_ft_from_info(
+                er_df
+                , run_info
+                , offset=offset
+                , skip_night=skip_night)
+        else:
+            result['E_rear_outboard'] = calc_E_rear_from_info(
+                er_df
+                , run_info
+                , offset=offset
+                , sun=sun
+                , skip_night=skip_night)
     else:
         result['GlobCell'] = result['GlobEff']
     return result
 
 
+def augment_sim_data_chunks(
+    er_chunks: Iterable[pd.DataFrame]
+    , run_info: pd.Series
+    , offset: float
+    , skip_night: bool = False
+) -> Iterator[pd.DataFrame]:
+    """Augment simulation data one chunk at a time.
+
+    augment_sim_data only combines values within each row, so the
+    augmented chunks match augmenting the whole dataset at once. Use
+    captest_info.period_chunks to regroup the output into whole
+    periods for captest_info.PeriodicCaptest.
+
+    Parameters
+    ----------
+    er_chunks : Iterable[pd.DataFrame]
+        Chunks of simulation output, e.g. from a chunked CSV reader.
+    run_info : pd.Series
+        Simulation run information, as in augment_sim_data.
+    offset : float
+        Horizontal distance from edge of array to outboard sensor (m).
+    skip_night : bool, optional
+        Passed to outboard_sat.calc_E_rear, by default False.
+
+    Yields
+    ------
+    pd.DataFrame
+        Augmented chunk.
+    """
+    for er_df in er_chunks:
+        yield augment_sim_data(
+            er_df
+            , run_info=run_info
+            , offset=offset
+            , skip_night=skip_night)
+
+
+# columns added by augment_sim_data
+augmented_columns = (
+    'DiffuseFraction', 'Tilt', 'GlobBakUnshd', 'GlobCell', 'E_rear_outboard')
+
+
+def augment_sim_data_columns(run_info: pd.Series) -> set[str]:
+    """Identify the simulation output columns augment_sim_data reads.
+
+    Parameters
+    ----------
+    run_info : pd.Series
+        Simulation run information, as in augment_sim_data.
+
+    Returns
+    -------
+    set[str]
+    """
+    fixed_tilt = 'FT' in run_info['SystemLabel']
+    result = {'DiffHor', 'GlobHor'}
+    if not fixed_tilt:
+        result.add('PhiAng')
+    if run_info['bifi_sim']:
+        result |= {'GlobBak', 'BackShd', 'GlobInc'}
+        result |= set(
+            (e_rear_ft_ts_map if fixed_tilt else e_rear_ts_map).values())
+        if fixed_tilt:
+            result.add('AngProf')
+    else:
+        result.add('GlobEff')
+    return result
+
+
+def mark_qc_columns(method: str = 'Default') -> set[str]:
+    """Identify the columns mark_qc reads for a QC method."""
+    result = {'GlobInc', 'EOutInv'}
+    if 'E_rear<75' == method:
+        result.add('E_rear_outboard')
+    return result
+
+
+def plan_usecols(
+    test_infos: Iterable[captest_info.OLSCapTestInfo]
+    , run_info: pd.Series
+    , qc_method: str = 'Default'
+    , available: Optional[Iterable[str]] = None
+) -> list[str]:
+    """Plan which simulation output columns to read.
+
+    Combines the columns the captests resolve to (see
+    captest_info.OLSCapTestInfo.input_columns) with the needs of
+    mark_qc, and replaces columns produced by augment_sim_data with
+    the raw columns it reads. Pass the result as usecols to
+    io.read_pvsyst_hourly so only these columns are parsed.
+
+    Parameters
+    ----------
+    test_infos : Iterable[captest_info.OLSCapTestInfo]
+        Captests that will be run on the data.
+    run_info : pd.Series
+        Simulation run information, as in augment_sim_data.
+    qc_method : str, optional
+        Method passed to mark_qc, by default 'Default'.
+    available : Iterable[str], optional
+        Columns present in the file (e.g. PVsystHeader.columns), by
+        default None (not checked).
+
+    Returns
+    -------
+    list[str]
+        Sorted column names.
+    """
+    needed = (
+        set()
+        .union(*[ti.input_columns() for ti in test_infos])
+        | mark_qc_columns(qc_method))
+    needed = (
+        (needed - set(augmented_columns))
+        | augment_sim_data_columns(run_info))
+    if available is not None:
+        missing_cols = needed - set(available)
+        if missing_cols:
+            raise ValueError(
+                f'Columns {sorted(missing_cols)} needed in plan_usecols '
+                'are not available.')
+    return sorted(needed)
+
+
 def ref_calculation_agg(
     rca: str | float | int
     , s: pd.Series
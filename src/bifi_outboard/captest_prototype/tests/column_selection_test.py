@@ -2,6 +2,7 @@
 
 import numpy as np
 import pandas as pd
+from bifi_outboard import outboard_sat
 from bifi_outboard.captest_prototype import column_selection
 from bifi_outboard.captest_prototype import captest_info
 from bifi_outboard.captest_prototype import model_ols
@@ -166,3 +167,173 @@ def test_seq():
     assert 'MonthBegin' == ans2b.index.names[0]
     
 
+
+
+def test_compile_plan():
+    qcwsd = column_selection.QCComputedSetData(
+        computed_columns={
+            **scc
+            , 'E_sum': column_selection.SCADAComputedColumn(
+                computed_function='Linear'
+                , computed_value_columns={'GlobInc': 0.5, 'POA2': 2.0}
+                , cf_params={})}
+        , redundant_data=column_selection.QCRedundantSetData(
+            redundant_columns={
+                **src1
+                , 'GlobInc': column_selection.SCADARedundantColumn(
+                    redundant_function='median'
+                    , redundant_value_columns=['GlobInc', 'POA2', 'POA3']
+                    , rf_params={})}))
+    dsdta = dsdta1.assign(
+        POA2=dsdta1['GlobInc'] + 1.0
+        , POA3=[np.nan] * 5 + [0.0])
+    dsdta.loc[2, 'EOutInv'] = np.nan
+    r_extra = ['EOutInv', 'POA2']
+    c_extra = ['EOutInv', 'T_Amb']
+    expected_red = qcwsd.redundant_data.combine(dsdta, r_extra)
+    expected = qcwsd.compute(expected_red, c_extra)
+    plan = qcwsd.compile(
+        redundant_extra_cols=r_extra, computed_extra_cols=c_extra)
+    assert ['GlobInc', 'POA2', 'POA3', 'T_Amb', 'WindVel', 'EOutInv'] == (
+        plan.input_columns)
+    ans_red, ans = plan.execute(dsdta)
+    pd.testing.assert_frame_equal(
+        expected_red, ans_red[expected_red.columns], check_dtype=False)
+    pd.testing.assert_frame_equal(
+        expected, ans[expected.columns], check_dtype=False)
+    # redundant and computed columns view one array
+    assert np.may_share_memory(
+        ans['E_sum'].to_numpy(), ans_red['GlobInc'].to_numpy())
+
+
+def test_compile_plan_passthrough_dtypes():
+    qcwsd = column_selection.QCComputedSetData(
+        computed_columns=scc, redundant_data=qcrsd0)
+    dsdta = dsdta1.assign(
+        EOutInv=dsdta1['EOutInv'].astype('float32')
+        , n_inv=np.arange(len(dsdta1), dtype='int64')
+        , ok=True
+        , label='a')
+    r_extra = ['EOutInv', 'GlobInc', 'T_Amb', 'WindVel', 'n_inv', 'ok', 'label']
+    c_extra = ['n_inv', 'ok', 'label']
+    expected_red = qcwsd.redundant_data.combine(dsdta, r_extra)
+    expected = qcwsd.compute(expected_red, c_extra)
+    ans_red, ans = qcwsd.compile(
+        redundant_extra_cols=r_extra
+        , computed_extra_cols=c_extra).execute(dsdta)
+    # pass-through columns keep their dtypes, computed columns are float
+    pd.testing.assert_frame_equal(expected_red, ans_red[expected_red.columns])
+    pd.testing.assert_frame_equal(expected[c_extra], ans[c_extra])
+    pd.testing.assert_frame_equal(
+        expected[list(scc)], ans[list(scc)], check_dtype=False)
+    assert 'float32' == ans_red['EOutInv'].dtype
+    assert 'float64' == ans['P'].dtype
+
+
+def test_linear_projector():
+    ccs = {
+        **scc
+        , 'P_kW': column_selection.SCADAComputedColumn(
+            computed_function='Linear'
+            , computed_value_columns={'EOutInv': 0.001, 'WindVel': 0.0}
+            , cf_params={})
+        , 'E_sum': column_selection.SCADAComputedColumn(
+            computed_function='Linear'
+            , computed_value_columns={'GlobInc': 0.5, 'T_Amb': 2.0}
+            , cf_params={})}
+    projector = column_selection.LinearProjector.from_computed_columns(ccs)
+    assert {'E': 'GlobInc', 'T_a': 'T_Amb', 'v': 'WindVel', 'P': 'EOutInv'} == (
+        projector.renames)
+    dsdta = dsdta1.copy()
+    dsdta.loc[1, 'T_Amb'] = np.nan
+    ans = projector.project_columns(dsdta)
+    assert list(ccs) == list(ans)
+    for k, v in ccs.items():
+        expected = column_selection.cf_linear(
+            dsdta, v.computed_value_columns, v.cf_params)
+        np.testing.assert_allclose(expected.to_numpy(), ans[k].to_numpy())
+    # renames are float64 copies, as from cf_linear
+    assert 'int64' == dsdta['GlobInc'].dtype
+    assert 'float64' == ans['E'].dtype
+    assert not np.shares_memory(
+        ans['E'].to_numpy(), dsdta['GlobInc'].to_numpy())
+    qcdta = column_selection.QCComputedSetData(
+        computed_columns=ccs, redundant_data=qcrsd0).compute(dsdta, ['T_Amb'])
+    assert list(ccs) + ['T_Amb'] == qcdta.columns.to_list()
+    np.testing.assert_allclose(
+        0.5 * dsdta['GlobInc'] + 2.0 * dsdta['T_Amb'].fillna(0.0)
+        , qcdta['E_sum'])
+
+
+def test_linear_projector_inf():
+    ccs = {
+        **scc
+        , 'E_sum': column_selection.SCADAComputedColumn(
+            computed_function='Linear'
+            , computed_value_columns={'GlobInc': 0.5, 'WindVel': 2.0}
+            , cf_params={})}
+    projector = column_selection.LinearProjector.from_computed_columns(ccs)
+    dsdta = dsdta1.astype('float64')
+    dsdta.loc[1, 'T_Amb'] = np.inf
+    dsdta.loc[2, 'WindVel'] = -np.inf
+    dsdta.loc[2, 'EOutInv'] = np.nan
+    ans = projector.project_columns(dsdta)
+    X = dsdta[projector.input_columns].to_numpy()
+    ans_array = projector.project_array(X)
+    for j, (k, v) in enumerate(ccs.items()):
+        expected = column_selection.cf_linear(
+            dsdta, v.computed_value_columns, v.cf_params)
+        # an infinite input does not leak into unrelated outputs
+        np.testing.assert_array_equal(expected.to_numpy(), ans[k].to_numpy())
+        np.testing.assert_array_equal(expected.to_numpy(), ans_array[:, j])
+    # the compiled plan uses the same product
+    cols = list(dsdta.columns)
+    _, ans_plan = column_selection.QCComputedSetData(
+        computed_columns=ccs, redundant_data=qcrsd0
+    ).compile(redundant_extra_cols=cols, computed_extra_cols=[]).execute(
+        dsdta)
+    np.testing.assert_array_equal(ans_array, ans_plan[list(ccs)].to_numpy())
+    np.testing.assert_array_equal(
+        column_selection.LinearProjector._product(
+            np.array([[1.0, np.inf]]), np.eye(2))
+        , [[1.0, np.inf]])
+
+
+def test_compute_sun():
+    dsdta = pd.DataFrame({
+        'AzSol': [-60.0, -20.0, 0.0, 20.0, 60.0]
+        , 'HSol': [15.0, 40.0, 55.0, 40.0, 15.0]
+        , 'PhiAng': [-45.0, -20.0, 0.0, 20.0, 45.0]
+        , 'GlobHor': [200.0, 600.0, 800.0, 600.0, 200.0]
+        , 'GlobGnd': [150.0, 450.0, 600.0, 450.0, 150.0]
+        , 'BkVFLss': [5.0, 10.0, 12.0, 10.0, 5.0]
+        , 'DifSBak': [10.0, 20.0, 20.0, 20.0, 10.0]
+        , 'BmIncBk': 0.0})
+    qcwsd = column_selection.QCComputedSetData(
+        computed_columns={
+            'E_rear': column_selection.SCADAComputedColumn(
+                computed_function='Outboard_PVsyst_SAT_POA'
+                , computed_value_columns={
+                    c: 1.0 for c in dsdta.columns}
+                , cf_params={
+                    'height': 2.0, 'offset': 1.0, 'GCR': 0.493
+                    , 'NearAlbedo': 0.2})}
+        , redundant_data=qcrsd0)
+    cols = list(dsdta.columns)
+    expected = qcwsd.compute(dsdta, cols)['E_rear']
+    sun = outboard_sat.SunGeometry.from_degrees(
+        dsdta['AzSol'], dsdta['HSol'])
+    other_sun = outboard_sat.SunGeometry.from_degrees(
+        dsdta['AzSol'] + 30.0, dsdta['HSol'])
+    plan = qcwsd.compile(redundant_extra_cols=cols, computed_extra_cols=cols)
+    for ans in (
+        qcwsd.compute(dsdta, cols, sun=sun)['E_rear']
+        , plan.execute(dsdta, sun=sun)[1]['E_rear']
+    ):
+        np.testing.assert_allclose(expected, ans)
+    # the sun terms are used, not recomputed from AzSol and HSol
+    for ans in (
+        qcwsd.compute(dsdta, cols, sun=other_sun)['E_rear']
+        , plan.execute(dsdta, sun=other_sun)[1]['E_rear']
+    ):
+        assert not np.allclose(expected, ans)
@@ -1,7 +1,13 @@
 # io_tests.py
 
+import io
 import pathlib
-from ..io import read_pvsyst_hourly
+import zipfile
+import pandas as pd
+from ..io import (
+    inventory_sheet_index, load_inventory, read_pvsyst_hourly, read_run_infos
+    , run_info_csv_path)
+from ... import pvsystcsv
 
 dta_dir = pathlib.Path(__file__).parent / 'data'
 
@@ -11,3 +17,128 @@ def test_read_pvsyst_hourly():
         , sep=';'
         , date_format='%d/%m/%y %H:%M')
     assert 'date' == ans.index.name
+
+
+def test_read_pvsyst_header_and_index():
+    fname = dta_dir / 'Test Bifi SAT_Project_VC1_HourlyRes_0.CSV'
+    ans, header = pvsystcsv.read_pvsyst(fname, date_format='%m/%d/%y %H:%M')
+    assert ',' == header.sep
+    assert 'Test Bifi SAT_Project.VC1' == header.variant
+    assert 'Hourly values' == header.step
+    assert pd.Timestamp('1990-12-31') == header.end
+    assert 'W/m²' == header.units['GlobHor']
+    assert header.columns[1:] == list(ans.columns)
+    assert (ans.dtypes == 'float64').all()
+    # arithmetic index matches parsing every date string
+    parsed = pd.read_csv(
+        fname
+        , encoding='windows-1252'
+        , skiprows=list(range(10)) + [11, 12]
+        , usecols=['date'])['date']
+    expected = pd.to_datetime(parsed, format='%m/%d/%y %H:%M')
+    assert (expected.to_numpy() == ans.index.to_numpy()).all()
+    assert 'h' == ans.index.freqstr
+
+
+def test_read_pvsyst_irregular_dates():
+    # a missing hour fails the spot checks and falls back to parsing
+    fname = dta_dir / 'pvsyst_example_HourlyRes_2.CSV'
+    with open(fname, 'rb') as f:
+        lines = f.readlines()
+    del lines[20]
+    ans, header = pvsystcsv.read_pvsyst(
+        io.BytesIO(b''.join(lines)), date_format='%m/%d/%y %H:%M')
+    assert 8759 == len(ans)
+    assert ans.index.freq is None
+    assert pd.Timestamp('1990-12-31 23:00') == ans.index[-1]
+
+
+def test_read_pvsyst_zip(tmp_path):
+    archive = tmp_path / 'Test Bifi SAT_Project.zip'
+    names = [
+        'Test Bifi SAT_Project_VC0_HourlyRes_0.CSV'
+        , 'Test Bifi SAT_Project_VC1_HourlyRes_0.CSV']
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('Test Bifi SAT_Project.PRJ', 'not a result file')
+        for name in names:
+            zf.write(dta_dir / name, arcname='Results/' + name)
+    members = pvsystcsv.list_zip_members(archive)
+    assert ['Results/' + name for name in names] == members
+    expected = pvsystcsv.read_pvsyst_csv(dta_dir / names[1], sep=',')
+    ans = pvsystcsv.read_pvsyst_csv(
+        f'{archive}::{members[1]}', sep=',', usecols=['GlobHor'])
+    pd.testing.assert_frame_equal(expected[['GlobHor']], ans)
+    batch = pvsystcsv.read_pvsyst_zip(archive)
+    assert members == list(batch)
+    pd.testing.assert_frame_equal(expected, batch[members[1]][0])
+    assert 'Test Bifi SAT_Project.VC1' == batch[members[1]][1].variant
+
+
+def test_load_inventory():
+    inventory_fname = (
+        pathlib.Path(__file__).parents[4] / 'data' / 'Inventory.xlsx')
+    inventory = load_inventory(
+        inventory_fname
+        , usecols=['GlobHor', 'EArray']
+        , max_workers=2)
+    key = ('Test Bifi SAT_Project.PRJ', 'SAT Az0 (bifi)')
+    assert list(inventory.run_infos.index) == list(inventory.sim_data)
+    run_info = inventory.run_info(key)
+    assert 2.0 == run_info['Height']
+    assert 0.493 == run_info['GCR']
+    expected = read_pvsyst_hourly(
+        run_info_csv_path(run_info, inventory_fname.parent)
+        , sep=run_info['sep']
+        , dayfirst=run_info['dayfirst']
+        , date_format=run_info['date_format']
+        , usecols=['GlobHor', 'EArray'])
+    pd.testing.assert_frame_equal(expected, inventory.sim_data[key])
+    assert inventory.sim_data.is_loaded(key)
+    assert all(
+        8760 == len(dta)
+        for dta in inventory.sim_data.values())
+
+
+def test_read_run_infos_blank_dayfirst(tmp_path):
+    inventory_fname = (
+        pathlib.Path(__file__).parents[4] / 'data' / 'Inventory.xlsx')
+    shts = pd.read_excel(
+        inventory_fname, sheet_name=list(inventory_sheet_index), header=0)
+    runs = shts['PVsyst Runs']
+    runs['dayfirst'] = runs['dayfirst'].astype(object)
+    runs.loc[0, 'dayfirst'] = None
+    fname = tmp_path / 'Inventory.xlsx'
+    with pd.ExcelWriter(fname) as writer:
+        for name, sht in shts.items():
+            sht.to_excel(writer, sheet_name=name, index=False)
+    ans = read_run_infos(fname)
+    assert 'bool' == ans['dayfirst'].dtype
+    assert not ans['dayfirst'].iloc[0]
+
+
+def test_read_pvsyst_index_from_spacing():
+    # sub-hourly rows with no step in the header
+    times = pd.date_range('1990-01-01', periods=100, freq='15min')
+    text = b'PVSYST 7.3.4\n,File,File date,Description\ndate,X\n,W/m2\n\n'
+    for tm in times:
+        text += tm.strftime('%m/%d/%y %H:%M').encode() + b',1\n'
+    ans, header = pvsystcsv.read_pvsyst(
+        io.BytesIO(text), sep=',', usecols=['X'])
+    assert header.freq is None
+    assert '15min' == ans.index.freqstr
+    assert times.equals(ans.index.rename(None))
+
+
+def test_parse_fixed_dates():
+    dates = pd.Series(
+        ['01/02/90 00:00', ' 12/31/68 23:59', '02/29/00 12:30'])
+    expected = pd.to_datetime(dates.str.strip(), format='%m/%d/%y %H:%M')
+    assert (
+        expected.to_numpy()
+        == pvsystcsv._parse_fixed_dates(dates, dayfirst=False)).all()
+    ans = pvsystcsv._parse_fixed_dates(dates.iloc[:1], dayfirst=True)
+    assert pd.Timestamp('1990-02-01') == ans[0]
+    assert pvsystcsv._parse_fixed_dates(
+        pd.Series(['1/2/90 0:00']), dayfirst=False) is None
+    assert pvsystcsv._parse_fixed_dates(
+        pd.Series(['13/13/90 00:00']), dayfirst=False) is None
@@ -0,0 +1,114 @@
+# scada_test.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from bifi_outboard.captest_prototype import captest_info
+from bifi_outboard.captest_prototype import column_selection
+from bifi_outboard.captest_prototype import scada
+from .column_selection_test import scc, mrcs1
+
+qcrsd = column_selection.QCRedundantSetData(
+    redundant_columns={
+        'GlobInc': column_selection.SCADARedundantColumn(
+            redundant_function='median'
+            , redundant_value_columns=['POA1', 'POA2', 'POA3']
+            , rf_params={})
+        , 'T_Amb': column_selection.SCADARedundantColumn(
+            redundant_function='median'
+            , redundant_value_columns=['TA1', 'TA2']
+            , rf_params={})
+        , 'WindVel': column_selection.SCADARedundantColumn(
+            redundant_function='median'
+            , redundant_value_columns=['WS1']
+            , rf_params={})})
+test_info = captest_info.OLSCapTestInfo(
+    model_rc_spec=mrcs1
+    , computed_set_data=column_selection.QCComputedSetData(
+        computed_columns=scc
+        , redundant_data=qcrsd))
+
+
+@pytest.fixture
+def scada_dta() -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    index = pd.date_range(
+        '2024-01-01', '2024-03-31 23:45', freq='15min', name='Timestamp')
+    n = len(index)
+    poa = 400.0 + 400.0 * rng.random(n)
+    ta = 10.0 + 20.0 * rng.random(n)
+    ws = 5.0 * rng.random(n)
+    return pd.DataFrame(
+        {
+            'POA1': poa + rng.normal(0.0, 5.0, n)
+            , 'POA2': poa + rng.normal(0.0, 5.0, n)
+            , 'POA3': poa + rng.normal(0.0, 5.0, n)
+            , 'TA1': ta
+            , 'TA2': ta + 0.1
+            , 'WS1': ws
+            , 'EOutInv': (
+                poa * (1.0 - 0.004 * (ta - 20.0)) + 2.0 * ws
+                + rng.normal(0.0, 2.0, n))
+            , 'Unused': rng.random(n)}
+        , index=index)
+
+
+def test_spec_columns():
+    expected = ['EOutInv', 'POA1', 'POA2', 'POA3', 'TA1', 'TA2', 'WS1']
+    assert expected == scada.spec_columns(test_info)
+    assert expected[1:] == scada.spec_columns(qcrsd)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_read_scada_chunks(tmp_path, scada_dta, suffix):
+    if '.parquet' == suffix:
+        pytest.importorskip('pyarrow')
+    fname = tmp_path / ('scada' + suffix)
+    if '.csv' == suffix:
+        scada_dta.to_csv(fname)
+    else:
+        scada_dta.to_parquet(fname)
+    columns = scada.spec_columns(test_info)
+    chunks = list(scada.read_scada_chunks(
+        fname
+        , columns=columns
+        , dtype={'EOutInv': 'float64'}
+        , chunk_rows=1000))
+    assert 9 == len(chunks)
+    ans = pd.concat(chunks)
+    assert columns == list(ans.columns)
+    assert 'float32' == ans['POA1'].dtype
+    assert 'float64' == ans['EOutInv'].dtype
+    np.testing.assert_allclose(
+        scada_dta[columns].to_numpy(), ans.to_numpy(), rtol=1e-6)
+    assert scada_dta.index.equals(ans.index)
+    # whole months feed PeriodicCaptest
+    periodic = captest_info.PeriodicCaptest(
+        period_label='Monthly'
+        , test_info=test_info
+        , qcdta_iterator=scada.read_scada_periods(
+            fname, spec=test_info, period_label='Monthly', chunk_rows=1000)
+        , qcdta_columns=set(columns)
+        , model_extractor=captest_info.me_fitconf)  # type: ignore
+    assert 3 == len(list(periodic))
+
+
+def test_read_scada_chunks_order(tmp_path, scada_dta):
+    fname = tmp_path / 'scada.csv'
+    # shuffled within chunks is sorted, out of order across chunks is not
+    shuffled = pd.concat([
+        scada_dta.iloc[:1000].iloc[::-1]
+        , scada_dta.iloc[1000:2000]])
+    shuffled.to_csv(fname)
+    ans = pd.concat(scada.read_scada_chunks(
+        fname, columns=['POA1'], chunk_rows=1000))
+    assert ans.index.is_monotonic_increasing
+    pd.concat([scada_dta.iloc[1000:2000], scada_dta.iloc[:1000]]).to_csv(
+        fname)
+    with pytest.raises(ValueError, match='increasing time order'):
+        list(scada.read_scada_chunks(
+            fname, columns=['POA1'], chunk_rows=1000))
+    with pytest.raises(ValueError, match='not in the file'):
+        list(scada.read_scada_chunks(fname, columns=['POA9']))
+    with pytest.raises(ValueError, match='Unsupported dtypes'):
+        list(scada.read_scada_chunks(fname, columns=['POA1'], dtype='int64'))
@@ -372,3 +372,181 @@ def test_calc_case_periodic_models(hrly_dta_bifi_aug, run_infos):
         ans1[(True, pd.Timestamp('1990-01-01 00:00:00'))]  # type: ignore
         , captest_info.OLSFullModel)
 
+
+
+def test_augment_sim_data_sun(hrly_dta_bifi, hrly_dta_bifi_aug):
+    sun = sim_study.outboard_sat.SunGeometry.from_degrees(
+        hrly_dta_bifi['AzSol'], hrly_dta_bifi['HSol'])
+    ans = sim_study.augment_sim_data(
+        hrly_dta_bifi
+        , run_info=run_info_bifi
+        , offset=base_offset
+        , sun=sun)
+    assert np.allclose(
+        hrly_dta_bifi_aug['E_rear_outboard']
+        , ans['E_rear_outboard'])
+
+
+def test_augment_sim_data_chunks(hrly_dta_bifi, hrly_dta_bifi_aug):
+    chunks = (
+        hrly_dta_bifi.iloc[i:i + 1000]
+        for i in range(0, len(hrly_dta_bifi), 1000))
+    aug_chunks = list(captest_info.period_chunks(
+        sim_study.augment_sim_data_chunks(
+            chunks
+            , run_info=run_info_bifi
+            , offset=base_offset)
+        , period_label='Monthly'))
+    assert all(True == k for k, _ in aug_chunks)
+    ans = pd.concat([df for _, df in aug_chunks])
+    pd.testing.assert_frame_equal(hrly_dta_bifi_aug, ans)
+    # no month is split across the regrouped chunks
+    months = [
+        tm
+        for _, df in aug_chunks
+        for tm, _ in df.resample('MS')]
+    assert 12 == len(months) == len(set(months))
+    with pytest.raises(ValueError):
+        list(captest_info.period_chunks(
+            [hrly_dta_bifi.iloc[1000:2000], hrly_dta_bifi.iloc[:1000]]
+            , period_label='Monthly'))
+
+
+def test_calc_E_rear_sensors_from_info(hrly_dta_bifi, hrly_dta_bifi_aug):
+    sensors = pd.DataFrame(
+        {'offset': [base_offset, 1.0, 2.0]}
+        , index=pd.Index(['A', 'B', 'C'], name='sensor'))
+    ans = sim_study.calc_E_rear_sensors_from_info(
+        hrly_dta_bifi
+        , run_info_bifi
+        , sensors=sensors)
+    assert [
+        'E_rear_outboard_A', 'E_rear_outboard_B', 'E_rear_outboard_C'
+    ] == ans.columns.to_list()
+    assert np.allclose(
+        hrly_dta_bifi_aug['E_rear_outboard']
+        , ans['E_rear_outboard_A'])
+    rc = sim_study.outboard_redundant_column(ans.columns.to_list())
+    assert np.allclose(ans['E_rear_outboard_B'], rc.combine(ans))
+
+
+def test_calc_E_rear_from_info_ts_albedo(hrly_dta_bifi, hrly_dta_bifi_aug):
+    winter = hrly_dta_bifi.index.month.isin([1, 2, 12])
+    tsdta = hrly_dta_bifi.assign(
+        NearAlbedo=np.where(winter, 0.6, run_info_bifi['NearAlbedo']))
+    ans = sim_study.calc_E_rear_from_info(
+        tsdta
+        , run_info_bifi
+        , offset=base_offset)
+    assert np.allclose(
+        hrly_dta_bifi_aug.loc[~winter, 'E_rear_outboard']
+        , ans[~winter])
+    assert (
+        hrly_dta_bifi_aug.loc[winter, 'E_rear_outboard'] <= ans[winter]
+    ).all()
+    assert (
+        hrly_dta_bifi_aug.loc[winter, 'E_rear_outboard'] < ans[winter]
+    ).any()
+
+
+def test_augment_sim_data_ft():
+    inventory_fname = (
+        pathlib.Path(__file__).parents[4] / 'data' / 'Inventory.xlsx')
+    run_info = io.read_run_infos(inventory_fname).loc[
+        ('Test Bifi Sheds_Project.PRJ', 'FT30 Az0 (bifi)')]
+    er_df = io.read_pvsyst_hourly(
+        io.run_info_csv_path(run_info, inventory_fname.parent)
+        , sep=run_info['sep']
+        , dayfirst=run_info['dayfirst']
+        , date_format=run_info['date_format'])
+    # fixed tilt output has no PhiAng column
+    assert 'PhiAng' not in er_df.columns
+    # without a Height in the inventory the unshaded rear irradiance is used
+    with pytest.warns(UserWarning, match='Height'):
+        ans = sim_study.augment_sim_data(er_df, run_info, offset=base_offset)
+    assert (30.0 == ans['Tilt']).all()
+    pd.testing.assert_series_equal(
+        ans['GlobBakUnshd'], ans['E_rear_outboard'], check_names=False)
+    run_info = run_info.copy()
+    run_info['Height'] = 2.0
+    ans = sim_study.augment_sim_data(er_df, run_info, offset=base_offset)
+    assert np.isfinite(ans['E_rear_outboard']).all()
+    # the outboard sensor sees less shade than the average rear side
+    day = 0.0 < ans['HSol']
+    assert (ans['E_rear_outboard'] >= ans['GlobBak'])[day].mean() > 0.99
+
+
+def test_calc_E_rear_ft_from_info_azimuth():
+    inventory_fname = (
+        pathlib.Path(__file__).parents[4] / 'data' / 'Inventory.xlsx')
+    run_infos = io.read_run_infos(inventory_fname)
+    for variant, azimuth in [
+            ('FT30 Az0 (bifi)', 0.0)
+            , ('FT30 Az90 (bifi)', 90.0)]:
+        run_info = run_infos.loc[
+            ('Test Bifi Sheds_Project.PRJ', variant)].copy()
+        run_info['Height'] = 2.0
+        er_df = io.read_pvsyst_hourly(
+            io.run_info_csv_path(run_info, inventory_fname.parent)
+            , sep=run_info['sep']
+            , dayfirst=run_info['dayfirst']
+            , date_format=run_info['date_format'])
+        assert sim_study.plane_azimuth_mismatch(er_df, azimuth) < 0.01
+        if 0.0 == azimuth:
+            ans = sim_study.calc_E_rear_ft_from_info(
+                er_df, run_info, offset=base_offset)
+            assert np.isfinite(ans).all()
+        else:
+            # the Systems row of the Az90 variants says Azimuth 0
+            with pytest.raises(ValueError, match='Azimuth'):
+                sim_study.calc_E_rear_ft_from_info(
+                    er_df, run_info, offset=base_offset)
+
+
+def test_plan_usecols(hrly_dta_bifi, run_infos):
+    sample_case = sample_case_bifi0.copy()
+    sample_case['Model'] = 'ASTM E2848+Erear'
+    sample_case['Position'] = 'Outboard'
+    sample_case['QC'] = 'E_rear<75'
+    run_info1 = run_infos.loc[sim_study.make_case_run_info_key(sample_case)]
+    mspec1 = sim_study.model_spec_per_sample_case(
+        sample_case # type: ignore
+        , rc_calc='mean'
+        , run_info=run_info1
+        , globbakunshd_rc=100.0
+        , globbakunshd_rcs=None
+        , conf_level=0.95)
+    olscti = sim_study.build_pvsyst_olscti(
+        mrcspec=mspec1
+        , model=sample_case['Model']
+        , position=sample_case['Position'])
+    usecols = sim_study.plan_usecols(
+        [olscti]
+        , run_info=run_info1
+        , qc_method=sample_case['QC']
+        , available=hrly_dta_bifi.columns)
+    assert {'EOutInv', 'T_Amb', 'WindVel', 'GlobInc', 'PhiAng'} <= set(usecols)
+    assert 'E_rear_outboard' not in usecols
+    assert len(usecols) < len(hrly_dta_bifi.columns)
+    dsdta = io.read_pvsyst_hourly(
+        dta_dir / 'Test Bifi SAT_Project_VC1_HourlyRes_0.CSV'
+        , sep=','
+        , date_format='%m/%d/%y %H:%M'
+        , usecols=usecols)
+    assert sorted(dsdta.columns) == usecols
+    results = {
+        label: sim_study.calc_case_periodic_cts(
+            sample_case=sample_case
+            , qc_result=sim_study.get_qcresult(
+                run_info=run_info1
+                , dsdta=dta
+                , qc_method=sample_case['QC']
+                , globbakunshd_rcs=globbakunshd_rcs
+                , offset=base_offset)
+            , period_label='Monthly'
+            , model_spec=mspec1)
+        for label, dta in (('full', hrly_dta_bifi), ('planned', dsdta))}
+    pd.testing.assert_frame_equal(results['full'], results['planned'])
+    with pytest.raises(ValueError, match='plan_usecols'):
+        sim_study.plan_usecols(
+            [olscti], run_info=run_info1, available=['EOutInv'])
@@ -0,0 +1,333 @@
+# outboard_ft.py
+"""Rear irradiance of an outboard sensor beside fixed-tilt sheds.
+
+Fixed-tilt counterpart of outboard_sat. The sensor is mounted beyond
+one end of a row of sheds, parallel to the modules (constant tilt),
+at the height of the middle of the row end. As in outboard_sat the
+ground seen by the rear face is split at the shade line cast by the
+row end: a fraction W of the visible ground is unshaded and the rest
+is treated as the spatial average of the ground under the array.
+
+The along-row direction of a shed row is perpendicular to the plane
+azimuth. phi is the angle of the shade line below the horizontal
+pointing from the row end into the row, measured in the vertical plane
+containing the row axis. Unlike the SAT approximation in
+outboard_sat.calc_cosphi, the edge of a fixed row end does not move,
+so phi is the exact projection of the sun direction onto that plane
+for the middle of the edge.
+"""
+
+import functools
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+from . import outboard_sat
+
+
+# row end the sensor is beyond, looking at the array from the front
+ft_row_ends = ('east', 'west')
+
+E_rear_columns = outboard_sat.E_rear_columns
+
+
+def calc_end_azimuth(
+    plane_azimuth: float
+    , end: str = 'east'
+) -> float:
+    """Calculate the azimuth of the outward along-row direction.
+
+    Parameters
+    ----------
+    plane_azimuth : float
+        PVsyst plane azimuth (0 = facing equator, + = toward west;
+        degrees).
+    end : str, optional
+        One of ft_row_ends, by default 'east'. For plane_azimuth 0
+        this is the compass direction of the row end; otherwise it is
+        the end to the left ('east') or right ('west') when facing
+        the front of the array.
+
+    Returns
+    -------
+    float
+        Azimuth of the horizontal direction pointing from the row end
+        toward the sensor, in the AzSol convention (degrees).
+    """
+    if 'east' == end:
+        return plane_azimuth - 90.0
+    if 'west' == end:
+        return plane_azimuth + 90.0
+    raise ValueError(
+        f'Unexpected end "{end}" in calc_end_azimuth, '
+        f'expected one of {ft_row_ends}')
+
+
+def calc_phi_ft(
+    AzSol_rad: pd.Series
+    , HSol_rad: pd.Series
+    , end_azimuth_rad: float
+) -> pd.Series:
+    """Calculate the along-row shade angle beyond a fixed row end.
+
+    Parameters
+    ----------
+    AzSol_rad : pd.Series
+        PVsyst sun azimuth angle values (radians)
+    HSol_rad : pd.Series
+        PVsyst sun elevation angle values (radians)
+    end_azimuth_rad : float
+        Azimuth of the outward along-row direction, see
+        calc_end_azimuth. (radians)
+
+    Returns
+    -------
+    pd.Series
+        Projected angle of the shade line below the horizontal pointing
+        into the row, in the vertical plane containing the row axis.
+        Sun positions below the horizon give 0. (radians)
+    """
+    return np.arctan2(
+        np.maximum(np.sin(HSol_rad), 0.0)
+        , np.cos(HSol_rad) * np.cos(AzSol_rad - end_azimuth_rad))
+
+
+def calc_E_rear_ndarray(
+    height: float | np.ndarray
+    , offset: float | np.ndarray
+    , tilt: float | np.ndarray
+    , AzSol: np.ndarray
+    , HSol: np.ndarray
+    , GlobHor: np.ndarray
+    , GlobGnd: np.ndarray
+    , BkVFLss: np.ndarray
+    , DifSBak: np.ndarray
+    , BmIncBk: np.ndarray
+    , GCR: float | np.ndarray
+    , NearAlbedo: float | np.ndarray
+    , plane_azimuth: float = 0.0
+    , end: str = 'east'
+    , columns: Iterable[str] = ('E_rear',)
+    , out: Optional[dict[str, np.ndarray]] = None
+    , skip_night: bool = False
+    , night_fill: float | dict[str, float] = 0.0
+    , psi_method: Optional[str] = None
+) -> dict[str, np.ndarray]:
+    """Calculate fixed-tilt outboard E_rear from plain float arrays.
+
+    Parameters
+    ----------
+    height, offset, tilt, AzSol, HSol, GlobHor, GlobGnd, BkVFLss,
+    DifSBak, BmIncBk, GCR, NearAlbedo, plane_azimuth, end :
+        Same meaning and units as in calc_E_rear, as floats or
+        np.ndarray. Inputs follow numpy broadcasting rules.
+    columns : Iterable[str], optional
+        Names of results to return, any of the values in
+        E_rear_columns. By default only 'E_rear'.
+    out : dict[str, np.ndarray], optional
+        Preallocated results, see outboard_sat.calc_E_rear_ndarray. By
+        default None (allocated).
+    skip_night, night_fill :
+        Evaluate only rows with HSol > 0, as in
+        outboard_sat.calc_E_rear_ndarray. By default False and 0.0.
+    psi_method : str, optional
+        Formulation of the psi_rad output, see outboard_sat.calc_psi.
+        By default None.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Requested results keyed by name, in the order requested.
+        Entries present in out are the same array objects.
+    """
+    _columns = list(columns)
+    unknown_cols = set(_columns) - set(E_rear_columns)
+    if 0 < len(unknown_cols):
+        raise ValueError(
+            f'Unknown columns {sorted(unknown_cols)} requested in '
+            f'outboard_ft.calc_E_rear_ndarray, expected {E_rear_columns}')
+    _out = {} if out is None else out
+    sun_shape = np.broadcast_shapes(np.shape(AzSol), np.shape(HSol))
+    psi_shape = np.broadcast_shapes(
+        sun_shape, np.shape(height), np.shape(offset))
+    gnd_shape = np.broadcast_shapes(
+        psi_shape
+        , np.shape(tilt)
+        , np.shape(GlobHor)
+        , np.shape(GlobGnd)
+        , np.shape(BkVFLss)
+        , np.shape(GCR)
+        , np.shape(NearAlbedo))
+    shapes = {
+        'phi_rad': sun_shape
+        , 'psi_rad': psi_shape
+        , 'W': psi_shape
+        , 'E_gnd_rear': gnd_shape
+        , 'E_rear': np.broadcast_shapes(
+            gnd_shape, np.shape(DifSBak), np.shape(BmIncBk))}
+    if skip_night and 0 < len(sun_shape):
+        day_rows, night_rows = outboard_sat.split_day_rows(
+            np.broadcast_to(np.asarray(HSol, dtype=float), sun_shape))
+        if 0 < len(night_rows):
+            return outboard_sat.evaluate_day_rows(
+                functools.partial(
+                    calc_E_rear_ndarray
+                    , plane_azimuth=plane_azimuth
+                    , end=end
+                    , columns=_columns
+                    , psi_method=psi_method)
+                , inputs={
+                    'height': height
+                    , 'offset': offset
+                    , 'tilt': tilt
+                    , 'AzSol': AzSol
+                    , 'HSol': HSol
+                    , 'GlobHor': GlobHor
+                    , 'GlobGnd': GlobGnd
+                    , 'BkVFLss': BkVFLss
+                    , 'DifSBak': DifSBak
+                    , 'BmIncBk': BmIncBk
+                    , 'GCR': GCR
+                    , 'NearAlbedo': NearAlbedo}
+                , day_rows=day_rows
+                , night_rows=night_rows
+                , shapes=shapes
+                , out=_out
+                , night_fill=night_fill)
+    end_azimuth_rad = np.deg2rad(calc_end_azimuth(plane_azimuth, end=end))
+    HSol_rad = np.deg2rad(np.asarray(HSol, dtype=float))
+    phi_rad = calc_phi_ft(
+        np.deg2rad(np.asarray(AzSol, dtype=float))
+        , HSol_rad
+        , end_azimuth_rad)
+    result = {'phi_rad': phi_rad}
+    if 'psi_rad' in _columns:
+        result['psi_rad'] = outboard_sat.calc_psi(
+            phi_rad
+            , height=height
+            , offset=offset
+            , backend='numpy'
+            , psi_method=psi_method)
+    # cosine of psi is all that W needs
+    s_phi = np.sin(phi_rad)
+    W = offset * s_phi + height * np.cos(phi_rad)
+    W /= np.hypot(W, height * s_phi)
+    W += 1.0
+    W *= 0.5
+    result['W'] = W
+    # ground contribution: rot * (B + W * (A - B)), constant rotation
+    gnd_shd = np.asarray(GlobGnd, dtype=float) * NearAlbedo / GCR - BkVFLss
+    E_gnd_rear = np.asarray(GlobHor, dtype=float) * NearAlbedo - gnd_shd
+    E_gnd_rear *= W
+    E_gnd_rear += gnd_shd
+    E_gnd_rear *= 0.5 * (1.0 + np.cos(np.deg2rad(tilt)))
+    result['E_gnd_rear'] = E_gnd_rear
+    if 'E_rear' in _columns:
+        result['E_rear'] = E_gnd_rear + DifSBak + BmIncBk
+    for col in _columns:
+        if col in _out:
+            buf = outboard_sat.output_buffer(_out, col, shapes[col])
+            buf[...] = result[col]
+            result[col] = buf
+    return {k: result[k] for k in _columns}
+
+
+def calc_E_rear(
+    height: float
+    , offset: float
+    , tilt: float
+    , AzSol: pd.Series
+    , HSol: pd.Series
+    , GlobHor: pd.Series
+    , GlobGnd: pd.Series
+    , BkVFLss: pd.Series
+    , DifSBak: pd.Series
+    , BmIncBk: pd.Series
+    , GCR: float
+    , NearAlbedo: float | pd.Series
+    , plane_azimuth: float = 0.0
+    , end: str = 'east'
+    , skip_night: bool = False
+    , night_fill: float | dict[str, float] = 0.0
+    , psi_method: Optional[str] = None
+) -> pd.DataFrame:
+    """Calculate fixed-tilt outboard E_rear from PVsyst variables.
+
+    Wraps calc_E_rear_ndarray, labelling all intermediate results with
+    the index of HSol.
+
+    Parameters
+    ----------
+    height : float
+        Height of outboard sensor, level with the middle of the row
+        end (m).
+    offset : float
+        Horizontal distance along the row axis from the row end to the
+        outboard sensor (m).
+    tilt : float
+        Tilt of the modules and of the sensor (0=horizontal; degrees).
+    AzSol : pd.Series
+        Sun azimuth relative to direction toward equator (degrees).
+    HSol : pd.Series
+        Sun "height" above horizon (elevation; degrees).
+    GlobHor : pd.Series
+        Global horizontal irradiance (W/m2).
+    GlobGnd : pd.Series
+        Spatial average of global irradiance on the ground (W/m2).
+    BkVFLss : pd.Series
+        Back view factor loss (W/m2).
+    DifSBak : pd.Series
+        Diffuse irradiance from sky on the rear side (W/m2).
+    BmIncBk : pd.Series
+        Beam irradiance on the rear side (W/m2).
+    GCR : float
+        Ground cover ratio (unitless).
+    NearAlbedo : float or pd.Series
+        Ground albedo for bifacial calculations (unitless fraction).
+    plane_azimuth : float, optional
+        PVsyst plane azimuth (0 = facing equator, + = toward west;
+        degrees), by default 0.
+    end : str, optional
+        Row end the sensor is beyond, see calc_end_azimuth. By default
+        'east'.
+    skip_night : bool, optional
+        If True, rows with HSol <= 0 are not evaluated and are set to
+        night_fill. By default False.
+    night_fill : float or dict[str, float], optional
+        Value(s) for night rows when skip_night is True, as in
+        outboard_sat.calc_E_rear. By default 0.0.
+    psi_method : str, optional
+        See outboard_sat.calc_psi, by default None.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns as in outboard_sat.E_rear_columns.
+    """
+    inputs = {
+        'AzSol': AzSol
+        , 'HSol': HSol
+        , 'GlobHor': GlobHor
+        , 'GlobGnd': GlobGnd
+        , 'BkVFLss': BkVFLss
+        , 'DifSBak': DifSBak
+        , 'BmIncBk': BmIncBk
+        , 'NearAlbedo': NearAlbedo}
+    arrays = {
+        k: (
+            v.to_numpy(dtype=float)
+            if isinstance(v, pd.Series)
+            else v)
+        for k, v in inputs.items()}
+    values = calc_E_rear_ndarray(
+        height=height
+        , offset=offset
+        , tilt=tilt
+        , GCR=GCR
+        , plane_azimuth=plane_azimuth
+        , end=end
+        , columns=E_rear_columns
+        , skip_night=skip_night
+        , night_fill=night_fill
+        , psi_method=psi_method
+        , **arrays)
+    return pd.DataFrame(values, index=HSol.index)
@@ -0,0 +1,338 @@
+# outboard_mc.py
+"""Monte Carlo ray casting reference for outboard sensor view factors.
+
+Rays are sampled from the cosine-weighted hemisphere behind the rear
+face of an outboard sensor and traced against a block of tracker rows
+and the ground plane. Each ray ends on the sky, on a row, on ground in
+the beam shadow of the rows, or on sunlit ground, and the fraction of
+rays in each class estimates the corresponding view factor.
+
+Coordinates follow outboard_sat.calc_gnd_view_factors: x east, y north
+(away from the equator), z up. Row k is a flat strip of width
+GCR * pitch centered on the torque tube at (k * pitch, y, height) for
+0 <= y <= row_length, rotated by PhiAng about the torque tube. The
+sensor is at (0, -offset, height) facing the rear normal
+(sin(PhiAng), 0, -cos(PhiAng)).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from dataclasses import dataclass, asdict
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+from . import outboard_sat
+
+
+mc_classes = ('sky', 'row', 'shaded', 'unshaded')
+
+# minimum ray parameter, avoids hitting the surface a ray starts on
+_t_min = 1e-9
+
+
+@dataclass(frozen=True)
+class MCCase:
+    """Geometry and sun position for one Monte Carlo evaluation.
+
+    Parameters
+    ----------
+    AzSol : float
+        Sun azimuth relative to direction toward equator (degrees).
+    HSol : float
+        Sun elevation (degrees).
+    PhiAng : float
+        Tracker rotation (+ = tilt toward west; degrees).
+    height : float
+        Height of torque tube and sensor (m).
+    offset : float
+        Horizontal distance from row ends to sensor (m).
+    GCR : float
+        Ground coverage ratio. (unitless)
+    pitch : float
+        Row spacing (m).
+    n_rows : int, optional
+        Rows on each side of the sensor's row, by default 10. Zero
+        rows means only the sensor's own row; negative removes all
+        rows (useful to check the rotation factor alone).
+    row_length : float, optional
+        Length of rows north of the row ends (m), by default 1000.
+    """
+    AzSol: float
+    HSol: float
+    PhiAng: float
+    height: float
+    offset: float
+    GCR: float
+    pitch: float
+    n_rows: int = 10
+    row_length: float = 1000.0
+
+
+def cases_from_frame(df: pd.DataFrame) -> list[MCCase]:
+    """Build cases from a dataframe with MCCase field names as columns."""
+    return [MCCase(**row) for row in df.to_dict(orient='records')]
+
+
+def sample_rear_rays(
+    rng: np.random.Generator
+    , n_rays: int
+    , PhiAng: float
+) -> np.ndarray:
+    """Sample cosine-weighted directions about the rear normal.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+        Random number source.
+    n_rays : int
+        Number of directions.
+    PhiAng : float
+        Tracker rotation (degrees).
+
+    Returns
+    -------
+    np.ndarray
+        Unit direction vectors, shape (n_rays, 3).
+    """
+    # uniform on the unit disk, lifted onto the hemisphere (Malley)
+    r = np.sqrt(rng.random(n_rays))
+    theta = 2.0 * np.pi * rng.random(n_rays)
+    u = r * np.cos(theta)
+    v = r * np.sin(theta)
+    w = np.sqrt(np.maximum(1.0 - r * r, 0.0))
+    PhiAng_rad = np.deg2rad(PhiAng)
+    s = np.sin(PhiAng_rad)
+    c = np.cos(PhiAng_rad)
+    return np.stack([u * c + w * s, v, u * s - w * c], axis=1)
+
+
+def _row_hit(
+    origin: np.ndarray
+    , direction: np.ndarray
+    , case: MCCase
+    , t_max: np.ndarray
+) -> np.ndarray:
+    """Identify rays hitting any row strip at 0 < t < t_max."""
+    hit = np.zeros(len(direction), dtype=bool)
+    if case.n_rows < 0:
+        return hit
+    PhiAng_rad = np.deg2rad(case.PhiAng)
+    across = np.array([np.cos(PhiAng_rad), 0.0, np.sin(PhiAng_rad)])
+    normal = np.array([-np.sin(PhiAng_rad), 0.0, np.cos(PhiAng_rad)])
+    half_width = 0.5 * case.GCR * case.pitch
+    d_n = direction @ normal
+    d_a = direction @ across
+    o_y = origin[:, 1] if 2 == origin.ndim else origin[1]
+    d_y = direction[:, 1]
+    parallel = np.abs(d_n) < 1e-15
+    d_n = np.where(parallel, 1.0, d_n)
+    for k in range(-case.n_rows, case.n_rows + 1):
+        center = np.array([k * case.pitch, 0.0, case.height])
+        rel = center - origin
+        t = (rel @ normal) / d_n
+        # position across the strip and along the row at the hit
+        a = t * d_a - rel @ across
+        y = o_y + t * d_y
+        hit |= (
+            ~parallel
+            & (_t_min < t) & (t < t_max)
+            & (np.abs(a) <= half_width)
+            & (0.0 <= y) & (y <= case.row_length))
+    return hit
+
+
+def classify_rays(
+    case: MCCase
+    , direction: np.ndarray
+) -> np.ndarray:
+    """Classify rays from the sensor into mc_classes.
+
+    Parameters
+    ----------
+    case : MCCase
+        Geometry and sun position.
+    direction : np.ndarray
+        Unit ray directions, shape (n, 3).
+
+    Returns
+    -------
+    np.ndarray
+        Index into mc_classes for each ray.
+    """
+    origin = np.array([0.0, -case.offset, case.height])
+    d_z = direction[:, 2]
+    down = d_z < 0.0
+    t_gnd = np.where(down, case.height / np.where(down, -d_z, 1.0), np.inf)
+    row = _row_hit(origin, direction, case, t_max=t_gnd)
+    result = np.where(row, 1, np.where(down, 3, 0))
+    gnd = down & ~row
+    HSol_rad = np.deg2rad(case.HSol)
+    if gnd.any() and 0.0 < HSol_rad:
+        AzSol_rad = np.deg2rad(case.AzSol)
+        sun = np.array([
+            -np.sin(AzSol_rad) * np.cos(HSol_rad)
+            , -np.cos(AzSol_rad) * np.cos(HSol_rad)
+            , np.sin(HSol_rad)])
+        gnd_points = origin + t_gnd[gnd, np.newaxis] * direction[gnd]
+        shaded = _row_hit(
+            gnd_points
+            , np.broadcast_to(sun, gnd_points.shape)
+            , case
+            , t_max=np.full(len(gnd_points), np.inf))
+        result[np.flatnonzero(gnd)[shaded]] = 2
+    return result
+
+
+def _count_chunk(
+    case: MCCase
+    , n_rays: int
+    , seed: np.random.SeedSequence
+) -> np.ndarray:
+    """Count rays per class for one chunk (runs in worker processes)."""
+    rng = np.random.default_rng(seed)
+    classes = classify_rays(case, sample_rear_rays(rng, n_rays, case.PhiAng))
+    return np.bincount(classes, minlength=len(mc_classes))
+
+
+def run_monte_carlo(
+    cases: Iterable[MCCase] | pd.DataFrame
+    , n_rays: int = 1_000_000
+    , chunk_rays: int = 100_000
+    , seed: Optional[int] = None
+    , target_se: Optional[float] = None
+    , max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """Estimate view fractions for many cases with ray casting.
+
+    Chunks of rays are distributed over a process pool, each with its
+    own stream spawned from one np.random.SeedSequence so that results
+    are reproducible for a given seed regardless of scheduling.
+
+    Parameters
+    ----------
+    cases : Iterable[MCCase] or pd.DataFrame
+        Cases to evaluate, or a dataframe with MCCase field names as
+        columns (see cases_from_frame).
+    n_rays : int, optional
+        Maximum rays per case, by default 1,000,000.
+    chunk_rays : int, optional
+        Rays per work item, by default 100,000.
+    seed : int, optional
+        Entropy for the SeedSequence, by default None (fresh entropy).
+    target_se : float, optional
+        Stop adding chunks for a case once the largest standard error
+        of its fractions is below this value, by default None (always
+        cast n_rays).
+    max_workers : int, optional
+        Worker processes, by default None (the ProcessPoolExecutor
+        default). 1 evaluates in the calling process. Workers are
+        started with the 'spawn' method.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per case with the case fields, F_<class> for each of
+        mc_classes (cosine-weighted view fractions summing to 1),
+        se_<class> standard errors, 'n_rays' and 'converged' (True
+        when target_se was reached or not requested).
+    """
+    _cases = (
+        cases_from_frame(cases)
+        if isinstance(cases, pd.DataFrame)
+        else list(cases))
+    seed_seq = np.random.SeedSequence(seed)
+    case_seeds = seed_seq.spawn(len(_cases))
+    n_chunks = -(-n_rays // chunk_rays)
+    chunk_seeds = [ss.spawn(n_chunks) for ss in case_seeds]
+    counts = np.zeros((len(_cases), len(mc_classes)), dtype=np.int64)
+    done = np.zeros(len(_cases), dtype=bool)
+    executor = (
+        None
+        if 1 == max_workers
+        else ProcessPoolExecutor(
+            max_workers=max_workers
+            # forked workers can deadlock on numba/BLAS thread pools
+            , mp_context=multiprocessing.get_context('spawn')))
+    try:
+        for chunk in range(n_chunks):
+            active = np.flatnonzero(~done)
+            if 0 == len(active):
+                break
+            rays = min(chunk_rays, n_rays - chunk * chunk_rays)
+            args = [
+                (_cases[i], rays, chunk_seeds[i][chunk])
+                for i in active]
+            if executor is None:
+                results = [_count_chunk(*a) for a in args]
+            else:
+                results = list(executor.map(_count_chunk, *zip(*args)))
+            counts[active] += np.array(results)
+            if target_se is not None:
+                se = _standard_error(counts[active])
+                done[active] = se.max(axis=1) < target_se
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    total = counts.sum(axis=1)
+    fractions = counts / total[:, np.newaxis]
+    se = _standard_error(counts)
+    result = pd.DataFrame([asdict(case) for case in _cases])
+    for j, name in enumerate(mc_classes):
+        result['F_' + name] = fractions[:, j]
+    for j, name in enumerate(mc_classes):
+        result['se_' + name] = se[:, j]
+    result['n_rays'] = total
+    result['converged'] = done if target_se is not None else True
+    return result
+
+
+def _standard_error(counts: np.ndarray) -> np.ndarray:
+    """Binomial standard error of class fractions from counts."""
+    total = counts.sum(axis=1, keepdims=True)
+    p = counts / total
+    return np.sqrt(p * (1.0 - p) / total)
+
+
+def compare_outboard_sat(mc_result: pd.DataFrame) -> pd.DataFrame:
+    """Add outboard_sat approximations next to Monte Carlo fractions.
+
+    Parameters
+    ----------
+    mc_result : pd.DataFrame
+        Result of run_monte_carlo.
+
+    Returns
+    -------
+    pd.DataFrame
+        mc_result with added columns 'W' and 'rot' (closed form W and
+        rotation factor), 'F_unshaded_closed_form' (W * rot),
+        'F_ground_closed_form' (rot) and 'F_unshaded_polygon' (from
+        outboard_sat.calc_gnd_view_factors), and 'F_ground' (sum of the
+        Monte Carlo ground fractions).
+    """
+    result = mc_result.copy()
+    AzSol_rad = np.deg2rad(result['AzSol'].to_numpy())
+    HSol_rad = np.deg2rad(result['HSol'].to_numpy())
+    phi_rad = np.arccos(outboard_sat.calc_cosphi_trig(
+        cos_AzSol=np.cos(AzSol_rad)
+        , cos_HSol=np.cos(HSol_rad)))
+    result['W'] = outboard_sat.calc_W(
+        outboard_sat.calc_psi(
+            phi_rad
+            , height=result['height'].to_numpy()
+            , offset=result['offset'].to_numpy()
+            , backend='numpy')
+        , backend='numpy')
+    result['rot'] = 0.5 * (1.0 + np.cos(np.deg2rad(result['PhiAng'])))
+    result['F_unshaded_closed_form'] = result['W'] * result['rot']
+    result['F_ground_closed_form'] = result['rot']
+    result['F_unshaded_polygon'] = outboard_sat.calc_gnd_view_factors(
+        AzSol=result['AzSol'].to_numpy()
+        , HSol=result['HSol'].to_numpy()
+        , PhiAng=result['PhiAng'].to_numpy()
+        , height=result['height'].to_numpy()
+        , offset=result['offset'].to_numpy()
+        , GCR=result['GCR'].to_numpy()
+        , pitch=result['pitch'].to_numpy())[0]
+    result['F_ground'] = result['F_shaded'] + result['F_unshaded']
+    return result
@@ -1,10 +1,86 @@
 # outboard_sat.py
 
+from dataclasses import dataclass, field, replace
+import functools
+import math
+from types import SimpleNamespace
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
 import numpy as np
 import pandas as pd
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
 
 
-def calc_cosphi(AzSol_rad: pd.Series, HSol_rad: pd.Series) -> pd.Series:
+E_rear_columns = ('phi_rad', 'psi_rad', 'W', 'E_gnd_rear', 'E_rear')
+
+# 'numpy', 'numba', or 'auto' (numba if installed, otherwise numpy);
+# numba is opt-in because its JIT and cache loading costs are not
+# recovered at typical hourly data sizes
+default_backend = 'numpy'
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Identify the computational backend to use.
+
+    Parameters
+    ----------
+    backend : str, optional
+        One of 'numpy', 'numba' or 'auto', by default None (use the
+        module variable default_backend). 'auto' selects 'numba' when
+        the numba package is installed and falls back to 'numpy'
+        otherwise.
+
+    Returns
+    -------
+    str
+        'numpy' or 'numba'.
+    """
+    _backend = default_backend if backend is None else backend
+    if 'auto' == _backend:
+        return 'numpy' if numba is None else 'numba'
+    elif 'numba' == _backend:
+        if numba is None:
+            raise ImportError(
+                'The numba backend requires the numba package.')
+        return _backend
+    elif 'numpy' == _backend:
+        return _backend
+    raise ValueError(f'Unknown backend "{backend}" in resolve_backend.')
+
+
+# 'atan2' or 'arccos', see calc_psi
+default_psi_method = 'atan2'
+
+
+def resolve_psi_method(psi_method: Optional[str] = None) -> str:
+    """Identify the formulation of psi to use.
+
+    Parameters
+    ----------
+    psi_method : str, optional
+        One of 'atan2' or 'arccos', by default None (use the module
+        variable default_psi_method).
+
+    Returns
+    -------
+    str
+        'atan2' or 'arccos'.
+    """
+    _psi_method = default_psi_method if psi_method is None else psi_method
+    if _psi_method not in ('atan2', 'arccos'):
+        raise ValueError(
+            f'Unknown psi_method "{psi_method}" in resolve_psi_method.')
+    return _psi_method
+
+
+def calc_cosphi(
+    AzSol_rad: pd.Series
+    , HSol_rad: pd.Series
+    , backend: Optional[str] = None
+    , slope_ns_rad: Optional[float | np.ndarray] = None
+) -> pd.Series:
     """Calculate cosine of north-south shade angle.
 
     Compute cosine of projected angle from south edge of tracker to ground
@@ -12,7 +88,14 @@ def calc_cosphi(AzSol_rad: pd.Series, HSol_rad: pd.Series) -> pd.Series:
     zenith direction.
 
     Shade line is approximated as due east-west, even though roll of the
-    tracker causes a zig-zag shape.
+    tracker causes a zig-zag shape (see calc_gnd_view_factors for the
+    numerically integrated alternative).
+
+    On ground sloped north-south the tracker axis is assumed to follow
+    the slope, so the whole scene is rotated about an east-west axis
+    until the ground is level and phi is measured in that frame:
+    cos(phi) = cos(slope) * cos(AzSol) * cos(HSol)
+    - sin(slope) * sin(HSol).
 
     Parameters
     ----------
@@ -20,13 +103,29 @@ def calc_cosphi(AzSol_rad: pd.Series, HSol_rad: pd.Series) -> pd.Series:
         PVsyst sun azimuth angle values (radians)
     HSol_rad : pd.Series
         PVsyst sun elevation angle values (radians)
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
+    slope_ns_rad : float or np.ndarray, optional
+        Ground slope along the tracker axis, positive where the ground
+        rises away from the equator (from the sensor toward the far end
+        of the row). By default None (flat ground). (radians)
 
     Returns
     -------
     pd.Series
         Values of cosine of shade angle.
     """
-    return np.cos(AzSol_rad) * np.cos(HSol_rad)
+    if slope_ns_rad is not None:
+        return calc_cosphi_trig(
+            cos_AzSol=np.cos(AzSol_rad)
+            , cos_HSol=np.cos(HSol_rad)
+            , sin_HSol=np.sin(HSol_rad)
+            , slope_ns_rad=slope_ns_rad)
+    if 'numba' == resolve_backend(backend):
+        return _numba_kernels().cosphi(AzSol_rad, HSol_rad)
+    return calc_cosphi_trig(
+        cos_AzSol=np.cos(AzSol_rad)
+        , cos_HSol=np.cos(HSol_rad))
 
 
 def calc_betasun(AzSol_rad: pd.Series, HSol_rad: pd.Series) -> pd.Series:
@@ -53,6 +152,326 @@ def calc_betasun(AzSol_rad: pd.Series, HSol_rad: pd.Series) -> pd.Series:
         , np.sin(HSol_rad))
 
 
+@dataclass
+class SunGeometry:
+    """Precomputed sun position terms for one site and time index.
+
+    Variants and sensor offsets simulated with the same met file share
+    the same sun path, so the transcendental functions of AzSol and HSol
+    (and the shade angle phi derived from them) only need to be
+    evaluated once per site. Build with from_degrees and pass as the
+    sun argument of calc_E_rear and related functions.
+
+    Parameters
+    ----------
+    index : pd.Index or None
+        Time index the arrays correspond to, used to align the geometry
+        to subsets of the data. None if unlabelled.
+    sin_AzSol, cos_AzSol : np.ndarray
+        Sine and cosine of PVsyst sun azimuth.
+    sin_HSol, cos_HSol : np.ndarray
+        Sine and cosine of PVsyst sun elevation.
+    cos_phi, sin_phi : np.ndarray
+        Cosine and sine of the north-south shade angle (see calc_cosphi).
+    phi_rad : np.ndarray
+        North-south shade angle (radians).
+    """
+    index: Optional[pd.Index]
+    sin_AzSol: np.ndarray
+    cos_AzSol: np.ndarray
+    sin_HSol: np.ndarray
+    cos_HSol: np.ndarray
+    cos_phi: np.ndarray
+    sin_phi: np.ndarray
+    phi_rad: np.ndarray
+    _daylight: Optional[
+        tuple[np.ndarray, np.ndarray, 'SunGeometry']] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_degrees(
+        cls
+        , AzSol: pd.Series | np.ndarray
+        , HSol: pd.Series | np.ndarray
+    ) -> 'SunGeometry':
+        """Build sun geometry from PVsyst AzSol and HSol.
+
+        Parameters
+        ----------
+        AzSol : pd.Series or np.ndarray
+            Sun azimuth relative to direction toward equator (degrees).
+        HSol : pd.Series or np.ndarray
+            Sun "height" above horizon (elevation; degrees).
+
+        Returns
+        -------
+        SunGeometry
+            Precomputed terms, labelled with the index of AzSol if it
+            has one.
+        """
+        AzSol_rad = np.deg2rad(np.asarray(AzSol, dtype=float))
+        HSol_rad = np.deg2rad(np.asarray(HSol, dtype=float))
+        cos_AzSol = np.cos(AzSol_rad)
+        cos_HSol = np.cos(HSol_rad)
+        cos_phi = calc_cosphi_trig(cos_AzSol=cos_AzSol, cos_HSol=cos_HSol)
+        return cls(
+            index=getattr(AzSol, 'index', None)
+            , sin_AzSol=np.sin(AzSol_rad)
+            , cos_AzSol=cos_AzSol
+            , sin_HSol=np.sin(HSol_rad)
+            , cos_HSol=cos_HSol
+            , cos_phi=cos_phi
+            , sin_phi=np.sqrt(1.0 - cos_phi * cos_phi)
+            , phi_rad=np.arccos(cos_phi))
+
+    def _map_arrays(
+        self
+        , fun: Callable[[np.ndarray], np.ndarray]
+        , index: Optional[pd.Index]
+    ) -> 'SunGeometry':
+        return replace(
+            self
+            , index=index
+            , sin_AzSol=fun(self.sin_AzSol)
+            , cos_AzSol=fun(self.cos_AzSol)
+            , sin_HSol=fun(self.sin_HSol)
+            , cos_HSol=fun(self.cos_HSol)
+            , cos_phi=fun(self.cos_phi)
+            , sin_phi=fun(self.sin_phi)
+            , phi_rad=fun(self.phi_rad))
+
+    def align(self, index: pd.Index) -> 'SunGeometry':
+        """Select the rows matching index.
+
+        Parameters
+        ----------
+        index : pd.Index
+            Time index of the data to be evaluated. Must be a subset
+            of self.index.
+
+        Returns
+        -------
+        SunGeometry
+            Self if the indexes are already identical, otherwise a new
+            SunGeometry with rows in the order of index.
+        """
+        if self.index is None:
+            raise ValueError(
+                'Cannot align SunGeometry built without an index.')
+        if self.index.equals(index):
+            return self
+        positions = self.index.get_indexer(index)
+        if (positions < 0).any():
+            raise ValueError(
+                'Index values not found in SunGeometry.index.')
+        return self._map_arrays(lambda a: a[positions], index=index)
+
+    def daylight(self) -> tuple[np.ndarray, np.ndarray, 'SunGeometry']:
+        """Select the rows with the sun above the horizon.
+
+        The selection is cached, so repeated evaluations with the same
+        geometry only compress the sun terms once.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, SunGeometry]
+            Positions of the daylight and night rows along the first
+            axis, and the geometry restricted to the daylight rows.
+        """
+        if self._daylight is None:
+            day_rows, night_rows = split_day_rows(self.sin_HSol)
+            self._daylight = (
+                day_rows
+                , night_rows
+                , self._map_arrays(
+                    lambda a: np.take(a, day_rows, axis=0)
+                    , index=(
+                        None
+                        if self.index is None
+                        else self.index[day_rows])))
+        return self._daylight
+
+    def as_column(self) -> 'SunGeometry':
+        """Reshape the terms to (time x 1) for broadcasting."""
+        return self._map_arrays(lambda a: a[:, np.newaxis], index=self.index)
+
+    def on_slope(self, slope_ns_rad: float | np.ndarray) -> 'SunGeometry':
+        """Replace the shade angle terms with those for sloped ground.
+
+        Parameters
+        ----------
+        slope_ns_rad : float or np.ndarray
+            North-south ground slope, see calc_cosphi. An array of
+            per-sensor slopes broadcasts against the time axis like
+            the other sensor parameters. (radians)
+
+        Returns
+        -------
+        SunGeometry
+            New geometry whose cos_phi, sin_phi and phi_rad have the
+            broadcast shape of the time axis and slope_ns_rad.
+        """
+        cos_phi = calc_cosphi_trig(
+            cos_AzSol=self.cos_AzSol
+            , cos_HSol=self.cos_HSol
+            , sin_HSol=self.sin_HSol
+            , slope_ns_rad=slope_ns_rad)
+        return replace(
+            self
+            , cos_phi=cos_phi
+            , sin_phi=np.sqrt(1.0 - cos_phi * cos_phi)
+            , phi_rad=np.arccos(cos_phi))
+
+    @property
+    def betasun(self) -> np.ndarray:
+        """Ideal sun "roll" angle (radians), see calc_betasun."""
+        return np.arctan2(self.sin_AzSol * self.cos_HSol, self.sin_HSol)
+
+
+@dataclass
+class MonthlyValues:
+    """Twelve monthly values of a parameter, such as NearAlbedo.
+
+    calc_E_rear accepts an instance in place of a scalar NearAlbedo (or
+    GCR) and broadcasts it to the timeseries by indexing with the month
+    numbers of the time index, without a per-row lookup. For arrays,
+    compute month_index once and use at().
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values for January through December.
+    """
+    values: np.ndarray
+
+    def __post_init__(self):
+        self.values = np.asarray(self.values, dtype=float)
+        if (12,) != self.values.shape:
+            raise ValueError(
+                'MonthlyValues requires 12 values, got shape '
+                f'{self.values.shape}')
+
+    @staticmethod
+    def month_index(index: pd.DatetimeIndex) -> np.ndarray:
+        """Zero-based month numbers (0 = January) of a time index."""
+        return index.month.to_numpy() - 1
+
+    def at(self, month_index: np.ndarray) -> np.ndarray:
+        """Values for each element of a zero-based month_index array."""
+        return self.values[month_index]
+
+    def expand(self, index: pd.DatetimeIndex) -> pd.Series:
+        """Values for each timestamp in index."""
+        return pd.Series(self.at(self.month_index(index)), index=index)
+
+
+def split_day_rows(sun_height: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Positions of rows with positive and non-positive sun height."""
+    day = sun_height.reshape(sun_height.shape[:1] + (-1,))[:, 0] > 0.0
+    return np.flatnonzero(day), np.flatnonzero(~day)
+
+
+def evaluate_day_rows(
+    evaluate: Callable[..., dict[str, np.ndarray]]
+    , inputs: dict[str, Any]
+    , day_rows: np.ndarray
+    , night_rows: np.ndarray
+    , shapes: dict[str, tuple[int, ...]]
+    , out: Optional[dict[str, np.ndarray]] = None
+    , night_fill: float | dict[str, float] = 0.0
+) -> dict[str, np.ndarray]:
+    """Evaluate only the daylight rows of a calculation.
+
+    Shared by the skip_night handling of calc_E_rear_ndarray and
+    outboard_ft.calc_E_rear_ndarray.
+
+    Parameters
+    ----------
+    evaluate : Callable[..., dict[str, np.ndarray]]
+        Called with the reduced inputs as keyword arguments, returning
+        results keyed by name.
+    inputs : dict[str, Any]
+        Keyword arguments of evaluate. Arrays laid out along the time
+        axis (as many dimensions as the results and more than one row)
+        are reduced to day_rows; other values are passed as given.
+    day_rows, night_rows : np.ndarray
+        Positions along the first axis, e.g. from SunGeometry.daylight.
+    shapes : dict[str, tuple[int, ...]]
+        Full shape of each result.
+    out : dict[str, np.ndarray], optional
+        Preallocated results to write into, by default None (allocated).
+    night_fill : float or dict[str, float], optional
+        Value of night rows, for all results or keyed by result name
+        (missing names get 0.0). By default 0.0.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Full results in the order evaluate returned them. Entries
+        present in out are the same array objects.
+    """
+    _out = {} if out is None else out
+    ndim = max(len(shape) for shape in shapes.values())
+
+    def compress(a):
+        if (
+            a is not None
+            and np.ndim(a) == ndim
+            and 1 < np.shape(a)[0]
+        ):
+            return np.take(a, day_rows, axis=0)
+        return a
+
+    result = evaluate(**{k: compress(v) for k, v in inputs.items()})
+    for col, day_values in result.items():
+        buf = output_buffer(_out, col, shapes[col])
+        buf[night_rows] = (
+            night_fill.get(col, 0.0)
+            if isinstance(night_fill, dict)
+            else night_fill)
+        buf[day_rows] = day_values
+        result[col] = buf
+    return result
+
+
+def calc_cosphi_trig(
+    cos_AzSol: np.ndarray
+    , cos_HSol: np.ndarray
+    , sin_HSol: Optional[np.ndarray] = None
+    , slope_ns_rad: Optional[float | np.ndarray] = None
+) -> np.ndarray:
+    """Calculate cosine of north-south shade angle from trig terms.
+
+    Same as calc_cosphi, for use when the cosines are already known.
+
+    Parameters
+    ----------
+    cos_AzSol : np.ndarray
+        Cosine of PVsyst sun azimuth.
+    cos_HSol : np.ndarray
+        Cosine of PVsyst sun elevation.
+    sin_HSol : np.ndarray, optional
+        Sine of PVsyst sun elevation, required with slope_ns_rad.
+    slope_ns_rad : float or np.ndarray, optional
+        North-south ground slope, see calc_cosphi. By default None
+        (flat ground).
+
+    Returns
+    -------
+    np.ndarray
+        Values of cosine of shade angle.
+    """
+    if slope_ns_rad is None:
+        return cos_AzSol * cos_HSol
+    if sin_HSol is None:
+        raise ValueError('calc_cosphi_trig requires sin_HSol with slope_ns_rad.')
+    return np.clip(
+        np.cos(slope_ns_rad) * cos_AzSol * cos_HSol
+        - np.sin(slope_ns_rad) * sin_HSol
+        , -1.0
+        , 1.0)
+
+
 def calc_psi_atan2(
     phi_rad: pd.Series
     , height: float | pd.Series
@@ -93,10 +512,38 @@ def calc_psi_atan2(
         , offset * s_phi + height * np.cos(phi_rad))
 
 
+def slope_ns_geometry(
+    height: float | np.ndarray
+    , offset: float | np.ndarray
+    , slope_ns_rad: float | np.ndarray
+) -> tuple[float | np.ndarray, float | np.ndarray]:
+    """Express sensor height and offset in the level frame of a slope.
+
+    Parameters
+    ----------
+    height : float or np.ndarray
+        Vertical height of the sensor above the ground below it.
+    offset : float or np.ndarray
+        Horizontal distance from the end of the row to the sensor.
+    slope_ns_rad : float or np.ndarray
+        North-south ground slope, see calc_cosphi. (radians)
+
+    Returns
+    -------
+    tuple
+        Height perpendicular to the ground and offset along the ground.
+    """
+    cos_slope = np.cos(slope_ns_rad)
+    return height * cos_slope, offset / cos_slope
+
+
 def calc_psi(
     phi_rad: pd.Series
     , height: float | pd.Series
     , offset: float | pd.Series
+    , backend: Optional[str] = None
+    , psi_method: Optional[str] = None
+    , slope_ns_rad: Optional[float | np.ndarray] = None
 ) -> pd.Series:
     """Calculate N-S angle from sensor to shade line.
 
@@ -120,6 +567,20 @@ def calc_psi(
         installed. Units conventionally in meters, but may be any units
         as long as they are the same as the units used for the height
         parameter.
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
+    psi_method : str, optional
+        'atan2' (see calc_psi_atan2) or 'arccos' (arccos of the cosine
+        ratio), see resolve_psi_method. By default None. The arccos
+        form loses about half the significant digits as psi approaches
+        0 or pi (the ratio is clipped to [-1, 1] where rounding pushes
+        it past 1, as in the numba backend), while atan2 stays accurate
+        to rounding and is also faster; see benchmarks/psi_method.py.
+    slope_ns_rad : float or np.ndarray, optional
+        North-south ground slope, see calc_cosphi. phi_rad must then be
+        measured on the same slope. height and offset stay vertical and
+        horizontal, and become height * cos(slope) and
+        offset / cos(slope) in the level frame. By default None.
 
     Returns
     -------
@@ -127,6 +588,16 @@ def calc_psi(
         Values of projected angle from sensor to shade line. Projection
         plane contains north-south line and zenith direction. (radians)
     """
+    if slope_ns_rad is not None:
+        height, offset = slope_ns_geometry(height, offset, slope_ns_rad)
+    _psi_method = resolve_psi_method(psi_method)
+    if 'numba' == resolve_backend(backend):
+        kernels = _numba_kernels()
+        if 'atan2' == _psi_method:
+            return kernels.psi_atan2(phi_rad, height, offset)
+        return kernels.psi(phi_rad, height, offset)
+    if 'atan2' == _psi_method:
+        return calc_psi_atan2(phi_rad, height=height, offset=offset)
     s_phi = np.sin(phi_rad)
     c_phi = np.cos(phi_rad)
     o_s_phi = offset * s_phi
@@ -136,10 +607,62 @@ def calc_psi(
         o_s_phi * o_s_phi
         + 2 * h_c_phi * o_s_phi
         + height * height)
-    return np.arccos(num / np.sqrt(den2))
+    return np.arccos(np.clip(num / np.sqrt(den2), -1.0, 1.0))
+
 
+def _psi_derivatives(
+    c_phi: np.ndarray
+    , s_phi: np.ndarray
+    , height
+    , offset
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """psi and its height/offset derivatives from cos and sin of phi."""
+    u = offset * s_phi + height * c_phi
+    h_s_phi = height * s_phi
+    s2_d2 = s_phi * s_phi / (u * u + h_s_phi * h_s_phi)
+    return (
+        np.arctan2(h_s_phi, u)
+        , offset * s2_d2
+        , -height * s2_d2)
 
-def calc_W(psi_rad: pd.Series) -> pd.Series:
+
+def calc_psi_derivatives(
+    phi_rad: pd.Series
+    , height: float | pd.Series
+    , offset: float | pd.Series
+) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Calculate psi and its partial derivatives by height and offset.
+
+    With u = offset * sin(phi) + height * cos(phi) and
+    D^2 = u^2 + (height * sin(phi))^2, psi = atan2(height * sin(phi), u)
+    and
+
+        d psi / d height = offset * sin(phi)^2 / D^2
+        d psi / d offset = -height * sin(phi)^2 / D^2
+
+    Parameters
+    ----------
+    phi_rad : pd.Series
+        Projected angle of shade line. (radians below north horizontal)
+    height : float or pd.Series
+        Height of sensor, as in calc_psi.
+    offset : float or pd.Series
+        Horizontal distance from edge of row to sensor, as in calc_psi.
+
+    Returns
+    -------
+    tuple[pd.Series, pd.Series, pd.Series]
+        psi (radians), d psi / d height and d psi / d offset (radians
+        per unit of height and offset).
+    """
+    return _psi_derivatives(
+        np.cos(phi_rad)
+        , np.sin(phi_rad)
+        , height=height
+        , offset=offset)
+
+
+def calc_W(psi_rad: pd.Series, backend: Optional[str] = None) -> pd.Series:
     """Calculate weight for sensor's view of unshaded ground. 
 
     Before the rotation of the tracker is considered the down-facing
@@ -150,6 +673,8 @@ def calc_W(psi_rad: pd.Series) -> pd.Series:
     ----------
     psi_rad : pd.Series
         Projected angle of shade line (psi) in radians.
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
 
     Returns
     -------
@@ -157,6 +682,8 @@ def calc_W(psi_rad: pd.Series) -> pd.Series:
         Corresponding values of W for each shadeangle value.
         (unitless fraction)
     """
+    if 'numba' == resolve_backend(backend):
+        return _numba_kernels().W(psi_rad)
     return 0.5 * (1 + np.cos(psi_rad))
 
 
@@ -185,8 +712,9 @@ def calc_E_gnd_rear(
     , PhiAng_rad: pd.Series
     , BkVFLss: pd.Series
     , W: pd.Series
-    , albedo_near: float
+    , albedo_near: float | pd.Series | MonthlyValues
     , GCR: float
+    , backend: Optional[str] = None
 ) -> pd.Series:
     """Calculate irradiance on outboard rear sensor from ground.
 
@@ -204,11 +732,15 @@ def calc_E_gnd_rear(
     W : pd.Series
         View factor for unshaded ground with respect to outboard
         rear facing sensor. (unitless fraction)
-    albedo_near : float
-        Ground albedo for bifacial calculations. (unitless fraction)
+    albedo_near : float, pd.Series or MonthlyValues
+        Ground albedo for bifacial calculations, constant or per time.
+        MonthlyValues requires GlobHor to be a Series with a
+        DatetimeIndex. (unitless fraction)
     GCR : float
         Ground cover ratio (tracker row width divided by row pitch).
         (unitless fraction)
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
 
     Returns
     -------
@@ -216,6 +748,11 @@ def calc_E_gnd_rear(
         Irradiance contribution from ground on rear facing outboard sensor.
         (W/m2)
     """
+    if isinstance(albedo_near, MonthlyValues):
+        albedo_near = albedo_near.expand(GlobHor.index)
+    if 'numba' == resolve_backend(backend):
+        return _numba_kernels().E_gnd_rear(
+            GlobHor, GlobGnd, PhiAng_rad, BkVFLss, W, albedo_near, GCR)
     # horizontal combined shaded and unshaded ground
     E_gnd_rear = (
         W * (GlobHor * albedo_near)
@@ -225,11 +762,1022 @@ def calc_E_gnd_rear(
     return E_gnd_rear
 
 
-def calc_E_rear(
+def output_buffer(
+    out: dict[str, np.ndarray]
+    , name: str
+    , shape: tuple[int, ...]
+) -> np.ndarray:
+    """Retrieve a caller-supplied output buffer or allocate a new one."""
+    if name in out:
+        buf = out[name]
+        if buf.shape != shape:
+            raise ValueError(
+                f'Output buffer "{name}" has shape {buf.shape} '
+                f'but {shape} is required.')
+        return buf
+    return np.empty(shape)
+
+
+def _interp_uniform(
+    x: np.ndarray
+    , x0: float
+    , dx: float
+    , y: np.ndarray
+    , out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Linear interpolation on a uniform grid without a search."""
+    t = np.subtract(x, x0)
+    t *= 1.0 / dx
+    np.clip(t, 0.0, len(y) - 1, out=t)
+    i = np.minimum(t.astype(np.intp), len(y) - 2)
+    t -= i
+    y_i = y[i]
+    t *= y[i + 1] - y_i
+    return np.add(y_i, t, out=out)
+
+
+def _interp_uniform_2d(
+    x: np.ndarray
+    , x0: float
+    , dx: float
+    , y: np.ndarray
+    , y0: float
+    , dy: float
+    , z: np.ndarray
+) -> np.ndarray:
+    """Bilinear interpolation on a uniform grid without a search."""
+    x, y = np.broadcast_arrays(x, y)
+    tx = np.clip((x - x0) * (1.0 / dx), 0.0, z.shape[0] - 1)
+    ty = np.clip((y - y0) * (1.0 / dy), 0.0, z.shape[1] - 1)
+    i = np.minimum(tx.astype(np.intp), z.shape[0] - 2)
+    j = np.minimum(ty.astype(np.intp), z.shape[1] - 2)
+    tx -= i
+    ty -= j
+    z_lo = z[i, j] + ty * (z[i, j + 1] - z[i, j])
+    z_hi = z[i + 1, j] + ty * (z[i + 1, j + 1] - z[i + 1, j])
+    return z_lo + tx * (z_hi - z_lo)
+
+
+@dataclass
+class ViewFactorTable:
+    """Tabulated view factors for one fixed sensor geometry.
+
+    For a given height and offset, W depends only on the shade angle phi
+    and the rotation factor 0.5 * (1 + cos(PhiAng)) only on the tracker
+    rotation, so both can be tabulated once and linearly interpolated
+    (see calc_E_rear_ndarray, vf_table parameter). Optionally the
+    combined ground factor W * rotation factor is tabulated over
+    phi x PhiAng so neither factor is evaluated at run time, though
+    bilinear interpolation costs more than the cosine it replaces; the
+    1-D W table is the faster option.
+
+    Build with ViewFactorTable.build rather than directly.
+
+    Parameters
+    ----------
+    height : float
+        Height of outboard sensor at axis of torque tube (m).
+    offset : float
+        Horizontal distance from edge of array to sensor (m).
+    phi_grid : np.ndarray
+        Uniformly spaced phi values from 0 to pi (radians).
+    W : np.ndarray
+        W at each phi_grid value.
+    PhiAng_grid : np.ndarray or None
+        Uniformly spaced tracker rotation values (radians), or None if
+        only W is tabulated.
+    rotation_factor : np.ndarray or None
+        0.5 * (1 + cos(PhiAng)) at each PhiAng_grid value.
+    gnd_factor : np.ndarray or None
+        W * rotation factor, shape (len(phi_grid), len(PhiAng_grid)).
+    """
     height: float
-    , offset: float
-    , AzSol: pd.Series
-    , HSol: pd.Series
+    offset: float
+    phi_grid: np.ndarray
+    W: np.ndarray
+    PhiAng_grid: Optional[np.ndarray] = None
+    rotation_factor: Optional[np.ndarray] = None
+    gnd_factor: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(
+        cls
+        , height: float
+        , offset: float
+        , n_phi: int = 3601
+        , n_PhiAng: Optional[int] = None
+        , max_PhiAng: float = 90.0
+    ) -> 'ViewFactorTable':
+        """Tabulate W (and optionally the ground factor) for a geometry.
+
+        Parameters
+        ----------
+        height : float
+            Height of outboard sensor at axis of torque tube (m).
+        offset : float
+            Horizontal distance from edge of array to sensor (m).
+        n_phi : int, optional
+            Number of phi grid points over [0, pi], by default 3601.
+        n_PhiAng : int, optional
+            Number of PhiAng grid points over [-max_PhiAng, max_PhiAng].
+            By default None (no PhiAng tabulation).
+        max_PhiAng : float, optional
+            Largest tracker rotation magnitude to tabulate (degrees), by
+            default 90. Rotations outside the range are clamped.
+
+        Returns
+        -------
+        ViewFactorTable
+        """
+        phi_grid = np.linspace(0.0, np.pi, n_phi)
+        W = calc_W(
+            calc_psi(phi_grid, height=height, offset=offset, backend='numpy')
+            , backend='numpy')
+        if n_PhiAng is None:
+            return cls(
+                height=height
+                , offset=offset
+                , phi_grid=phi_grid
+                , W=W)
+        PhiAng_grid = np.deg2rad(np.linspace(-max_PhiAng, max_PhiAng, n_PhiAng))
+        rotation_factor = 0.5 * (1 + np.cos(PhiAng_grid))
+        return cls(
+            height=height
+            , offset=offset
+            , phi_grid=phi_grid
+            , W=W
+            , PhiAng_grid=PhiAng_grid
+            , rotation_factor=rotation_factor
+            , gnd_factor=W[:, np.newaxis] * rotation_factor[np.newaxis, :])
+
+    def check_geometry(self, height, offset) -> None:
+        """Raise ValueError unless height and offset match the table."""
+        if not (
+            np.all(np.asarray(height) == self.height)
+            and np.all(np.asarray(offset) == self.offset)
+        ):
+            raise ValueError(
+                f'ViewFactorTable built for height={self.height}, '
+                f'offset={self.offset} cannot be used for height={height}, '
+                f'offset={offset}.')
+
+    def W_at(
+        self
+        , phi_rad: np.ndarray
+        , out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Interpolate W at shade angles phi_rad (radians)."""
+        return _interp_uniform(
+            phi_rad
+            , self.phi_grid[0]
+            , self.phi_grid[1] - self.phi_grid[0]
+            , self.W
+            , out=out)
+
+    def rotation_factor_at(self, PhiAng_rad: np.ndarray) -> np.ndarray:
+        """Interpolate the rotation factor at PhiAng_rad (radians)."""
+        if self.PhiAng_grid is None or self.rotation_factor is None:
+            raise ValueError('ViewFactorTable has no PhiAng tabulation.')
+        return _interp_uniform(
+            PhiAng_rad
+            , self.PhiAng_grid[0]
+            , self.PhiAng_grid[1] - self.PhiAng_grid[0]
+            , self.rotation_factor)
+
+    def gnd_factor_at(
+        self
+        , phi_rad: np.ndarray
+        , PhiAng_rad: np.ndarray
+    ) -> np.ndarray:
+        """Interpolate W * rotation factor at (phi_rad, PhiAng_rad)."""
+        if self.PhiAng_grid is None or self.gnd_factor is None:
+            raise ValueError('ViewFactorTable has no PhiAng tabulation.')
+        return _interp_uniform_2d(
+            phi_rad
+            , self.phi_grid[0]
+            , self.phi_grid[1] - self.phi_grid[0]
+            , PhiAng_rad
+            , self.PhiAng_grid[0]
+            , self.PhiAng_grid[1] - self.PhiAng_grid[0]
+            , self.gnd_factor)
+
+    @property
+    def error_bound(self) -> dict[str, float]:
+        """Estimated maximum absolute interpolation error.
+
+        Linear interpolation error is bounded by h^2/8 max|f''|, which
+        is estimated from the second differences of the tabulated values
+        as max|second difference|/8 (summed over both axes for the
+        combined ground factor). Steep regions (e.g. large negative
+        offsets, where W changes quickly near small phi) dominate.
+
+        Returns
+        -------
+        dict[str, float]
+            Estimates keyed by 'W', and also 'rotation_factor' and
+            'gnd_factor' when PhiAng is tabulated. (unitless fraction)
+        """
+        result = {'W': float(np.abs(np.diff(self.W, n=2)).max()) / 8}
+        if self.rotation_factor is not None and self.gnd_factor is not None:
+            result['rotation_factor'] = float(
+                np.abs(np.diff(self.rotation_factor, n=2)).max()) / 8
+            result['gnd_factor'] = (
+                float(np.abs(np.diff(self.gnd_factor, n=2, axis=0)).max())
+                + float(np.abs(np.diff(self.gnd_factor, n=2, axis=1)).max())
+            ) / 8
+        return result
+
+    def save(self, fname) -> None:
+        """Save the table to a .npz file.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path
+            Destination file name.
+        """
+        arrays = {
+            k: v
+            for k, v in (
+                ('PhiAng_grid', self.PhiAng_grid)
+                , ('rotation_factor', self.rotation_factor)
+                , ('gnd_factor', self.gnd_factor))
+            if v is not None}
+        np.savez(
+            fname
+            , height=self.height
+            , offset=self.offset
+            , phi_grid=self.phi_grid
+            , W=self.W
+            , **arrays)
+
+    @classmethod
+    def load(cls, fname) -> 'ViewFactorTable':
+        """Load a table saved with ViewFactorTable.save.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path
+            Name of .npz file.
+
+        Returns
+        -------
+        ViewFactorTable
+        """
+        with np.load(fname) as npz:
+            return cls(
+                height=float(npz['height'])
+                , offset=float(npz['offset'])
+                , phi_grid=npz['phi_grid']
+                , W=npz['W']
+                , PhiAng_grid=npz.get('PhiAng_grid')
+                , rotation_factor=npz.get('rotation_factor')
+                , gnd_factor=npz.get('gnd_factor'))
+
+
+fidelity_levels = ('closed_form', 'shade_polygon')
+
+# quadrature points over the sensor view for fidelity='shade_polygon'
+default_quadrature_points = 1024
+
+
+def _sunflower_disk(n_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Evenly spread points on the unit disk (Vogel's sunflower)."""
+    k = np.arange(n_points) + 0.5
+    r = np.sqrt(k / n_points)
+    theta = k * (np.pi * (3.0 - np.sqrt(5.0)))
+    return r * np.cos(theta), r * np.sin(theta)
+
+
+def _gnd_view_factors_rows(
+    sin_AzSol: np.ndarray
+    , cos_AzSol: np.ndarray
+    , sin_HSol: np.ndarray
+    , cos_HSol: np.ndarray
+    , PhiAng: np.ndarray
+    , height: np.ndarray
+    , offset: np.ndarray
+    , GCR: np.ndarray
+    , pitch: np.ndarray
+    , disk_u: np.ndarray
+    , disk_v: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """View factors for 1-d inputs, quadrature points along axis 1."""
+    col = lambda a: a[:, np.newaxis]  # noqa: E731
+    theta = np.deg2rad(PhiAng)
+    s_theta = col(np.sin(theta))
+    c_theta = col(np.cos(theta))
+    h = col(height)
+    # cosine-weighted directions about the rear normal (sin, 0, -cos)
+    disk_w = np.sqrt(np.maximum(1.0 - disk_u * disk_u - disk_v * disk_v, 0.0))
+    d_x = disk_u * c_theta + disk_w * s_theta
+    d_z = disk_u * s_theta - disk_w * c_theta
+    gnd = d_z < 0.0
+    t = np.divide(h, -d_z, out=np.zeros(d_z.shape), where=gnd)
+    g_x = t * d_x
+    g_y = t * disk_v - col(offset)
+    # row-end edge from w = -B/2 to +B/2 across the tilted module,
+    # shadowed along the sun vector (east, north, up)
+    s_x = -sin_AzSol * cos_HSol
+    s_y = -cos_AzSol * cos_HSol
+    day = sin_HSol > 0.0
+    s_z = np.where(day, sin_HSol, 1.0)
+    half_width = 0.5 * GCR * pitch
+    c_th = np.cos(theta)
+    s_th = np.sin(theta)
+    ends = []
+    for w in (-half_width, half_width):
+        z_edge = height + w * s_th
+        ends.append((
+            w * c_th - z_edge * s_x / s_z
+            , -z_edge * s_y / s_z))
+    (x_a, y_a), (x_b, y_b) = ends
+    swap = x_b < x_a
+    x_a, x_b = np.where(swap, x_b, x_a), np.where(swap, x_a, x_b)
+    y_a, y_b = np.where(swap, y_b, y_a), np.where(swap, y_a, y_b)
+    # sawtooth boundary: along each shadowed row end, then across the
+    # gap to the next row end one pitch over
+    seg = np.clip(x_b - x_a, 1e-12 * pitch, pitch)
+    gap = np.maximum(pitch - seg, 1e-12 * pitch)
+    phase = np.mod(g_x - col(x_a), col(pitch))
+    along = phase < col(seg)
+    y_edge = np.where(
+        along
+        , col(y_a) + col((y_b - y_a) / seg) * phase
+        , col(y_b) + col((y_a - y_b) / gap) * (phase - col(seg)))
+    unshd = gnd & ((g_y < y_edge) | col(~day))
+    n_points = len(disk_u)
+    F_unshd = unshd.sum(axis=1) / n_points
+    F_shd = gnd.sum(axis=1) / n_points - F_unshd
+    return F_unshd, F_shd
+
+
+def calc_gnd_view_factors(
+    AzSol: Optional[np.ndarray]
+    , HSol: Optional[np.ndarray]
+    , PhiAng: np.ndarray
+    , height: float | np.ndarray
+    , offset: float | np.ndarray
+    , GCR: float | np.ndarray
+    , pitch: float | np.ndarray
+    , sun: Optional[SunGeometry] = None
+    , quadrature_points: Optional[int] = None
+    , chunk_size: int = 1024
+) -> tuple[np.ndarray, np.ndarray]:
+    """Calculate the sensor's view of unshaded and shaded ground.
+
+    Higher fidelity counterpart of rot * W and rot * (1 - W) in
+    calc_E_gnd_rear. Instead of an east-west shade line and a separate
+    rotation wedge, the ground south of the sawtooth shadow edge cast
+    by the (tilted) ends of the tracker rows is unshaded, and the
+    ground north of it carries the row-averaged shaded irradiance. The
+    cosine-weighted view from the tilted rear face is integrated with
+    quadrature_points directions mapped from a sunflower pattern on the
+    unit disk (Malley's method), so the error decreases roughly as
+    1 / quadrature_points. Rows are assumed not to block the sensor's
+    view of the ground.
+
+    Coordinates are x east, y north (away from the equator), z up, with
+    the sensor at (0, -offset, height) off the end of the row at x = 0.
+    The sun vector is (-sin(AzSol) cos(HSol), -cos(AzSol) cos(HSol),
+    sin(HSol)) and the rear normal (sin(PhiAng), 0, -cos(PhiAng)).
+
+    Parameters
+    ----------
+    AzSol, HSol, PhiAng : np.ndarray
+        Sun azimuth and elevation and tracker rotation (degrees), as
+        in calc_E_rear. AzSol and HSol may be None if sun is supplied.
+    height, offset, GCR : float or np.ndarray
+        As in calc_E_rear.
+    pitch : float or np.ndarray
+        Row spacing, in the units of height and offset.
+    sun : SunGeometry, optional
+        Precomputed sun terms, by default None.
+    quadrature_points : int, optional
+        Number of view directions, by default None (module variable
+        default_quadrature_points).
+    chunk_size : int, optional
+        Number of broadcast elements evaluated together, bounding
+        temporary memory to chunk_size x quadrature_points. By default
+        1024.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        View factors of unshaded and of shaded ground from the rear
+        face, with the broadcast shape of the inputs. Their sum is the
+        rotation factor 0.5 * (1 + cos(PhiAng)) up to quadrature error.
+        (unitless fractions)
+    """
+    n_points = (
+        default_quadrature_points
+        if quadrature_points is None
+        else quadrature_points)
+    if sun is None:
+        AzSol_rad = np.deg2rad(np.asarray(AzSol, dtype=float))
+        HSol_rad = np.deg2rad(np.asarray(HSol, dtype=float))
+        sun_terms = (
+            np.sin(AzSol_rad), np.cos(AzSol_rad)
+            , np.sin(HSol_rad), np.cos(HSol_rad))
+    else:
+        sun_terms = (sun.sin_AzSol, sun.cos_AzSol, sun.sin_HSol, sun.cos_HSol)
+    inputs = np.broadcast_arrays(
+        *sun_terms
+        , *(
+            np.asarray(a, dtype=float)
+            for a in (PhiAng, height, offset, GCR, pitch)))
+    shape = inputs[0].shape
+    flat = [np.ravel(a) for a in inputs]
+    disk_u, disk_v = _sunflower_disk(n_points)
+    F_unshd = np.empty(flat[0].shape)
+    F_shd = np.empty(flat[0].shape)
+    for start in range(0, len(F_unshd), chunk_size):
+        rows = slice(start, start + chunk_size)
+        F_unshd[rows], F_shd[rows] = _gnd_view_factors_rows(
+            *(a[rows] for a in flat)
+            , disk_u=disk_u
+            , disk_v=disk_v)
+    return F_unshd.reshape(shape), F_shd.reshape(shape)
+
+
+@functools.cache
+def _numba_kernels() -> SimpleNamespace:
+    """Compile (or load from cache) the numba backend kernels."""
+    f8 = 'float64('
+    vectorize = functools.partial(
+        numba.vectorize, target='parallel', cache=True)
+
+    @vectorize([f8 + ', '.join(['float64'] * 2) + ')'])
+    def cosphi(AzSol_rad, HSol_rad):
+        return math.cos(AzSol_rad) * math.cos(HSol_rad)
+
+    @numba.njit(inline='always')
+    def cos_psi(c_phi, s_phi, height, offset):
+        num = offset * s_phi + height * c_phi
+        ratio = num / math.hypot(num, height * s_phi)
+        return min(max(ratio, -1.0), 1.0)
+
+    @vectorize([f8 + ', '.join(['float64'] * 3) + ')'])
+    def psi(phi_rad, height, offset):
+        return math.acos(
+            cos_psi(math.cos(phi_rad), math.sin(phi_rad), height, offset))
+
+    @vectorize([f8 + ', '.join(['float64'] * 3) + ')'])
+    def psi_atan2(phi_rad, height, offset):
+        s_phi = math.sin(phi_rad)
+        return math.atan2(
+            height * s_phi, offset * s_phi + height * math.cos(phi_rad))
+
+    @vectorize([f8 + 'float64)'])
+    def W(psi_rad):
+        return 0.5 * (1.0 + math.cos(psi_rad))
+
+    @numba.njit(inline='always')
+    def gnd_rear(GlobHor, GlobGnd, rot, BkVFLss, W, albedo_near, GCR):
+        gnd_shd = GlobGnd * albedo_near / GCR - BkVFLss
+        return rot * (gnd_shd + W * (GlobHor * albedo_near - gnd_shd))
+
+    @vectorize([f8 + ', '.join(['float64'] * 7) + ')'])
+    def E_gnd_rear(GlobHor, GlobGnd, PhiAng_rad, BkVFLss, W, albedo_near, GCR):
+        return gnd_rear(
+            GlobHor, GlobGnd, 0.5 * (1.0 + math.cos(PhiAng_rad)), BkVFLss
+            , W, albedo_near, GCR)
+
+    @numba.njit(inline='always')
+    def at(a, i, j):
+        # 2-d arrays of extent 1 along an axis broadcast along it
+        return a[min(i, a.shape[0] - 1), min(j, a.shape[1] - 1)]
+
+    @numba.njit(inline='always')
+    def put(a, i, j, value):
+        if 0 < a.shape[0]:
+            a[min(i, a.shape[0] - 1), min(j, a.shape[1] - 1)] = value
+
+    @numba.njit(parallel=True, cache=True)
+    def E_rear(
+        rows, cols, use_sun, sun_height, sun_az, cos_phi, sin_phi, phi_rad
+        , height, offset, PhiAng, GlobHor, GlobGnd, BkVFLss, DifSBak
+        , BmIncBk, GCR, NearAlbedo, skip_night, night_fill, psi_atan2
+        , out_phi, out_psi, out_W, out_E_gnd_rear, out_E_rear
+    ):
+        for k in numba.prange(rows * cols):
+            i = k // cols
+            j = k - i * cols
+            if skip_night and at(sun_height, i, j) <= 0.0:
+                put(out_phi, i, j, night_fill[0])
+                put(out_psi, i, j, night_fill[1])
+                put(out_W, i, j, night_fill[2])
+                put(out_E_gnd_rear, i, j, night_fill[3])
+                put(out_E_rear, i, j, night_fill[4])
+                continue
+            if use_sun:
+                c_phi = at(cos_phi, i, j)
+                s_phi = at(sin_phi, i, j)
+                phi = at(phi_rad, i, j)
+            else:
+                c_phi = (
+                    math.cos(math.radians(at(sun_az, i, j)))
+                    * math.cos(math.radians(at(sun_height, i, j))))
+                s_phi = math.sqrt(1.0 - c_phi * c_phi)
+                phi = math.acos(c_phi) if 0 < out_phi.shape[0] else 0.0
+            height_ij = at(height, i, j)
+            offset_ij = at(offset, i, j)
+            c_psi = cos_psi(c_phi, s_phi, height_ij, offset_ij)
+            W_ij = 0.5 * (1.0 + c_psi)
+            E_gnd_rear_ij = gnd_rear(
+                at(GlobHor, i, j)
+                , at(GlobGnd, i, j)
+                , 0.5 * (1.0 + math.cos(math.radians(at(PhiAng, i, j))))
+                , at(BkVFLss, i, j)
+                , W_ij
+                , at(NearAlbedo, i, j)
+                , at(GCR, i, j))
+            put(out_phi, i, j, phi)
+            if 0 < out_psi.shape[0]:
+                if psi_atan2:
+                    put(
+                        out_psi, i, j
+                        , math.atan2(
+                            height_ij * s_phi
+                            , offset_ij * s_phi + height_ij * c_phi))
+                else:
+                    put(out_psi, i, j, math.acos(c_psi))
+            put(out_W, i, j, W_ij)
+            put(out_E_gnd_rear, i, j, E_gnd_rear_ij)
+            put(
+                out_E_rear, i, j
+                , E_gnd_rear_ij + at(DifSBak, i, j) + at(BmIncBk, i, j))
+
+    return SimpleNamespace(
+        cosphi=cosphi
+        , psi=psi
+        , psi_atan2=psi_atan2
+        , W=W
+        , E_gnd_rear=E_gnd_rear
+        , E_rear=E_rear)
+
+
+def _as_2d(a, ndim: int) -> np.ndarray:
+    """View an array as 2-d following broadcasting against ndim dims."""
+    _a = np.ascontiguousarray(a, dtype=float)
+    if ndim < 2:
+        return _a.reshape((1, 1) if 0 == _a.ndim else (-1, 1))
+    return _a.reshape((1,) * (2 - _a.ndim) + _a.shape)
+
+
+def _calc_E_rear_numba(
+    inputs: dict[str, np.ndarray | float | None]
+    , sun: Optional[SunGeometry]
+    , shapes: dict[str, tuple[int, ...]]
+    , columns: list[str]
+    , out: dict[str, np.ndarray]
+    , skip_night: bool
+    , night_fill: float | dict[str, float]
+    , psi_method: str
+) -> dict[str, np.ndarray]:
+    """Evaluate calc_E_rear_ndarray in one compiled parallel loop."""
+    rear_shape = shapes['E_rear']
+    ndim = len(rear_shape)
+    if 2 < ndim:
+        raise ValueError(
+            'The numba backend supports inputs of at most 2 dimensions.')
+    empty = np.empty((0, 0))
+    if sun is None:
+        sun_terms = (
+            False
+            , _as_2d(inputs['HSol'], ndim)
+            , _as_2d(inputs['AzSol'], ndim)
+            , empty, empty, empty)
+    else:
+        sun_terms = (
+            True
+            , _as_2d(sun.sin_HSol, ndim)
+            , empty
+            , _as_2d(sun.cos_phi, ndim)
+            , _as_2d(sun.sin_phi, ndim)
+            , _as_2d(sun.phi_rad, ndim))
+    result = {}
+    buffers = []
+    for col in E_rear_columns:
+        if col in columns:
+            buf = output_buffer(out, col, shapes[col])
+            result[col] = buf
+            buf2d = _as_2d(buf, ndim)
+            if not np.shares_memory(buf2d, buf):
+                raise ValueError(
+                    f'Output buffer "{col}" must be C-contiguous for the '
+                    'numba backend.')
+            buffers.append(buf2d)
+        else:
+            buffers.append(empty)
+    _numba_kernels().E_rear(
+        *(rear_shape + (1, 1))[:2]
+        , *sun_terms
+        , *[
+            _as_2d(inputs[name], ndim)
+            for name in (
+                'height', 'offset', 'PhiAng', 'GlobHor', 'GlobGnd'
+                , 'BkVFLss', 'DifSBak', 'BmIncBk', 'GCR', 'NearAlbedo')]
+        , skip_night
+        , np.array([
+            night_fill.get(col, 0.0)
+            if isinstance(night_fill, dict)
+            else night_fill
+            for col in E_rear_columns], dtype=float)
+        , 'atan2' == psi_method
+        , *buffers)
+    return {k: result[k] for k in columns}
+
+
+def calc_E_rear_ndarray(
+    height: float | np.ndarray
+    , offset: float | np.ndarray
+    , AzSol: np.ndarray
+    , HSol: np.ndarray
+    , PhiAng: np.ndarray
+    , GlobHor: np.ndarray
+    , GlobGnd: np.ndarray
+    , BkVFLss: np.ndarray
+    , DifSBak: np.ndarray
+    , BmIncBk: np.ndarray
+    , GCR: float | np.ndarray
+    , NearAlbedo: float | np.ndarray
+    , columns: Iterable[str] = ('E_rear',)
+    , out: Optional[dict[str, np.ndarray]] = None
+    , sun: Optional[SunGeometry] = None
+    , skip_night: bool = False
+    , night_fill: float | dict[str, float] = 0.0
+    , backend: Optional[str] = None
+    , vf_table: Optional[ViewFactorTable] = None
+    , psi_method: Optional[str] = None
+    , fidelity: str = 'closed_form'
+    , pitch: Optional[float | np.ndarray] = None
+    , quadrature_points: Optional[int] = None
+    , slope_ns: Optional[float | np.ndarray] = None
+) -> dict[str, np.ndarray]:
+    """Calculate E_rear from plain float arrays.
+
+    Array-level counterpart of calc_E_rear. The cosphi, psi, W,
+    E_gnd_rear and E_rear steps are evaluated in place on a small
+    number of work buffers instead of building intermediate Series,
+    and only the requested columns are returned. Inputs follow numpy
+    broadcasting rules, so any parameter may be an array as long as
+    all shapes are compatible.
+
+    Parameters
+    ----------
+    height, offset, AzSol, HSol, PhiAng, GlobHor, GlobGnd, BkVFLss,
+    DifSBak, BmIncBk, GCR, NearAlbedo :
+        Same meaning and units as in calc_E_rear, as floats or
+        np.ndarray.
+    columns : Iterable[str], optional
+        Names of results to return, any of the values in
+        E_rear_columns. By default only 'E_rear'.
+    out : dict[str, np.ndarray], optional
+        Preallocated float arrays keyed by result name to write the
+        corresponding results into. Each must have the broadcast shape
+        of the inputs that result depends on. By default None (results
+        are allocated).
+    sun : SunGeometry, optional
+        Precomputed sun terms to use instead of AzSol and HSol, which
+        are then ignored (and may be None). By default None. No
+        alignment is performed at this level.
+    skip_night : bool, optional
+        If True, only rows (first axis) with the sun above the horizon
+        (HSol > 0) are evaluated and the remaining rows of every result
+        are set to night_fill. By default False.
+    night_fill : float or dict[str, float], optional
+        Value assigned to night rows when skip_night is True, either
+        for all results or keyed by result name (missing names get
+        0.0). By default 0.0.
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
+        The numba backend evaluates every step in a single parallel
+        loop without intermediate arrays, and handles skip_night inside
+        the loop. It supports inputs of up to two dimensions.
+    vf_table : ViewFactorTable, optional
+        Tabulated view factors to interpolate instead of evaluating W
+        (and, if tabulated, the rotation factor) in closed form. Must
+        have been built for the same (scalar) height and offset. Always
+        evaluated with the numpy backend. By default None.
+    psi_method : str, optional
+        Formulation of the psi_rad output, see calc_psi and
+        resolve_psi_method. By default None. W is computed from the
+        cosine ratio either way since it does not need psi itself.
+    fidelity : str, optional
+        One of fidelity_levels. 'closed_form' (default) uses the
+        east-west shade line and wedge product of calc_E_gnd_rear.
+        'shade_polygon' integrates the view of the sawtooth row-end
+        shadow numerically (see calc_gnd_view_factors), reporting the
+        effective W and psi_rad of the unshaded share of visible ground.
+        It is always evaluated with the numpy backend, costs about
+        quadrature_points times more than the closed form, and requires
+        pitch.
+    pitch : float or np.ndarray, optional
+        Row spacing for fidelity='shade_polygon' (m). By default None.
+    quadrature_points : int, optional
+        Quadrature size for fidelity='shade_polygon', see
+        calc_gnd_view_factors. By default None.
+    slope_ns : float or np.ndarray, optional
+        North-south ground slope, see calc_cosphi (degrees). The sun
+        terms (built from AzSol and HSol if sun is None) are moved to
+        the level frame of the slope with SunGeometry.on_slope and
+        height and offset with slope_ns_geometry, after which either
+        backend evaluates the same single pass as on flat ground.
+        Results are reported in the level frame (phi_rad, psi_rad).
+        Only supported with fidelity='closed_form' and no vf_table. By
+        default None (flat ground).
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Requested results keyed by name, in the order requested. Entries
+        present in out are the same array objects.
+    """
+    _columns = list(columns)
+    unknown_cols = set(_columns) - set(E_rear_columns)
+    if unknown_cols:
+        raise ValueError(
+            f'Unknown columns {unknown_cols} requested in '
+            'calc_E_rear_ndarray.')
+    _out = {} if out is None else out
+    _psi_method = resolve_psi_method(psi_method)
+    if fidelity not in fidelity_levels:
+        raise ValueError(
+            f'Unknown fidelity "{fidelity}" in calc_E_rear_ndarray.')
+    polygon = 'shade_polygon' == fidelity
+    if polygon and pitch is None:
+        raise ValueError(
+            'calc_E_rear_ndarray requires pitch for '
+            'fidelity="shade_polygon".')
+    if slope_ns is not None:
+        if polygon or vf_table is not None:
+            raise ValueError(
+                'calc_E_rear_ndarray supports slope_ns only with '
+                'fidelity="closed_form" and no vf_table.')
+        slope_ns_rad = np.deg2rad(slope_ns)
+        if sun is None:
+            sun = SunGeometry.from_degrees(AzSol, HSol)
+        sun = sun.on_slope(slope_ns_rad)
+        height, offset = slope_ns_geometry(height, offset, slope_ns_rad)
+    PhiAng = np.asarray(PhiAng, dtype=float)
+    GlobHor = np.asarray(GlobHor, dtype=float)
+    GlobGnd = np.asarray(GlobGnd, dtype=float)
+    BkVFLss = np.asarray(BkVFLss, dtype=float)
+    DifSBak = np.asarray(DifSBak, dtype=float)
+    BmIncBk = np.asarray(BmIncBk, dtype=float)
+    if sun is None:
+        sun_shape = np.broadcast_shapes(np.shape(AzSol), np.shape(HSol))
+    else:
+        sun_shape = sun.cos_phi.shape
+    psi_shape = np.broadcast_shapes(
+        sun_shape, np.shape(height), np.shape(offset))
+    if polygon:
+        # effective W also depends on the rotation and row layout
+        psi_shape = np.broadcast_shapes(
+            psi_shape, PhiAng.shape, np.shape(GCR), np.shape(pitch))
+    gnd_shape = np.broadcast_shapes(
+        psi_shape
+        , PhiAng.shape
+        , GlobHor.shape
+        , GlobGnd.shape
+        , BkVFLss.shape
+        , np.shape(GCR)
+        , np.shape(NearAlbedo))
+    rear_shape = np.broadcast_shapes(
+        gnd_shape, DifSBak.shape, BmIncBk.shape)
+    if (
+        vf_table is None
+        and not polygon
+        and 'numba' == resolve_backend(backend)
+    ):
+        return _calc_E_rear_numba(
+            inputs={
+                'height': height
+                , 'offset': offset
+                , 'AzSol': AzSol
+                , 'HSol': HSol
+                , 'PhiAng': PhiAng
+                , 'GlobHor': GlobHor
+                , 'GlobGnd': GlobGnd
+                , 'BkVFLss': BkVFLss
+                , 'DifSBak': DifSBak
+                , 'BmIncBk': BmIncBk
+                , 'GCR': GCR
+                , 'NearAlbedo': NearAlbedo}
+            , sun=sun
+            , shapes={
+                'phi_rad': sun_shape
+                , 'psi_rad': psi_shape
+                , 'W': psi_shape
+                , 'E_gnd_rear': gnd_shape
+                , 'E_rear': rear_shape}
+            , columns=_columns
+            , out=_out
+            , skip_night=skip_night
+            , night_fill=night_fill
+            , psi_method=_psi_method)
+    if skip_night and 0 < len(sun_shape):
+        if sun is None:
+            day_rows, night_rows = split_day_rows(
+                np.asarray(HSol, dtype=float))
+            sun_day = None
+        else:
+            day_rows, night_rows, sun_day = sun.daylight()
+        skip_night = 0 < len(night_rows)
+    else:
+        skip_night = False
+    if skip_night:
+        return evaluate_day_rows(
+            functools.partial(
+                calc_E_rear_ndarray
+                , columns=_columns
+                , sun=sun_day
+                , skip_night=False
+                , backend='numpy'
+                , vf_table=vf_table
+                , psi_method=_psi_method
+                , fidelity=fidelity
+                , quadrature_points=quadrature_points)
+            , inputs={
+                'height': height
+                , 'offset': offset
+                , 'AzSol': AzSol
+                , 'HSol': HSol
+                , 'PhiAng': PhiAng
+                , 'GlobHor': GlobHor
+                , 'GlobGnd': GlobGnd
+                , 'BkVFLss': BkVFLss
+                , 'DifSBak': DifSBak
+                , 'BmIncBk': BmIncBk
+                , 'GCR': GCR
+                , 'NearAlbedo': NearAlbedo
+                , 'pitch': pitch}
+            , day_rows=day_rows
+            , night_rows=night_rows
+            , shapes={
+                'phi_rad': sun_shape
+                , 'psi_rad': psi_shape
+                , 'W': psi_shape
+                , 'E_gnd_rear': gnd_shape
+                , 'E_rear': rear_shape}
+            , out=_out
+            , night_fill=night_fill)
+    result = {}
+    if sun is None:
+        # cosine and sine of phi from the sun position
+        c_phi = np.empty(sun_shape)
+        s_phi = np.empty(sun_shape)
+        np.deg2rad(AzSol, out=c_phi)
+        np.cos(c_phi, out=c_phi)
+        np.deg2rad(HSol, out=s_phi)
+        np.cos(s_phi, out=s_phi)
+        c_phi *= s_phi
+        np.multiply(c_phi, c_phi, out=s_phi)
+        np.subtract(1.0, s_phi, out=s_phi)
+        np.sqrt(s_phi, out=s_phi)
+        if 'phi_rad' in _columns:
+            result['phi_rad'] = np.arccos(
+                c_phi, out=output_buffer(_out, 'phi_rad', sun_shape))
+    else:
+        c_phi = sun.cos_phi
+        s_phi = sun.sin_phi
+        if 'phi_rad' in _columns:
+            result['phi_rad'] = output_buffer(_out, 'phi_rad', sun_shape)
+            np.copyto(result['phi_rad'], sun.phi_rad)
+    if polygon:
+        F_unshd, F_shd = calc_gnd_view_factors(
+            AzSol=AzSol
+            , HSol=HSol
+            , PhiAng=PhiAng
+            , height=height
+            , offset=offset
+            , GCR=GCR
+            , pitch=pitch
+            , sun=sun
+            , quadrature_points=quadrature_points)
+        W = output_buffer(_out, 'W', psi_shape)
+        F_gnd = F_unshd + F_shd
+        np.divide(F_unshd, F_gnd, out=W, where=0.0 < F_gnd)
+        W[0.0 >= F_gnd] = 1.0
+        if 'psi_rad' in _columns:
+            result['psi_rad'] = output_buffer(_out, 'psi_rad', psi_shape)
+            np.multiply(W, 2.0, out=result['psi_rad'])
+            result['psi_rad'] -= 1.0
+            np.arccos(result['psi_rad'], out=result['psi_rad'])
+    elif vf_table is None:
+        # cosine of psi is all that W needs
+        c_psi = output_buffer(_out, 'W', psi_shape)
+        h_s_phi = np.empty(psi_shape)
+        np.multiply(offset, s_phi, out=c_psi)
+        np.multiply(height, c_phi, out=h_s_phi)
+        c_psi += h_s_phi
+        np.multiply(height, s_phi, out=h_s_phi)
+        if 'psi_rad' in _columns and 'atan2' == _psi_method:
+            result['psi_rad'] = np.arctan2(
+                h_s_phi, c_psi, out=output_buffer(_out, 'psi_rad', psi_shape))
+        np.hypot(c_psi, h_s_phi, out=h_s_phi)
+        c_psi /= h_s_phi
+        np.clip(c_psi, -1.0, 1.0, out=c_psi)
+        if 'psi_rad' in _columns and 'arccos' == _psi_method:
+            result['psi_rad'] = np.arccos(
+                c_psi, out=output_buffer(_out, 'psi_rad', psi_shape))
+        W = c_psi
+        W += 1.0
+        W *= 0.5
+    else:
+        vf_table.check_geometry(height=height, offset=offset)
+        if sun is not None:
+            phi_rad = sun.phi_rad
+        elif 'phi_rad' in result:
+            phi_rad = result['phi_rad']
+        else:
+            phi_rad = np.arccos(c_phi)
+        W = vf_table.W_at(phi_rad, out=output_buffer(_out, 'W', psi_shape))
+        if 'psi_rad' in _columns:
+            result['psi_rad'] = output_buffer(_out, 'psi_rad', psi_shape)
+            np.copyto(
+                result['psi_rad']
+                , calc_psi(
+                    phi_rad
+                    , height=height
+                    , offset=offset
+                    , backend='numpy'
+                    , psi_method=_psi_method))
+    if 'W' in _columns:
+        result['W'] = W
+    # ground contribution: rot * (B + W * (A - B))
+    E_gnd_rear = output_buffer(_out, 'E_gnd_rear', gnd_shape)
+    gnd_shd = np.empty(gnd_shape)
+    np.multiply(GlobHor, NearAlbedo, out=E_gnd_rear)
+    np.multiply(GlobGnd, NearAlbedo, out=gnd_shd)
+    np.divide(gnd_shd, GCR, out=gnd_shd)
+    np.subtract(gnd_shd, BkVFLss, out=gnd_shd)
+    E_gnd_rear -= gnd_shd
+    # rotation about torque tube reduces visible ground
+    if polygon:
+        # A * F_unshd + B * F_shd == (A - B) * F_unshd + B * F_gnd
+        E_gnd_rear *= F_unshd
+        gnd_shd *= F_gnd
+        E_gnd_rear += gnd_shd
+    elif vf_table is None or vf_table.PhiAng_grid is None:
+        E_gnd_rear *= W
+        E_gnd_rear += gnd_shd
+        rot = np.deg2rad(PhiAng)
+        np.cos(rot, out=rot)
+        rot += 1.0
+        rot *= 0.5
+        E_gnd_rear *= rot
+    else:
+        PhiAng_rad = np.deg2rad(PhiAng)
+        E_gnd_rear *= vf_table.gnd_factor_at(phi_rad, PhiAng_rad)
+        gnd_shd *= vf_table.rotation_factor_at(PhiAng_rad)
+        E_gnd_rear += gnd_shd
+    if 'E_gnd_rear' in _columns:
+        result['E_gnd_rear'] = E_gnd_rear
+    if 'E_rear' in _columns:
+        E_rear = output_buffer(_out, 'E_rear', rear_shape)
+        np.add(E_gnd_rear, DifSBak, out=E_rear)
+        E_rear += BmIncBk
+        result['E_rear'] = E_rear
+    return {k: result[k] for k in _columns}
+
+
+def _is_sensor_values(
+    name: str
+    , value
+    , index: pd.Index
+    , sensors: Optional[pd.Index]
+) -> bool:
+    """Identify per-sensor parameter values (not scalars or timeseries).
+
+    A Series is per sensor unless it is indexed like the timeseries. An
+    unlabelled array is per sensor only if sensors is given; otherwise
+    it must be as long as the timeseries and applies row by row.
+    """
+    if isinstance(value, pd.Series):
+        return not value.index.equals(index)
+    if 0 == np.ndim(value):
+        return False
+    n = len(value)
+    if sensors is not None:
+        if n != len(sensors):
+            raise ValueError(
+                f'calc_E_rear: {name} has {n} values for '
+                f'{len(sensors)} sensors; pass time-varying values as a '
+                'Series indexed like PhiAng')
+        return True
+    if n != len(index):
+        raise ValueError(
+            f'calc_E_rear: {name} has {n} values for {len(index)} rows; '
+            'pass sensors to give one value per sensor')
+    return False
+
+
+def calc_E_rear(
+    height: float | Iterable[float]
+    , offset: float | Iterable[float]
+    , AzSol: Optional[pd.Series]
+    , HSol: Optional[pd.Series]
     , PhiAng: pd.Series
     , GlobHor: pd.Series
     # , DiffHor: pd.Series
@@ -237,22 +1785,39 @@ def calc_E_rear(
     , BkVFLss: pd.Series
     , DifSBak: pd.Series
     , BmIncBk: pd.Series
-    , GCR: float
-    , NearAlbedo: float
+    , GCR: float | Iterable[float]
+    , NearAlbedo: float | Iterable[float]
+    , sun: Optional[SunGeometry] = None
+    , skip_night: bool = False
+    , night_fill: float | dict[str, float] = 0.0
+    , backend: Optional[str] = None
+    , vf_table: Optional[ViewFactorTable] = None
+    , psi_method: Optional[str] = None
+    , fidelity: str = 'closed_form'
+    , pitch: Optional[float] = None
+    , quadrature_points: Optional[int] = None
+    , slope_ns: Optional[float | Iterable[float]] = None
+    , sensors: Optional[Iterable[Hashable]] = None
 ) -> pd.DataFrame:
     """Calculate E_rear from variables available from PVsyst.
 
+    Wraps calc_E_rear_ndarray, labelling all intermediate results with
+    the index of PhiAng.
+
     Parameters
     ----------
-    height : float
-        Height of outboard sensor at axis of torque tube (m).
-    offset : float
+    height : float or Iterable[float]
+        Height of outboard sensor at axis of torque tube (m). May be
+        one value per sensor or per row of PhiAng, see sensors.
+    offset : float or Iterable[float]
         Horizontal distance from edge of array closest to equator
-        to outboard sensor (m).
-    AzSol : pd.Series
+        to outboard sensor (m). May be one value per sensor.
+    AzSol : pd.Series or None
         Sun azimuth relative to direction toward equator (degrees).
-    HSol : pd.Series
-        Sun "height" above horizon (elevation; degrees).
+        May be None if sun is supplied.
+    HSol : pd.Series or None
+        Sun "height" above horizon (elevation; degrees). May be None if
+        sun is supplied.
     PhiAng : pd.Series
         Rotation angle of tracker (0=horizontal; +=tilt toward west; degrees).
     GlobHor : pd.Series
@@ -268,17 +1833,60 @@ def calc_E_rear(
     BmIncBk : pd.Series
         Beam irradiance incident on the back (rear) side (W/m2). Nearly always
         zero for single-axis trackers (W/m2).
-    GCR : float
+    GCR : float or Iterable[float]
         Ground cover ratio, linear (width of rows divided by row pitch; unitless)
-    NearAlbedo : float
+        May be one value per sensor, a Series indexed like PhiAng, or
+        MonthlyValues.
+    NearAlbedo : float or Iterable[float]
         Albedo of ground immediately below the array. Distinguished in PVsyst
         as potentially different than the average albedo of ground in the
-        distance far from the array. (unitless)
+        distance far from the array. (unitless) May be one value per
+        sensor, a Series indexed like PhiAng for time-varying albedo, or
+        MonthlyValues.
+    sun : SunGeometry, optional
+        Precomputed sun terms replacing AzSol and HSol, by default None.
+        Aligned to the index of PhiAng if it was built for a larger
+        time index.
+    skip_night : bool, optional
+        Evaluate only rows with HSol > 0, by default False. See
+        calc_E_rear_ndarray.
+    night_fill : float or dict[str, float], optional
+        Value(s) assigned to night rows when skip_night is True, by
+        default 0.0.
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
+    vf_table : ViewFactorTable, optional
+        Tabulated view factors for this height and offset, by default
+        None. See calc_E_rear_ndarray.
+    psi_method : str, optional
+        Formulation of psi_rad, 'atan2' or 'arccos', see calc_psi. By
+        default None (module variable default_psi_method).
+    fidelity : str, optional
+        'closed_form' (default) or 'shade_polygon', see
+        calc_E_rear_ndarray.
+    pitch : float, optional
+        Row spacing (m), required for fidelity='shade_polygon'.
+    quadrature_points : int, optional
+        Quadrature size for fidelity='shade_polygon', by default None.
+    slope_ns : float or Iterable[float], optional
+        North-south ground slope, positive where the ground rises away
+        from the equator (degrees). May be one value per sensor (or
+        block). By default None (flat ground). See calc_E_rear_ndarray.
+    sensors : Iterable[Hashable], optional
+        Sensor labels. If given, arrays and lists among height, offset,
+        GCR, NearAlbedo and slope_ns hold one value per sensor, in this
+        order. By default None: arrays and lists must be as long as
+        PhiAng and apply row by row, and only a Series not indexed like
+        PhiAng holds one value per sensor (labelled by its index).
 
     Returns
     -------
     pd.DataFrame
-        Dataframe of intermediate and final results.
+        Dataframe of intermediate and final results. If any parameter
+        holds one value per sensor, all sensors are evaluated in one
+        broadcast pass sharing the sun and tracker terms, and the
+        columns are a MultiIndex of (result name, sensor), the sensor
+        level named "sensor" unless the labels carry a name.
         phi_rad : float
             Projected sun elevation angle in north-south-zenith
             plane (radians).
@@ -295,29 +1903,521 @@ def calc_E_rear(
             Total of ground diffuse, sky diffuse, and beam irradiance
             upon the outboard sensor (W/m2).
     """
-    AzSol_rad = np.deg2rad(AzSol)
-    HSol_rad = np.deg2rad(HSol)
-    phi_rad = np.arccos(
-        calc_cosphi(AzSol_rad=AzSol_rad, HSol_rad=HSol_rad))
-    psi_rad = calc_psi(
-        phi_rad=phi_rad
-        , height=height
-        , offset=offset)
-    PhiAng_rad = np.deg2rad(PhiAng)
-    W = calc_W(psi_rad=psi_rad)
-    # E_sky_rear = calc_E_sky_rear(DiffHor=DiffHor, PhiAng_rad=PhiAng_rad)
-    E_gnd_rear = calc_E_gnd_rear(
-        GlobGnd=GlobGnd
-        , GlobHor=GlobHor
-        , PhiAng_rad=PhiAng_rad
-        , BkVFLss=BkVFLss
-        , W=W
-        , albedo_near=NearAlbedo
-        , GCR=GCR)
-    E_rear = E_gnd_rear + DifSBak + BmIncBk
-    return pd.DataFrame({
-        'phi_rad': phi_rad
-        , 'psi_rad': psi_rad
-        , 'W': W
-        , 'E_gnd_rear': E_gnd_rear
-        , 'E_rear': E_rear})
+    params = {
+        'height': height
+        , 'offset': offset
+        , 'GCR': GCR
+        , 'NearAlbedo': NearAlbedo}
+    ts = {
+        'AzSol': AzSol
+        , 'HSol': HSol
+        , 'PhiAng': PhiAng
+        , 'GlobHor': GlobHor
+        , 'GlobGnd': GlobGnd
+        , 'BkVFLss': BkVFLss
+        , 'DifSBak': DifSBak
+        , 'BmIncBk': BmIncBk}
+    if slope_ns is not None:
+        params['slope_ns'] = slope_ns
+    for name, value in params.items():
+        if isinstance(value, MonthlyValues):
+            params[name] = value.expand(PhiAng.index)
+    _sun = None if sun is None else sun.align(PhiAng.index)
+    if sensors is not None:
+        sensors = pd.Index(sensors)
+    sensor_names = [
+        name
+        for name, value in params.items()
+        if _is_sensor_values(name, value, PhiAng.index, sensors)]
+    if not sensor_names:
+        result = calc_E_rear_ndarray(
+            columns=E_rear_columns
+            , sun=_sun
+            , skip_night=skip_night
+            , night_fill=night_fill
+            , backend=backend
+            , vf_table=vf_table
+            , psi_method=psi_method
+            , fidelity=fidelity
+            , pitch=pitch
+            , quadrature_points=quadrature_points
+            , **ts
+            , **params)
+        return pd.DataFrame(result, index=PhiAng.index)
+    if sensors is None:
+        sensors = next(
+            params[name].index
+            for name in sensor_names
+            if isinstance(params[name], pd.Series))
+    if sensors.name is None:
+        sensors = sensors.rename('sensor')
+    for name in sensor_names:
+        value = params[name]
+        if isinstance(value, pd.Series) and not value.index.equals(sensors):
+            if not (
+                len(value) == len(sensors)
+                and value.index.isin(sensors).all()
+            ):
+                raise ValueError(
+                    f'calc_E_rear: the index of {name} does not match '
+                    'the sensors')
+            value = value.reindex(sensors)
+        params[name] = np.asarray(value, dtype=float)[np.newaxis, :]
+    # timeseries as a column, sensors along the row
+    for name, value in ts.items():
+        if value is not None:
+            ts[name] = np.asarray(value, dtype=float)[:, np.newaxis]
+    for name, value in params.items():
+        if name not in sensor_names and 0 < np.ndim(value):
+            params[name] = np.asarray(value, dtype=float)[:, np.newaxis]
+    result = calc_E_rear_ndarray(
+        columns=E_rear_columns
+        , sun=None if _sun is None else _sun.as_column()
+        , skip_night=skip_night
+        , night_fill=night_fill
+        , backend=backend
+        , vf_table=vf_table
+        , psi_method=psi_method
+        , fidelity=fidelity
+        , pitch=pitch
+        , quadrature_points=quadrature_points
+        , **ts
+        , **params)
+    shape = (len(PhiAng), len(sensors))
+    # terms shared by all sensors (e.g. phi_rad) are materialized, since
+    # broadcast views are read-only
+    return pd.concat(
+        {
+            col: pd.DataFrame(
+                np.broadcast_to(result[col], shape).copy()
+                if np.shape(result[col]) != shape
+                else result[col]
+                , index=PhiAng.index
+                , columns=sensors)
+            for col in E_rear_columns}
+        , axis=1)
+
+
+E_rear_jacobian_columns = (
+    'E_rear'
+    , 'dE_rear_dheight'
+    , 'dE_rear_doffset'
+    , 'dE_rear_dNearAlbedo'
+    , 'dE_rear_dGCR')
+
+
+def calc_E_rear_jacobian(
+    height: float | pd.Series
+    , offset: float | pd.Series
+    , AzSol: Optional[pd.Series]
+    , HSol: Optional[pd.Series]
+    , PhiAng: pd.Series
+    , GlobHor: pd.Series
+    , GlobGnd: pd.Series
+    , BkVFLss: pd.Series
+    , DifSBak: pd.Series
+    , BmIncBk: pd.Series
+    , GCR: float | pd.Series
+    , NearAlbedo: float | pd.Series
+    , sun: Optional[SunGeometry] = None
+) -> pd.DataFrame:
+    """Calculate E_rear and its partial derivatives in one pass.
+
+    With A = GlobHor * NearAlbedo, B = GlobGnd * NearAlbedo / GCR -
+    BkVFLss and rot = 0.5 * (1 + cos(PhiAng)), the ground term is
+    rot * (B + W * (A - B)) with W = 0.5 * (1 + cos(psi)), so
+
+        dE/dheight = -0.5 * rot * (A - B) * sin(psi) * dpsi/dheight
+        dE/doffset = -0.5 * rot * (A - B) * sin(psi) * dpsi/doffset
+        dE/dNearAlbedo = rot * (W * GlobHor + (1 - W) * GlobGnd / GCR)
+        dE/dGCR = -rot * (1 - W) * GlobGnd * NearAlbedo / GCR^2
+
+    where the psi derivatives are those of calc_psi_derivatives.
+
+    Parameters
+    ----------
+    height, offset, AzSol, HSol, PhiAng, GlobHor, GlobGnd, BkVFLss,
+    DifSBak, BmIncBk, GCR, NearAlbedo, sun :
+        As in calc_E_rear.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns E_rear_jacobian_columns, indexed like PhiAng.
+        E_rear : float
+            Total rear irradiance as from calc_E_rear (W/m2).
+        dE_rear_dheight, dE_rear_doffset : float
+            Sensitivity to sensor geometry (W/m2 per m).
+        dE_rear_dNearAlbedo, dE_rear_dGCR : float
+            Sensitivity to albedo and ground coverage ratio (W/m2 per
+            unit fraction).
+    """
+    if sun is None:
+        sun = SunGeometry.from_degrees(AzSol, HSol)
+    else:
+        sun = sun.align(PhiAng.index)
+    GlobHor = np.asarray(GlobHor, dtype=float)
+    GlobGnd = np.asarray(GlobGnd, dtype=float)
+    psi, d_height, d_offset = _psi_derivatives(
+        sun.cos_phi
+        , sun.sin_phi
+        , height=np.asarray(height, dtype=float)
+        , offset=np.asarray(offset, dtype=float))
+    W = 0.5 * (1.0 + np.cos(psi))
+    rot = 0.5 * (1.0 + np.cos(np.deg2rad(np.asarray(PhiAng, dtype=float))))
+    GCR = np.asarray(GCR, dtype=float)
+    NearAlbedo = np.asarray(NearAlbedo, dtype=float)
+    gnd_shd_GCR = GlobGnd / GCR
+    gnd_sun = GlobHor * NearAlbedo
+    gnd_shd = gnd_shd_GCR * NearAlbedo - np.asarray(BkVFLss, dtype=float)
+    dE_dpsi = -0.5 * rot * (gnd_sun - gnd_shd) * np.sin(psi)
+    return pd.DataFrame(
+        {
+            'E_rear': (
+                rot * (gnd_shd + W * (gnd_sun - gnd_shd))
+                + np.asarray(DifSBak, dtype=float)
+                + np.asarray(BmIncBk, dtype=float))
+            , 'dE_rear_dheight': dE_dpsi * d_height
+            , 'dE_rear_doffset': dE_dpsi * d_offset
+            , 'dE_rear_dNearAlbedo': rot * (
+                W * GlobHor + (1.0 - W) * gnd_shd_GCR)
+            , 'dE_rear_dGCR': (
+                -rot * (1.0 - W) * gnd_shd_GCR * NearAlbedo / GCR)}
+        , index=PhiAng.index)
+
+
+def calc_E_rear_chunks(
+    chunks: Iterable[pd.DataFrame | dict[str, np.ndarray]]
+    , height: float
+    , offset: float
+    , GCR: float
+    , NearAlbedo: float
+    , columns: Iterable[str] = E_rear_columns
+    , column_map: Optional[dict[str, str]] = None
+    , skip_night: bool = False
+    , night_fill: float | dict[str, float] = 0.0
+    , backend: Optional[str] = None
+) -> Iterator[pd.DataFrame | dict[str, np.ndarray]]:
+    """Calculate E_rear chunk by chunk.
+
+    Each chunk is evaluated independently (the calculation has no state
+    carried between rows), so the concatenated results equal a single
+    calc_E_rear call on the concatenated inputs while only one chunk of
+    inputs and outputs needs to be held in memory at a time.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame | dict[str, np.ndarray]]
+        Input chunks, e.g. from pd.read_csv(..., chunksize=...). Each
+        chunk holds the timeseries inputs of calc_E_rear (AzSol, HSol,
+        PhiAng, GlobHor, GlobGnd, BkVFLss, DifSBak, BmIncBk) as
+        columns, or as arrays in a dict.
+    height, offset, GCR, NearAlbedo : float
+        Parameters as in calc_E_rear.
+    columns : Iterable[str], optional
+        Which of E_rear_columns to emit, by default all of them.
+    column_map : dict[str, str], optional
+        Map from calc_E_rear parameter name to chunk column name for
+        inputs named differently in the chunks, by default None.
+    skip_night, night_fill, backend :
+        As in calc_E_rear.
+
+    Yields
+    ------
+    pd.DataFrame or dict[str, np.ndarray]
+        Requested columns for each chunk: a DataFrame with the chunk's
+        index for DataFrame chunks, otherwise a dict of arrays.
+    """
+    _columns = tuple(columns)
+    names = (
+        'AzSol', 'HSol', 'PhiAng', 'GlobHor', 'GlobGnd', 'BkVFLss'
+        , 'DifSBak', 'BmIncBk')
+    _column_map = {name: name for name in names} | (
+        {} if column_map is None else column_map)
+    for chunk in chunks:
+        result = calc_E_rear_ndarray(
+            height=height
+            , offset=offset
+            , GCR=GCR
+            , NearAlbedo=NearAlbedo
+            , columns=_columns
+            , skip_night=skip_night
+            , night_fill=night_fill
+            , backend=backend
+            , **{name: chunk[_column_map[name]] for name in names})
+        if isinstance(chunk, pd.DataFrame):
+            yield pd.DataFrame(result, index=chunk.index)
+        else:
+            yield result
+
+
+sweep_parameter_names = ('height', 'offset', 'NearAlbedo', 'GCR')
+
+
+def calc_E_rear_sweep(
+    height: float | Iterable[float]
+    , offset: float | Iterable[float]
+    , NearAlbedo: float | Iterable[float]
+    , GCR: float | Iterable[float]
+    , AzSol: pd.Series
+    , HSol: pd.Series
+    , PhiAng: pd.Series
+    , GlobHor: pd.Series
+    , GlobGnd: pd.Series
+    , BkVFLss: pd.Series
+    , DifSBak: pd.Series
+    , BmIncBk: pd.Series
+    , product: bool = False
+    , column: str = 'E_rear'
+    , labelled: bool = True
+    , sun: Optional[SunGeometry] = None
+    , backend: Optional[str] = None
+) -> pd.DataFrame | np.ndarray:
+    """Calculate E_rear for many sensor geometries in one evaluation.
+
+    The timeseries inputs are treated as a column and the parameter
+    vectors as a row, so a single broadcast call to calc_E_rear_ndarray
+    produces every (time, parameter set) combination while the sun
+    geometry is computed only once.
+
+    Parameters
+    ----------
+    height, offset, NearAlbedo, GCR : float or Iterable[float]
+        Parameter values with the same meaning as in calc_E_rear.
+        Scalars are repeated for every parameter set.
+    AzSol, HSol, PhiAng, GlobHor, GlobGnd, BkVFLss, DifSBak, BmIncBk :
+        pd.Series
+        Timeseries inputs as in calc_E_rear. AzSol and HSol may be None
+        if sun is supplied.
+    product : bool, optional
+        If True, evaluate every combination of the parameter vectors
+        (a grid). If False (default), the vectors are paired
+        element-wise and must have equal (or unit) lengths.
+    column : str, optional
+        Which of E_rear_columns to return, by default 'E_rear'.
+    labelled : bool, optional
+        If True (default), return a DataFrame indexed like AzSol with
+        one column per parameter set labelled by a MultiIndex of
+        sweep_parameter_names. If False, return the bare
+        (time x parameter set) array.
+    sun : SunGeometry, optional
+        Precomputed sun terms replacing AzSol and HSol, by default None.
+    backend : str, optional
+        Computational backend, see resolve_backend. By default None.
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        Values of the requested column for each time and parameter set.
+    """
+    param_values = [
+        np.atleast_1d(np.asarray(v, dtype=float))
+        for v in (height, offset, NearAlbedo, GCR)]
+    if product:
+        param_index = pd.MultiIndex.from_product(
+            param_values
+            , names=sweep_parameter_names)
+    else:
+        param_index = pd.MultiIndex.from_arrays(
+            np.broadcast_arrays(*param_values)
+            , names=sweep_parameter_names)
+    params = {
+        name: param_index.get_level_values(name).to_numpy()[np.newaxis, :]
+        for name in sweep_parameter_names}
+    if sun is None:
+        ts = {
+            'AzSol': np.asarray(AzSol, dtype=float)[:, np.newaxis]
+            , 'HSol': np.asarray(HSol, dtype=float)[:, np.newaxis]}
+        sun_column = None
+    else:
+        ts = {'AzSol': None, 'HSol': None}
+        sun_column = (
+            sun.align(PhiAng.index)
+            if isinstance(PhiAng, pd.Series)
+            else sun).as_column()
+    ts = ts | {
+        name: np.asarray(v, dtype=float)[:, np.newaxis]
+        for name, v in (
+            ('PhiAng', PhiAng)
+            , ('GlobHor', GlobHor)
+            , ('GlobGnd', GlobGnd)
+            , ('BkVFLss', BkVFLss)
+            , ('DifSBak', DifSBak)
+            , ('BmIncBk', BmIncBk))}
+    values = calc_E_rear_ndarray(
+        columns=[column]
+        , sun=sun_column
+        , backend=backend
+        , **params
+        , **ts)[column]
+    values = np.broadcast_to(values, (len(PhiAng), len(param_index)))
+    if not labelled:
+        return values
+    return pd.DataFrame(
+        values
+        , index=PhiAng.index
+        , columns=param_index)
+
+
+fit_parameter_names = ('height', 'offset')
+
+
+def fit_E_rear_geometry(
+    E_rear: pd.DataFrame | pd.Series
+    , AzSol: Optional[pd.Series]
+    , HSol: Optional[pd.Series]
+    , PhiAng: pd.Series
+    , GlobHor: pd.Series
+    , GlobGnd: pd.Series
+    , BkVFLss: pd.Series
+    , DifSBak: pd.Series
+    , BmIncBk: pd.Series
+    , GCR: float | Iterable[float]
+    , NearAlbedo: float | Iterable[float]
+    , height: float | Iterable[float]
+    , offset: float | Iterable[float]
+    , fit: str = 'offset'
+    , bounds: Optional[tuple[float, float]] = None
+    , max_iter: int = 50
+    , tol: float = 1e-6
+    , sun: Optional[SunGeometry] = None
+) -> pd.DataFrame:
+    """Fit sensor offset or height to measured rear irradiance.
+
+    Solves the least-squares problem for every sensor (column of E_rear)
+    at once with damped Newton (Levenberg-Marquardt) iterations, using
+    the analytic derivatives of psi (see calc_psi_derivatives). The
+    parameter is clipped to bounds after every step, and a step is only
+    accepted for a sensor if it does not increase that sensor's sum of
+    squared residuals.
+
+    psi depends only on the ratio offset / height, so the two cannot be
+    fitted together: one is fitted while the other is held fixed.
+
+    Parameters
+    ----------
+    E_rear : pd.DataFrame or pd.Series
+        Measured rear irradiance, one column per sensor. (W/m2)
+        Missing values are ignored.
+    AzSol, HSol, PhiAng, GlobHor, GlobGnd, BkVFLss, DifSBak, BmIncBk :
+        pd.Series
+        Timeseries inputs as in calc_E_rear, aligned with E_rear. AzSol
+        and HSol may be None if sun is supplied.
+    GCR, NearAlbedo : float or Iterable[float]
+        Known parameters, scalar or one per sensor.
+    height, offset : float or Iterable[float]
+        Initial guess for the fitted parameter and fixed value for the
+        other, scalar or one per sensor.
+    fit : str, optional
+        Which of fit_parameter_names to fit, by default 'offset'.
+    bounds : tuple[float, float], optional
+        Lower and upper limits for the fitted parameter. By default
+        (0.01, 100) for height and (-100, 100) for offset.
+    max_iter : int, optional
+        Maximum number of iterations, by default 50.
+    tol : float, optional
+        A sensor is converged when an accepted parameter change is
+        below tol * (1 + abs(parameter)). By default 1e-6.
+    sun : SunGeometry, optional
+        Precomputed sun terms replacing AzSol and HSol, by default None.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per sensor with 'height' and 'offset' (one of them
+        fitted), 'rmse' (W/m2), 'n_obs', 'n_iter', 'converged' and
+        'stalled' (True when no improving step could be found, e.g.
+        for non-finite inputs; such sensors are not converged).
+    """
+    if fit not in fit_parameter_names:
+        raise ValueError(
+            f'fit_E_rear_geometry: fit must be one of '
+            f'{fit_parameter_names}, got {fit!r}')
+    if bounds is None:
+        bounds = {'height': (0.01, 100.0), 'offset': (-100.0, 100.0)}[fit]
+    if isinstance(E_rear, pd.Series):
+        E_rear = E_rear.to_frame()
+    meas = E_rear.to_numpy(dtype=float)
+    n_sensor = meas.shape[1]
+    if sun is None:
+        sun = SunGeometry.from_degrees(AzSol, HSol)
+    else:
+        sun = sun.align(E_rear.index)
+    sun = sun.as_column()
+
+    def ts(a):
+        return np.asarray(a, dtype=float)[:, np.newaxis]
+
+    def per_sensor(a):
+        return np.broadcast_to(
+            np.asarray(a, dtype=float), (n_sensor,)).copy()
+
+    valid = np.isfinite(meas)
+    meas = np.where(valid, meas, 0.0)
+    NearAlbedo = per_sensor(NearAlbedo)
+    gnd_shd = ts(GlobGnd) * (NearAlbedo / per_sensor(GCR)) - ts(BkVFLss)
+    rot = 0.5 * (1.0 + np.cos(np.deg2rad(ts(PhiAng))))
+    # E_rear = gain * W + E_rear_fixed
+    gain = rot * (ts(GlobHor) * NearAlbedo - gnd_shd)
+    gain[~valid] = 0.0
+    E_rear_fixed = gnd_shd * rot + ts(DifSBak) + ts(BmIncBk)
+    params = {'height': per_sensor(height), 'offset': per_sensor(offset)}
+    p = np.clip(params[fit], *bounds)
+
+    def evaluate(p):
+        params[fit] = p
+        psi, d_height, d_offset = _psi_derivatives(
+            sun.cos_phi
+            , sun.sin_phi
+            , height=params['height']
+            , offset=params['offset'])
+        resid = np.cos(psi)
+        resid += 1.0
+        resid *= 0.5 * gain
+        resid += E_rear_fixed
+        resid -= meas
+        resid[~valid] = 0.0
+        jac = np.sin(psi)
+        jac *= -0.5 * gain
+        jac *= d_height if 'height' == fit else d_offset
+        return (
+            np.einsum('nm,nm->m', resid, resid)
+            , np.einsum('nm,nm->m', jac, resid)
+            , np.einsum('nm,nm->m', jac, jac))
+
+    sse, grad, hess = evaluate(p)
+    damping = np.full(n_sensor, 1e-3)
+    n_iter = np.zeros(n_sensor, dtype=int)
+    converged = np.zeros(n_sensor, dtype=bool)
+    stalled = np.zeros(n_sensor, dtype=bool)
+    for _ in range(max_iter):
+        active = ~(converged | stalled)
+        if not active.any():
+            break
+        n_iter[active] += 1
+        step = -grad / (hess * (1.0 + damping) + 1e-300)
+        step[~active] = 0.0
+        p_trial = np.clip(p + step, *bounds)
+        sse_trial, grad_trial, hess_trial = evaluate(p_trial)
+        accept = active & (sse_trial <= sse)
+        converged |= accept & (
+            np.abs(p_trial - p) <= tol * (1.0 + np.abs(p)))
+        # damping so large that no step is taken: give up, not converged
+        stalled |= active & ~accept & (damping > 1e12)
+        damping = np.where(accept, damping * 0.1, damping * 10.0)
+        p = np.where(accept, p_trial, p)
+        sse = np.where(accept, sse_trial, sse)
+        grad = np.where(accept, grad_trial, grad)
+        hess = np.where(accept, hess_trial, hess)
+    params[fit] = p
+    n_obs = valid.sum(axis=0)
+    return pd.DataFrame(
+        {
+            'height': params['height']
+            , 'offset': params['offset']
+            , 'rmse': np.sqrt(sse / np.maximum(n_obs, 1))
+            , 'n_obs': n_obs
+            , 'n_iter': n_iter
+            , 'converged': converged
+            , 'stalled': stalled}
+        , index=E_rear.columns)
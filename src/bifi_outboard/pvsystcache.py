@@ -0,0 +1,277 @@
+# pvsystcache.py
+"""On-disk columnar cache of parsed PVsyst output files.
+
+Parsing a PVsyst CSV file (encoding, separators, dates) is repeated for
+every sweep over the same simulations. PVsystCache stores the parsed
+frame and its PVsystHeader as an Arrow IPC (Feather) or Parquet file
+keyed by the source path, size, modification time and reader options,
+and loads it back with memory mapping on later runs.
+
+Entry file names are <path hash>-<stat hash>-<options hash>.<ext>, so
+all entries of one source file can be found without opening them, and
+entries made from an older version of a file are removed when it is
+read again. Loading an entry updates its modification time, which
+evict uses as the least recently used order.
+
+Requires pyarrow.
+"""
+
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from typing import Optional
+import pandas as pd
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+from . import pvsystcsv
+
+
+cache_formats = {'feather': '.feather', 'parquet': '.parquet'}
+
+# increment when the stored layout changes to ignore old entries
+_layout_version = 1
+
+_metadata_key = b'bifi_outboard.pvsyst_header'
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+
+def _header_to_json(header: pvsystcsv.PVsystHeader) -> str:
+    d = asdict(header)
+    for k in ('start', 'end'):
+        if d[k] is not None:
+            d[k] = d[k].isoformat()
+    return json.dumps(d)
+
+
+def _header_from_json(text: str) -> pvsystcsv.PVsystHeader:
+    d = json.loads(text)
+    for k in ('start', 'end'):
+        if d[k] is not None:
+            d[k] = pd.Timestamp(d[k])
+    return pvsystcsv.PVsystHeader(**d)
+
+
+@dataclass
+class PVsystCache:
+    """Cache of parsed PVsyst output files in a directory.
+
+    Parameters
+    ----------
+    cache_dir : str or pathlib.Path
+        Directory holding the entries, created if missing.
+    max_bytes : int, optional
+        Total size of entries to keep. When exceeded after storing an
+        entry the least recently used entries are evicted. By default
+        None (no limit; see evict).
+    file_format : str, optional
+        'feather' (default, memory mapped on load) or 'parquet'
+        (smaller files).
+    """
+    cache_dir: str | pathlib.Path
+    max_bytes: Optional[int] = None
+    file_format: str = 'feather'
+
+    def __post_init__(self):
+        if pyarrow is None:
+            raise ImportError('PVsystCache requires the pyarrow package.')
+        if self.file_format not in cache_formats:
+            raise ValueError(
+                f'Unknown file_format "{self.file_format}" in PVsystCache, '
+                f'expected one of {list(cache_formats)}')
+        self.cache_dir = pathlib.Path(self.cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def _ext(self) -> str:
+        return cache_formats[self.file_format]
+
+    def _path_hash(self, fname: str | os.PathLike) -> str:
+        archive, member = pvsystcsv.split_zip_path(fname)
+        key = str(pathlib.Path(archive).resolve())
+        if member is not None:
+            key += pvsystcsv.zip_member_sep + member
+        return _hash(key)
+
+    def entry_path(self, fname: str | os.PathLike, **options) -> pathlib.Path:
+        """Locate the entry for a source file and reader options.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path
+            Source file. For archive members ('archive.zip::member')
+            the size and modification time of the archive are used.
+        **options
+            Keyword arguments of pvsystcsv.read_pvsyst that affect the
+            result (engine does not).
+
+        Returns
+        -------
+        pathlib.Path
+            Entry file name, which need not exist.
+        """
+        st = os.stat(pvsystcsv.split_zip_path(fname)[0])
+        _options = {k: v for k, v in options.items() if 'engine' != k}
+        if _options.get('usecols') is not None:
+            _options['usecols'] = sorted(_options['usecols'])
+        stat_hash = _hash(f'{_layout_version}:{st.st_size}:{st.st_mtime_ns}')
+        options_hash = _hash(json.dumps(_options, sort_keys=True))
+        return self.cache_dir / (
+            f'{self._path_hash(fname)}-{stat_hash}-{options_hash}{self._ext}')
+
+    def read(
+        self
+        , fname: str | os.PathLike
+        , **options
+    ) -> tuple[pd.DataFrame, pvsystcsv.PVsystHeader]:
+        """Read a PVsyst file through the cache.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path
+            Source file.
+        **options
+            Keyword arguments of pvsystcsv.read_pvsyst.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, pvsystcsv.PVsystHeader]
+            Same as pvsystcsv.read_pvsyst.
+        """
+        entry = self.entry_path(fname, **options)
+        if entry.exists():
+            try:
+                result = self._load(entry)
+            except (OSError, pyarrow.ArrowException):
+                # unreadable (e.g. truncated) entries are rebuilt
+                entry.unlink(missing_ok=True)
+            else:
+                os.utime(entry)
+                return result
+        dta, header = pvsystcsv.read_pvsyst(fname, **options)
+        # entries made from older versions of the file are stale
+        stat_prefix = entry.name.rsplit('-', 1)[0]
+        for old in self.cache_dir.glob(f'{self._path_hash(fname)}-*'):
+            if not old.name.startswith(stat_prefix):
+                old.unlink(missing_ok=True)
+        self._store(entry, dta, header)
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+        return dta, header
+
+    def _store(
+        self
+        , entry: pathlib.Path
+        , dta: pd.DataFrame
+        , header: pvsystcsv.PVsystHeader
+    ):
+        table = pyarrow.Table.from_pandas(dta, preserve_index=True)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {})
+            , _metadata_key: _header_to_json(header).encode('utf-8')})
+        # write to a temporary file so readers never see partial entries
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            if 'feather' == self.file_format:
+                pyarrow.feather.write_feather(
+                    table, tmp, compression='uncompressed')
+            else:
+                pyarrow.parquet.write_table(table, tmp)
+            os.replace(tmp, entry)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def _load(
+        self
+        , entry: pathlib.Path
+    ) -> tuple[pd.DataFrame, pvsystcsv.PVsystHeader]:
+        if 'feather' == self.file_format:
+            table = pyarrow.feather.read_table(entry, memory_map=True)
+        else:
+            table = pyarrow.parquet.read_table(entry, memory_map=True)
+        header = _header_from_json(
+            table.schema.metadata[_metadata_key].decode('utf-8'))
+        dta = table.to_pandas()
+        if header.freq is not None:
+            # the frequency is not stored, but is implied by the header
+            expected = header.expected_index(len(dta))
+            if expected is not None and expected.equals(dta.index):
+                dta.index = expected
+        return dta, header
+
+    def entries(self) -> pd.DataFrame:
+        """List the cache entries.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per entry file with columns 'path', 'bytes' and
+            'last_used', least recently used first.
+        """
+        rows = [
+            (p, st.st_size, pd.Timestamp(st.st_mtime_ns, unit='ns'))
+            for p in self.cache_dir.glob(f'*{self._ext}')
+            for st in [p.stat()]]
+        return (
+            pd.DataFrame(rows, columns=['path', 'bytes', 'last_used'])
+            .sort_values('last_used', kind='stable')
+            .reset_index(drop=True))
+
+    def invalidate(self, fname: Optional[str | os.PathLike] = None) -> int:
+        """Remove the entries of one source file, or all entries.
+
+        Parameters
+        ----------
+        fname : str or pathlib.Path, optional
+            Source file whose entries (for any reader options) are
+            removed, by default None (remove everything).
+
+        Returns
+        -------
+        int
+            Number of entries removed.
+        """
+        pattern = (
+            f'*{self._ext}'
+            if fname is None
+            else f'{self._path_hash(fname)}-*{self._ext}')
+        n = 0
+        for p in self.cache_dir.glob(pattern):
+            p.unlink(missing_ok=True)
+            n += 1
+        return n
+
+    def evict(self, max_bytes: int) -> int:
+        """Remove least recently used entries until under a size.
+
+        Parameters
+        ----------
+        max_bytes : int
+            Total entry size to keep at most.
+
+        Returns
+        -------
+        int
+            Number of entries removed.
+        """
+        entries = self.entries()
+        excess = entries['bytes'].sum() - max_bytes
+        n = 0
+        for p, size in zip(entries['path'], entries['bytes']):
+            if excess <= 0:
+                break
+            p.unlink(missing_ok=True)
+            excess -= size
+            n += 1
+        return n
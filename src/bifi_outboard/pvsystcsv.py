@@ -1,6 +1,575 @@
 # pvsystcsv.py
 
+from dataclasses import dataclass, field
+import fnmatch
+import io
+import os
+import pathlib
+from typing import IO, Iterable, Optional
+import zipfile
+import numpy as np
 import pandas as pd
+try:
+    import pyarrow
+except ImportError:  # optional dependency
+    pyarrow = None
+
+
+# PVsyst "Simulation:" line labels and the corresponding regular spacing
+pvsyst_step_freq = {
+    'Hourly values': 'h'
+    , 'Daily values': 'D'}
+
+# labels of the file description lines in the header
+_header_labels = {
+    'Project': 'project'
+    , 'Geographical Site': 'site'
+    , 'Meteo data': 'meteo'
+    , 'Simulation variant': 'variant'}
+
+# separates the archive from the member in 'archive.zip::member.CSV'
+zip_member_sep = '::'
+
+# PVsyst hourly output file names, e.g. 'Project_VC1_HourlyRes_0.CSV'
+hourly_res_pattern = '*_HourlyRes_*.CSV'
+
+
+@dataclass
+class PVsystHeader:
+    """Metadata from the header lines of a PVsyst output CSV file.
+
+    Parameters
+    ----------
+    version : str
+        First line of the file, e.g. 'PVSYST 7.3.4'.
+    sep : str
+        Separator used in the file.
+    project, site, meteo, variant : str
+        File names from the Project, Geographical Site, Meteo data and
+        Simulation variant lines (e.g. 'Test Bifi SAT_Project.VC1').
+    project_description, site_description, meteo_description,
+    variant_description : str
+        Description fields of the same lines, joined with sep.
+    simulation_date : str
+        Date the simulation was run, as written by PVsyst.
+    step : str
+        Output step from the "Simulation:" line, e.g. 'Hourly values'.
+    start, end : pd.Timestamp or None
+        First and last day from the "Simulation:" line.
+    columns : list[str]
+        Column names, starting with the date column.
+    units : dict[str, str]
+        Units of each value column ('' where PVsyst writes none).
+    """
+    version: str
+    sep: str
+    project: str = ''
+    project_description: str = ''
+    site: str = ''
+    site_description: str = ''
+    meteo: str = ''
+    meteo_description: str = ''
+    variant: str = ''
+    variant_description: str = ''
+    simulation_date: str = ''
+    step: str = ''
+    start: Optional[pd.Timestamp] = None
+    end: Optional[pd.Timestamp] = None
+    columns: list[str] = field(default_factory=list)
+    units: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def freq(self) -> Optional[str]:
+        """Pandas frequency of the output step, None if not regular."""
+        return pvsyst_step_freq.get(self.step)
+
+    def expected_index(
+        self
+        , periods: int
+    ) -> Optional[pd.DatetimeIndex]:
+        """Build the time index implied by the header.
+
+        Parameters
+        ----------
+        periods : int
+            Number of data rows.
+
+        Returns
+        -------
+        pd.DatetimeIndex or None
+            Regular index from start with the step frequency, named
+            like the date column, or None if the header does not define
+            a regular step.
+        """
+        if self.freq is None or self.start is None:
+            return None
+        return pd.date_range(
+            self.start
+            , periods=periods
+            , freq=self.freq
+            , name=self.columns[0] if self.columns else None)
+
+
+def _parse_header_date(text: str, dayfirst: bool) -> Optional[pd.Timestamp]:
+    """Parse a dd/mm/yy or mm/dd/yy date, preferring the dayfirst order."""
+    formats = ['%d/%m/%y', '%m/%d/%y']
+    if not dayfirst:
+        formats.reverse()
+    for fmt in formats:
+        try:
+            return pd.to_datetime(text.strip(), format=fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def _decode_line(line: bytes | str, encoding: str) -> str:
+    if isinstance(line, bytes):
+        line = line.decode(encoding)
+    return line.rstrip('\r\n')
+
+
+def _read_header(
+    f: IO
+    , sep: Optional[str]
+    , dayfirst: bool
+    , encoding: str
+) -> PVsystHeader:
+    """Read header lines from f, leaving it at the first data row."""
+    version = _decode_line(f.readline(), encoding)
+    line = _decode_line(f.readline(), encoding)
+    _sep = line[0] if sep is None else sep
+    header = PVsystHeader(version=version, sep=_sep)
+    while True:
+        raw = f.readline()
+        if not raw:
+            raise ValueError(
+                'read_pvsyst_header found no column name line starting '
+                f'with "date{_sep}"')
+        fields = _decode_line(raw, encoding).split(_sep)
+        label = fields[0].strip()
+        if label in _header_labels:
+            name = _header_labels[label]
+            setattr(header, name, fields[1] if 1 < len(fields) else '')
+            setattr(
+                header
+                , name + '_description'
+                , _sep.join(fields[3:]).strip(_sep))
+        elif 'Simulation date' == label:
+            header.simulation_date = fields[-1]
+        elif 'Simulation:' == label:
+            header.step = fields[1].strip() if 1 < len(fields) else ''
+            for part in fields[2:]:
+                part = part.strip()
+                if part.startswith('from '):
+                    header.start = _parse_header_date(part[5:], dayfirst)
+                elif part.startswith('to '):
+                    header.end = _parse_header_date(part[3:], dayfirst)
+        elif 'date' == label:
+            header.columns = [name.strip() for name in fields]
+            break
+    units = _decode_line(f.readline(), encoding).split(_sep)
+    header.units = {
+        name: unit.strip()
+        for name, unit in zip(header.columns[1:], units[1:])}
+    # a blank line separates the units from the data
+    position = f.tell()
+    if _decode_line(f.readline(), encoding).strip(_sep + ' '):
+        f.seek(position)
+    return header
+
+
+def split_zip_path(
+    fname: str | os.PathLike
+) -> tuple[str | os.PathLike, Optional[str]]:
+    """Split 'archive.zip::member.CSV' into archive and member.
+
+    Parameters
+    ----------
+    fname : str or pathlib.Path
+        File name, optionally naming a member of a zip archive.
+
+    Returns
+    -------
+    tuple
+        Archive file name and member name, or fname and None if fname
+        does not name an archive member.
+    """
+    text = os.fspath(fname)
+    if zip_member_sep not in text:
+        return fname, None
+    archive, member = text.split(zip_member_sep, 1)
+    return archive, member
+
+
+def _open(con, mode: str = 'rb'):
+    """Open path-like con, or return an already open handle unchanged.
+
+    Archive members ('archive.zip::member') are decompressed as they
+    are read, without extracting them to disk.
+    """
+    if isinstance(con, (str, os.PathLike)):
+        archive, member = split_zip_path(con)
+        if member is None:
+            return open(con, mode), True
+        with zipfile.ZipFile(archive) as zf:
+            # the member stays readable after the archive is closed
+            return zf.open(member), True
+    return con, False
+
+
+def list_zip_members(
+    archive: str | os.PathLike | zipfile.ZipFile
+    , pattern: str = hourly_res_pattern
+) -> list[str]:
+    """List PVsyst output files in a zip archive.
+
+    Parameters
+    ----------
+    archive : str, pathlib.Path or zipfile.ZipFile
+        Zip archive.
+    pattern : str, optional
+        fnmatch pattern for the member base names, matched ignoring
+        case. By default hourly_res_pattern.
+
+    Returns
+    -------
+    list[str]
+        Matching member names in archive order.
+    """
+    if isinstance(archive, zipfile.ZipFile):
+        names = archive.namelist()
+    else:
+        with zipfile.ZipFile(archive) as zf:
+            names = zf.namelist()
+    _pattern = pattern.lower()
+    return [
+        name
+        for name in names
+        if fnmatch.fnmatchcase(
+            pathlib.PurePosixPath(name).name.lower(), _pattern)]
+
+
+def read_pvsyst_header(
+    con
+    , sep: Optional[str] = None
+    , dayfirst: bool = False
+    , encoding: str = 'windows-1252'
+) -> PVsystHeader:
+    """Read only the header of a PVsyst output CSV file.
+
+    Parameters
+    ----------
+    con : str, pathlib.Path or file-like
+        File name (or 'archive.zip::member' name) or open binary handle
+        positioned at the start of the file.
+    sep : str, optional
+        Separator, by default None (taken from the second line).
+    dayfirst : bool, optional
+        Preferred order for ambiguous dates in the "Simulation:" line,
+        by default False.
+    encoding : str, optional
+        Text encoding of the header, by default 'windows-1252'.
+
+    Returns
+    -------
+    PVsystHeader
+    """
+    f, close = _open(con)
+    try:
+        return _read_header(f, sep=sep, dayfirst=dayfirst, encoding=encoding)
+    finally:
+        if close:
+            f.close()
+
+
+# date layouts PVsyst writes, parsed by _parse_fixed_dates
+pvsyst_date_formats = {
+    False: '%m/%d/%y %H:%M'
+    , True: '%d/%m/%y %H:%M'}
+
+
+def _parse_fixed_dates(
+    dates: pd.Series
+    , dayfirst: bool
+) -> Optional[np.ndarray]:
+    """Parse 'mm/dd/yy HH:MM' (or dd/mm) strings by slicing characters.
+
+    Returns None if any string does not have exactly that layout.
+    Two digit years follow the %y convention (69-99 are 19xx).
+    """
+    if 0 == len(dates):
+        return None
+    try:
+        text = dates.to_numpy(dtype=object).astype('S')
+    except (UnicodeEncodeError, TypeError):
+        return None
+    if 14 < text.itemsize:
+        text = np.char.strip(text)
+        if 14 != np.char.str_len(text).max():
+            return None
+        text = text.astype('S14')
+    if 14 != text.itemsize:
+        return None
+    # shorter strings are padded with NUL and fail the checks below
+    chars = text.view(np.uint8).reshape(-1, 14)
+    if not (
+        (b'/'[0] == chars[:, [2, 5]]).all()
+        and (b' '[0] == chars[:, 8]).all()
+        and (b':'[0] == chars[:, 11]).all()
+    ):
+        return None
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 9, 10, 12, 13]].astype(np.int64)
+    digits -= b'0'[0]
+    if ((digits < 0) | (9 < digits)).any():
+        return None
+    pairs = digits[:, 0::2] * 10 + digits[:, 1::2]
+    first, second, yy, hour, minute = pairs.T
+    month, day = (second, first) if dayfirst else (first, second)
+    if (
+        ((month < 1) | (12 < month) | (day < 1) | (23 < hour) | (59 < minute))
+        .any()
+    ):
+        return None
+    year = np.where(69 <= yy, 1900, 2000) + yy
+    month_start = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    parsed = month_start.astype('datetime64[D]') + (day - 1)
+    # days past the end of the month roll into the next month
+    if (parsed.astype('datetime64[M]') != month_start).any():
+        return None
+    return (
+        parsed.astype('datetime64[ns]')
+        + (hour * 60 + minute).astype('timedelta64[m]'))
+
+
+def _parse_dates(
+    dates: pd.Series
+    , date_format: Optional[str]
+    , dayfirst: bool
+) -> np.ndarray:
+    """Parse date strings, slicing characters for the PVsyst layouts."""
+    _dayfirst = (
+        date_format.startswith('%d')
+        if date_format is not None
+        else dayfirst)
+    if date_format is None or pvsyst_date_formats[_dayfirst] == date_format:
+        parsed = _parse_fixed_dates(dates, dayfirst=_dayfirst)
+        if parsed is not None:
+            return parsed
+    return pd.to_datetime(
+        dates.str.strip()
+        , format=date_format
+        , dayfirst=dayfirst).to_numpy()
+
+
+def _spacing_index(
+    dates: pd.Series
+    , date_format: Optional[str]
+    , dayfirst: bool
+    , name: str
+) -> Optional[pd.DatetimeIndex]:
+    """Build a regular index from the first, second and last rows.
+
+    Returns None unless the last row is consistent with the step between
+    the first two.
+    """
+    n = len(dates)
+    if n < 3:
+        return None
+    try:
+        t0, t1, t_last = _parse_dates(
+            dates.iloc[[0, 1, n - 1]]
+            , date_format=date_format
+            , dayfirst=dayfirst)
+    except (ValueError, TypeError):
+        return None
+    step = t1 - t0
+    if step <= np.timedelta64(0) or t_last - t0 != (n - 1) * step:
+        return None
+    return pd.date_range(
+        t0
+        , periods=n
+        , freq=pd.tseries.frequencies.to_offset(pd.Timedelta(step))
+        , name=name)
+
+
+def _spot_check_index(
+    index: pd.DatetimeIndex
+    , dates: pd.Series
+    , date_format: Optional[str]
+    , dayfirst: bool
+    , n_checks: int = 5
+) -> bool:
+    """Check an arithmetic index against a few of the date strings."""
+    n = len(index)
+    if 0 == n:
+        return True
+    positions = sorted({(n - 1) * k // (n_checks - 1) for k in range(n_checks)})
+    try:
+        parsed = _parse_dates(
+            dates.iloc[positions]
+            , date_format=date_format
+            , dayfirst=dayfirst)
+    except (ValueError, TypeError):
+        return False
+    return bool((parsed == index[positions].to_numpy()).all())
+
+
+def _read_block(
+    f: IO
+    , header: PVsystHeader
+    , value_cols: list[str]
+    , encoding: str
+    , engine: str
+) -> pd.DataFrame:
+    """Read the data rows, dates as strings and values as float64."""
+    date_col = header.columns[0]
+    if 'pyarrow' == engine:
+        # used directly: pandas' pyarrow engine cannot combine names
+        # with usecols
+        import pyarrow.csv
+        table = pyarrow.csv.read_csv(
+            f
+            , read_options=pyarrow.csv.ReadOptions(
+                column_names=header.columns
+                , encoding=encoding)
+            , parse_options=pyarrow.csv.ParseOptions(delimiter=header.sep)
+            , convert_options=pyarrow.csv.ConvertOptions(
+                include_columns=[date_col] + value_cols
+                , column_types={
+                    date_col: pyarrow.string()
+                    , **{name: pyarrow.float64() for name in value_cols}}))
+        return table.to_pandas()
+    dtype: dict[str, str] = {
+        name: 'float64'
+        for name in value_cols}
+    dtype[date_col] = 'str'
+    return pd.read_csv(
+        f
+        , sep=header.sep
+        , header=None
+        , names=header.columns
+        , usecols=[date_col] + value_cols
+        , dtype=dtype
+        , encoding=encoding
+        , engine=engine)
+
+
+def read_pvsyst(
+    con
+    , sep: Optional[str] = None
+    , dayfirst: bool = False
+    , encoding: str = 'windows-1252'
+    , date_format: Optional[str] = None
+    , engine: Optional[str] = None
+    , usecols: Optional[Iterable[str]] = None
+    , cache=None
+) -> tuple[pd.DataFrame, PVsystHeader]:
+    """Read a PVsyst output CSV file and its header metadata.
+
+    The header is parsed once into a PVsystHeader. The time index is
+    built arithmetically from the start and step declared in the header
+    or, failing that, from the spacing of the first two and the last
+    rows, and only a few date strings are parsed to confirm it. If the
+    rows are not regularly spaced all date strings are parsed, by
+    slicing characters when they have the layout PVsyst writes. All
+    value columns are read as float64.
+
+    Parameters
+    ----------
+    con : str, pathlib.Path or file-like
+        File name, 'archive.zip::member' name, or binary handle
+        positioned at the start of the file (e.g. from
+        zipfile.ZipFile.open).
+    sep : str, optional
+        Data and column name separator symbol, by default None (taken
+        from the header).
+    dayfirst : bool, optional
+        Whether to assume DMY (or if False then MDY) dates, by default
+        False. Ignored for data dates if date_format is given.
+    encoding : str, optional
+        Text encoding of the header, by default 'windows-1252'.
+    date_format : str, optional
+        Format of the date column, typically '%m/%d/%y %H:%M'. By
+        default None.
+    engine : str, optional
+        pandas.read_csv engine for the data block, by default None
+        ('pyarrow' if installed, otherwise 'c').
+    usecols : Iterable[str], optional
+        Value columns to read (the date column is always used), e.g.
+        from sim_study.plan_usecols. Other columns are neither parsed
+        nor kept. By default None (all columns).
+    cache : pvsystcache.PVsystCache, optional
+        Cache of parsed files to read through, by default None. Only
+        used when con is a file name.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, PVsystHeader]
+        Simulation results indexed by the date column, and the header.
+    """
+    if cache is not None and isinstance(con, (str, os.PathLike)):
+        return cache.read(
+            con
+            , sep=sep
+            , dayfirst=dayfirst
+            , encoding=encoding
+            , date_format=date_format
+            , engine=engine
+            , usecols=None if usecols is None else list(usecols))
+    _dayfirst = (
+        date_format.startswith('%d')
+        if date_format is not None
+        else dayfirst)
+    f, close = _open(con)
+    try:
+        header = _read_header(
+            f, sep=sep, dayfirst=_dayfirst, encoding=encoding)
+        date_col = header.columns[0]
+        if usecols is None:
+            value_cols = header.columns[1:]
+        else:
+            wanted = set(usecols)
+            unknown_cols = wanted - set(header.columns[1:])
+            if unknown_cols:
+                raise ValueError(
+                    f'Columns {sorted(unknown_cols)} requested in '
+                    'read_pvsyst are not in the file.')
+            value_cols = [
+                name
+                for name in header.columns[1:]
+                if name in wanted]
+        _engine = engine
+        if _engine is None:
+            _engine = (
+                'c'
+                if pyarrow is None or isinstance(f, io.TextIOBase)
+                else 'pyarrow')
+        dta = _read_block(
+            f
+            , header=header
+            , value_cols=value_cols
+            , encoding=encoding
+            , engine=_engine)
+    finally:
+        if close:
+            f.close()
+    dates = dta.pop(date_col)
+    index = header.expected_index(len(dta))
+    if index is None or not _spot_check_index(
+        index, dates, date_format=date_format, dayfirst=dayfirst
+    ):
+        # the header step may be missing or not match the rows
+        index = _spacing_index(
+            dates, date_format=date_format, dayfirst=dayfirst, name=date_col)
+    if index is None or not _spot_check_index(
+        index, dates, date_format=date_format, dayfirst=dayfirst
+    ):
+        index = pd.DatetimeIndex(
+            _parse_dates(dates, date_format=date_format, dayfirst=dayfirst)
+            , name=date_col)
+    dta.index = index
+    return dta, header
 
 
 def read_pvsyst_csv(
@@ -9,11 +578,14 @@ def read_pvsyst_csv(
     , dayfirst=False
     , encoding="ISO8859"
     , date_format=None
+    , usecols=None
+    , cache=None
 ) -> pd.DataFrame:
     """Simple PVsyst simulation data reader.
 
     To get at the simulation results in a PVsyst hourly output file,
-    numerous header lines must be skipped.
+    numerous header lines must be skipped. See read_pvsyst to also
+    obtain the header metadata.
 
     Parameters
     ----------
@@ -27,6 +599,10 @@ def read_pvsyst_csv(
         Encoding to assume for the data file text, by default "ISO8859".
     date_format : str, optional
         Format for date column. Typically '%m/%d/%y %H:%M'. Default None.
+    usecols : Iterable[str], optional
+        Value columns to read, by default None (all). See read_pvsyst.
+    cache : pvsystcache.PVsystCache, optional
+        Cache of parsed files, by default None. See read_pvsyst.
 
     Returns
     -------
@@ -36,16 +612,45 @@ def read_pvsyst_csv(
         `date` column in the file is parsed and set as the index of the
         data frame.
     """
-    hdr_rows = list(range(10))
-    units_row = 11
-    blank_row = 12
-    dta = pd.read_csv(
+    return read_pvsyst(
         full_fname
         , sep=sep
-        , skiprows=hdr_rows + [units_row] + [blank_row]
         , dayfirst=dayfirst
-        , index_col='date'
-        , parse_dates=[0]
         , encoding=encoding
-        , date_format=date_format)
-    return dta
\ No newline at end of file
+        , date_format=date_format
+        , usecols=usecols
+        , cache=cache)[0]
+
+
+def read_pvsyst_zip(
+    archive: str | os.PathLike
+    , pattern: str = hourly_res_pattern
+    , **kwargs
+) -> dict[str, tuple[pd.DataFrame, PVsystHeader]]:
+    """Read all PVsyst output files in a zip archive.
+
+    Members are decompressed as they are read, without extracting them
+    to disk.
+
+    Parameters
+    ----------
+    archive : str or pathlib.Path
+        Zip archive.
+    pattern : str, optional
+        Members to read, see list_zip_members. By default
+        hourly_res_pattern.
+    **kwargs
+        Passed to read_pvsyst (except cache, which needs file names;
+        pass f'{archive}::{member}' names to read_pvsyst instead).
+
+    Returns
+    -------
+    dict[str, tuple[pd.DataFrame, PVsystHeader]]
+        read_pvsyst results keyed by member name.
+    """
+    result = {}
+    with zipfile.ZipFile(archive) as zf:
+        for member in list_zip_members(zf, pattern=pattern):
+            with zf.open(member) as f:
+                result[member] = read_pvsyst(f, **kwargs)
+    return result
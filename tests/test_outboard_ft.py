@@ -0,0 +1,98 @@
+# test_outboard_ft.py
+
+import numpy as np
+import pandas as pd
+import bifi_outboard.outboard_ft as bft
+import pytest
+
+
+@pytest.mark.parametrize(
+    "plane_azimuth,end,expected"
+    , (
+        (0.0, 'east', -90.0)
+        , (0.0, 'west', 90.0)
+        , (90.0, 'east', 0.0)))
+def test_calc_end_azimuth(plane_azimuth, end, expected):
+    assert expected == bft.calc_end_azimuth(plane_azimuth, end=end)
+
+
+def test_calc_end_azimuth_bad_end():
+    with pytest.raises(ValueError, match='calc_end_azimuth'):
+        bft.calc_end_azimuth(0.0, end='north')
+
+
+def test_shade_line_geometry():
+    # psi from the closed form must point at the shadow of the middle
+    # of the row end, found by projecting it along the sun vector
+    height = 1.8
+    offset = 0.7
+    AzSol = np.array([-80.0, -30.0, 0.0, 45.0, 100.0])
+    HSol = np.array([10.0, 35.0, 60.0, 25.0, 5.0])
+    ans = bft.calc_E_rear_ndarray(
+        height=height
+        , offset=offset
+        , tilt=25.0
+        , AzSol=AzSol
+        , HSol=HSol
+        , GlobHor=np.zeros(5)
+        , GlobGnd=np.zeros(5)
+        , BkVFLss=np.zeros(5)
+        , DifSBak=np.zeros(5)
+        , BmIncBk=np.zeros(5)
+        , GCR=0.5
+        , NearAlbedo=0.2
+        , columns=('psi_rad', 'W'))
+    AzSol_rad = np.deg2rad(AzSol)
+    HSol_rad = np.deg2rad(HSol)
+    # outward (east) component of the sun direction
+    s_out = -np.sin(AzSol_rad) * np.cos(HSol_rad)
+    # along-row distance from the sensor to the shade line
+    dist = offset + height * s_out / np.sin(HSol_rad)
+    psi = np.arctan2(height, dist)
+    assert np.allclose(ans['psi_rad'], psi)
+    assert np.allclose(ans['W'], 0.5 * (1 + np.cos(psi)))
+
+
+def test_calc_E_rear():
+    index = pd.date_range('2024-06-01 05:00', periods=4, freq='h')
+    dta = pd.DataFrame(
+        {
+            'AzSol': [-110.0, -90.0, -60.0, -30.0]
+            , 'HSol': [-5.0, 10.0, 30.0, 50.0]
+            , 'GlobHor': [0.0, 100.0, 400.0, 700.0]
+            , 'GlobGnd': [0.0, 60.0, 250.0, 450.0]
+            , 'BkVFLss': [0.0, 5.0, 20.0, 35.0]
+            , 'DifSBak': [0.0, 3.0, 8.0, 10.0]
+            , 'BmIncBk': [0.0, 4.0, 0.0, 0.0]}
+        , index=index)
+    params = {
+        'height': 1.5, 'offset': 0.5, 'tilt': 30.0, 'GCR': 0.4
+        , 'NearAlbedo': 0.25}
+    ans = bft.calc_E_rear(**params, **dta)
+    assert ans.index.equals(index)
+    assert list(ans.columns) == list(bft.E_rear_columns)
+    rot = 0.5 * (1 + np.cos(np.deg2rad(30.0)))
+    A = dta['GlobHor'] * 0.25
+    B = dta['GlobGnd'] * 0.25 / 0.4 - dta['BkVFLss']
+    expected = rot * (B + ans['W'] * (A - B)) + dta['DifSBak'] + dta['BmIncBk']
+    assert np.allclose(ans['E_rear'], expected)
+    night = bft.calc_E_rear(**params, **dta, skip_night=True, night_fill=-1.0)
+    assert (-1.0 == night.iloc[0]).all()
+    pd.testing.assert_frame_equal(night.iloc[1:], ans.iloc[1:])
+    # night rows and out buffers are handled as in outboard_sat
+    arrays = {k: v.to_numpy() for k, v in dta.items()}
+    out = {'E_rear': np.empty(len(index))}
+    ans_out = bft.calc_E_rear_ndarray(
+        **params
+        , **arrays
+        , columns=('W', 'E_rear')
+        , out=out
+        , skip_night=True
+        , night_fill={'E_rear': np.nan})
+    assert ans_out['E_rear'] is out['E_rear']
+    assert np.isnan(ans_out['E_rear'][0]) and 0.0 == ans_out['W'][0]
+    np.testing.assert_allclose(ans_out['E_rear'][1:], ans['E_rear'][1:])
+    ans_out = bft.calc_E_rear_ndarray(
+        **params, **arrays, columns=('E_rear',), out=out)
+    assert ans_out['E_rear'] is out['E_rear']
+    np.testing.assert_allclose(ans_out['E_rear'], ans['E_rear'])
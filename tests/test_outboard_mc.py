@@ -0,0 +1,48 @@
+# test_outboard_mc.py
+
+import numpy as np
+import pandas as pd
+import bifi_outboard.outboard_mc as bmc
+
+
+def test_rotation_factor_without_rows():
+    cases = [
+        bmc.MCCase(30.0, 40.0, PhiAng, 2.0, 1.0, 0.493, 5.0, n_rows=-1)
+        for PhiAng in (-45.0, 0.0, 30.0)]
+    ans = bmc.compare_outboard_sat(
+        bmc.run_monte_carlo(cases, n_rays=100_000, seed=1, max_workers=1))
+    assert np.allclose(ans['F_row'], 0.0)
+    assert np.allclose(ans['F_shaded'], 0.0)
+    se = np.sqrt(ans['rot'] * (1 - ans['rot']) / ans['n_rays'])
+    assert (np.abs(ans['F_ground'] - ans['rot']) < 4 * se + 1e-12).all()
+
+
+def test_flat_full_coverage_matches_closed_form():
+    # flat rows with GCR = 1 and sun toward the equator are the
+    # geometry the closed form W describes exactly
+    grid = pd.DataFrame(
+        [
+            (0.0, HSol, 0.0, height, offset, 1.0, 5.0)
+            for HSol in (20.0, 50.0, 75.0)
+            for height, offset in ((2.0, 1.0), (1.5, 3.0))]
+        , columns=[
+            'AzSol', 'HSol', 'PhiAng', 'height', 'offset', 'GCR', 'pitch'])
+    ans = bmc.compare_outboard_sat(
+        bmc.run_monte_carlo(grid, n_rays=100_000, seed=2, max_workers=1))
+    assert np.allclose(ans['F_sky'], 0.0)
+    assert (
+        np.abs(ans['F_unshaded'] - ans['F_unshaded_closed_form'])
+        < 4 * ans['se_unshaded'] + 2e-3).all()
+
+
+def test_run_monte_carlo_reproducible():
+    cases = [bmc.MCCase(-20.0, 35.0, -25.0, 2.0, 1.0, 0.493, 5.0)]
+    kwargs = {'n_rays': 40_000, 'chunk_rays': 10_000, 'seed': 3}
+    ans1 = bmc.run_monte_carlo(cases, max_workers=1, **kwargs)
+    ans2 = bmc.run_monte_carlo(cases, max_workers=2, **kwargs)
+    pd.testing.assert_frame_equal(ans1, ans2)
+    assert np.allclose(
+        ans1[['F_' + c for c in bmc.mc_classes]].sum(axis=1), 1.0)
+    early = bmc.run_monte_carlo(cases, max_workers=1, target_se=0.01, **kwargs)
+    assert early['converged'].all()
+    assert (early['n_rays'] < kwargs['n_rays']).all()
@@ -1,5 +1,6 @@
 # test_outboard_sat.py
 
+import pathlib
 import numpy as np
 import pandas as pd
 import bifi_outboard.outboard_sat as bsat
@@ -23,3 +24,676 @@ def test_calc_betasun(AzSol, HSol, expected):
         np.deg2rad(AzSol)
         , np.deg2rad(HSol))
     assert np.allclose(np.rad2deg(ans), expected)
+
+
+@pytest.fixture
+def bdta() -> pd.DataFrame:
+    return pd.read_csv(
+        pathlib.Path(__file__).parent / 'data' / 'bdta_aug_qc.csv'
+        , index_col='Timestamp'
+        , parse_dates=True)
+
+
+def calc_E_rear_reference(bdta: pd.DataFrame, height, offset) -> pd.Series:
+    """Series-based chain of the component functions."""
+    phi_rad = np.arccos(bsat.calc_cosphi(
+        np.deg2rad(bdta['AzSol']), np.deg2rad(bdta['HSol'])))
+    W = bsat.calc_W(bsat.calc_psi(phi_rad, height=height, offset=offset))
+    E_gnd_rear = bsat.calc_E_gnd_rear(
+        GlobHor=bdta['GlobHor']
+        , GlobGnd=bdta['GlobGnd']
+        , PhiAng_rad=np.deg2rad(bdta['PhiAng'])
+        , BkVFLss=bdta['BkVFLss']
+        , W=W
+        , albedo_near=0.2
+        , GCR=0.493)
+    return E_gnd_rear + bdta['DifSBak'] + bdta['BmIncBk']
+
+
+def E_rear_inputs(bdta: pd.DataFrame) -> dict:
+    return {
+        k: bdta[k]
+        for k in [
+            'AzSol', 'HSol', 'PhiAng', 'GlobHor', 'GlobGnd'
+            , 'BkVFLss', 'DifSBak', 'BmIncBk']}
+
+
+@pytest.mark.parametrize("offset", (-100.0, 0.0, 1.0))
+def test_calc_E_rear(bdta, offset):
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=offset
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **E_rear_inputs(bdta))
+    assert list(bsat.E_rear_columns) == ans.columns.to_list()
+    assert ans.index.equals(bdta.index)
+    assert np.allclose(
+        calc_E_rear_reference(bdta, height=2.0, offset=offset)
+        , ans['E_rear'])
+
+
+def test_calc_E_rear_ndarray_out(bdta):
+    inputs = {
+        k: v.to_numpy()
+        for k, v in E_rear_inputs(bdta).items()}
+    E_rear = np.full(len(bdta), np.nan)
+    ans = bsat.calc_E_rear_ndarray(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , columns=['W', 'E_rear']
+        , out={'E_rear': E_rear}
+        , **inputs)
+    assert ['W', 'E_rear'] == list(ans.keys())
+    assert ans['E_rear'] is E_rear
+    assert np.allclose(
+        calc_E_rear_reference(bdta, height=2.0, offset=1.0)
+        , E_rear)
+    with pytest.raises(ValueError):
+        bsat.calc_E_rear_ndarray(
+            height=2.0
+            , offset=1.0
+            , GCR=0.493
+            , NearAlbedo=0.2
+            , out={'E_rear': np.empty(3)}
+            , **inputs)
+
+
+def test_calc_E_rear_sweep(bdta):
+    ans = bsat.calc_E_rear_sweep(
+        height=[1.5, 2.0]
+        , offset=[-100.0, 0.5, 1.0]
+        , NearAlbedo=0.2
+        , GCR=0.493
+        , product=True
+        , **E_rear_inputs(bdta))
+    assert (len(bdta), 6) == ans.shape
+    assert list(bsat.sweep_parameter_names) == ans.columns.names
+    for (height, offset, _, _), values in ans.items():
+        assert np.allclose(
+            calc_E_rear_reference(bdta, height=height, offset=offset)
+            , values)
+    ans2 = bsat.calc_E_rear_sweep(
+        height=2.0
+        , offset=[0.5, 1.0]
+        , NearAlbedo=0.2
+        , GCR=0.493
+        , labelled=False
+        , **E_rear_inputs(bdta))
+    assert isinstance(ans2, np.ndarray)
+    assert np.allclose(ans[(2.0, 1.0, 0.2, 0.493)], ans2[:, 1])
+
+
+def test_sun_geometry(bdta):
+    sun = bsat.SunGeometry.from_degrees(bdta['AzSol'], bdta['HSol'])
+    assert np.allclose(
+        bsat.calc_betasun(
+            np.deg2rad(bdta['AzSol']), np.deg2rad(bdta['HSol']))
+        , sun.betasun)
+    inputs = E_rear_inputs(bdta)
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **inputs)
+    inputs_sun = inputs | {'AzSol': None, 'HSol': None}
+    ans_sun = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , sun=sun
+        , **inputs_sun)
+    assert np.allclose(ans, ans_sun)
+    # geometry built for the whole index is aligned to subsets
+    sub = bdta.iloc[::-3]
+    ans_sub = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , sun=sun
+        , **(E_rear_inputs(sub) | {'AzSol': None, 'HSol': None}))
+    assert np.allclose(ans.loc[sub.index], ans_sub)
+    ans_sweep = bsat.calc_E_rear_sweep(
+        height=2.0
+        , offset=[1.0, 2.0]
+        , NearAlbedo=0.2
+        , GCR=0.493
+        , sun=sun
+        , **inputs_sun)
+    assert np.allclose(ans['E_rear'], ans_sweep.iloc[:, 0])
+
+
+def test_calc_E_rear_skip_night(bdta):
+    night = bdta.index[::4]
+    bdta_night = bdta.copy()
+    bdta_night.loc[night, 'HSol'] = -10.0
+    bdta_night.loc[night, ['GlobHor', 'GlobGnd', 'BkVFLss']] = 0.0
+    inputs = E_rear_inputs(bdta_night)
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **inputs)
+    ans_skip = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , skip_night=True
+        , night_fill={'E_rear': 0.0, 'W': np.nan}
+        , **inputs)
+    day = ~bdta.index.isin(night)
+    assert np.allclose(ans.loc[day], ans_skip.loc[day])
+    assert (0.0 == ans_skip.loc[night, 'E_rear']).all()
+    assert ans_skip.loc[night, 'W'].isna().all()
+    ans_sweep = bsat.calc_E_rear_ndarray(
+        height=np.array([[2.0, 2.5]])
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , skip_night=True
+        , sun=bsat.SunGeometry.from_degrees(
+            inputs['AzSol'], inputs['HSol']).as_column()
+        , **{
+            k: v.to_numpy()[:, np.newaxis]
+            for k, v in inputs.items()})['E_rear']
+    assert (len(bdta), 2) == ans_sweep.shape
+    assert np.allclose(ans_skip['E_rear'], ans_sweep[:, 0])
+
+
+def test_view_factor_table(bdta, tmp_path):
+    inputs = E_rear_inputs(bdta)
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **inputs)
+    vf_table = bsat.ViewFactorTable.build(height=2.0, offset=1.0, n_PhiAng=361)
+    bound = vf_table.error_bound
+    assert bound['W'] < 1e-5
+    ans_W = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , vf_table=bsat.ViewFactorTable.build(height=2.0, offset=1.0)
+        , **inputs)
+    assert np.allclose(ans['W'], ans_W['W'], rtol=0.0, atol=bound['W'])
+    assert np.allclose(ans['psi_rad'], ans_W['psi_rad'], atol=1e-3)
+    ans_gnd = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , vf_table=vf_table
+        , **inputs)
+    # errors scale with the unshaded/shaded ground irradiance terms
+    gnd_shd = inputs['GlobGnd'] * 0.2 / 0.493 - inputs['BkVFLss']
+    gnd_diff = inputs['GlobHor'] * 0.2 - gnd_shd
+    assert (
+        (ans['E_rear'] - ans_gnd['E_rear']).abs()
+        <= gnd_diff.abs() * bound['gnd_factor']
+        + gnd_shd.abs() * bound['rotation_factor'] + 1e-9).all()
+    fname = tmp_path / 'vf_table.npz'
+    vf_table.save(fname)
+    vf_loaded = bsat.ViewFactorTable.load(fname)
+    assert vf_loaded.height == vf_table.height
+    assert np.array_equal(vf_loaded.gnd_factor, vf_table.gnd_factor)
+    with pytest.raises(ValueError):
+        bsat.calc_E_rear(
+            height=2.5
+            , offset=1.0
+            , GCR=0.493
+            , NearAlbedo=0.2
+            , vf_table=vf_table
+            , **inputs)
+
+
+def test_calc_psi_derivatives():
+    phi_rad = np.linspace(0.05, np.pi - 0.05, 25)
+    psi, d_height, d_offset = bsat.calc_psi_derivatives(
+        phi_rad, height=2.0, offset=1.0)
+    assert np.allclose(psi, bsat.calc_psi(phi_rad, height=2.0, offset=1.0))
+    eps = 1e-6
+    assert np.allclose(
+        d_height
+        , (
+            bsat.calc_psi(phi_rad, height=2.0 + eps, offset=1.0)
+            - bsat.calc_psi(phi_rad, height=2.0 - eps, offset=1.0)
+        ) / (2 * eps))
+    assert np.allclose(
+        d_offset
+        , (
+            bsat.calc_psi(phi_rad, height=2.0, offset=1.0 + eps)
+            - bsat.calc_psi(phi_rad, height=2.0, offset=1.0 - eps)
+        ) / (2 * eps))
+
+
+def test_fit_E_rear_geometry(bdta):
+    inputs = E_rear_inputs(bdta)
+    truth = pd.DataFrame(
+        {'height': [1.5, 2.0, 2.5], 'offset': [0.5, 1.0, 3.0]}
+        , index=pd.Index(['s1', 's2', 's3'], name='sensor'))
+    meas = pd.DataFrame(
+        {
+            sensor: bsat.calc_E_rear(
+                height=row.height
+                , offset=row.offset
+                , GCR=0.493
+                , NearAlbedo=0.2
+                , **inputs)['E_rear']
+            for sensor, row in truth.iterrows()}
+        , index=bdta.index)
+    meas.columns.name = 'sensor'
+    meas.iloc[::7, 1] = np.nan
+    ans = bsat.fit_E_rear_geometry(
+        meas
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , height=truth['height']
+        , offset=0.0
+        , **inputs)
+    assert ans['converged'].all()
+    assert np.allclose(ans['offset'], truth['offset'], atol=1e-4)
+    assert ans.loc['s2', 'n_obs'] < len(meas)
+    ans_height = bsat.fit_E_rear_geometry(
+        meas
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , height=1.0
+        , offset=truth['offset']
+        , fit='height'
+        , **inputs)
+    assert ans_height['converged'].all()
+    assert np.allclose(ans_height['height'], truth['height'], atol=1e-4)
+    with pytest.raises(ValueError):
+        bsat.fit_E_rear_geometry(
+            meas
+            , GCR=0.493
+            , NearAlbedo=0.2
+            , height=2.0
+            , offset=0.0
+            , fit='GCR'
+            , **inputs)
+
+
+def test_fit_E_rear_geometry_stalled(bdta):
+    inputs = E_rear_inputs(bdta)
+    meas = pd.DataFrame(
+        {
+            sensor: bsat.calc_E_rear(
+                height=2.0
+                , offset=1.0
+                , GCR=0.493
+                , NearAlbedo=0.2
+                , **inputs)['E_rear']
+            for sensor in ['s1', 's2']}
+        , index=bdta.index)
+    # a NaN input where s2 is measured makes every trial step non-finite
+    i_bad = int(np.flatnonzero(np.isfinite(meas['s2'].to_numpy()))[0])
+    meas.iloc[i_bad, 0] = np.nan
+    inputs['GlobHor'] = inputs['GlobHor'].copy()
+    inputs['GlobHor'].iloc[i_bad] = np.nan
+    ans = bsat.fit_E_rear_geometry(
+        meas
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , height=2.0
+        , offset=0.0
+        , **inputs)
+    assert ans.loc['s1', 'converged'] and not ans.loc['s1', 'stalled']
+    assert not ans.loc['s2', 'converged']
+    assert ans.loc['s2', 'stalled']
+    assert ans.loc['s2', 'n_iter'] < 50
+
+
+def test_calc_E_rear_jacobian(bdta):
+    inputs = E_rear_inputs(bdta)
+    params = {'height': 2.0, 'offset': 1.0, 'NearAlbedo': 0.2, 'GCR': 0.493}
+    ans = bsat.calc_E_rear_jacobian(**params, **inputs)
+    assert list(bsat.E_rear_jacobian_columns) == list(ans.columns)
+    assert np.allclose(
+        ans['E_rear']
+        , bsat.calc_E_rear(**params, **inputs)['E_rear'])
+    eps = 1e-6
+    for name, value in params.items():
+        E_rear_hi, E_rear_lo = (
+            bsat.calc_E_rear(**(params | {name: value + d}), **inputs)['E_rear']
+            for d in (eps, -eps))
+        assert np.allclose(
+            ans['dE_rear_d' + name]
+            , (E_rear_hi - E_rear_lo) / (2 * eps)
+            , atol=1e-4)
+
+
+def test_calc_E_rear_chunks(bdta):
+    inputs = E_rear_inputs(bdta)
+    params = {'height': 2.0, 'offset': 1.0, 'NearAlbedo': 0.2, 'GCR': 0.493}
+    ans = bsat.calc_E_rear(**params, **inputs)
+    chunks = (bdta.iloc[i:i + 50] for i in range(0, len(bdta), 50))
+    ans_chunks = pd.concat(list(bsat.calc_E_rear_chunks(chunks, **params)))
+    pd.testing.assert_frame_equal(ans, ans_chunks)
+    array_chunks = (
+        {k: v.to_numpy()[i:i + 50] for k, v in inputs.items()}
+        for i in range(0, len(bdta), 50))
+    ans_arrays = np.concatenate([
+        result['E_rear']
+        for result in bsat.calc_E_rear_chunks(
+            array_chunks, columns=('E_rear',), **params)])
+    assert np.allclose(ans['E_rear'], ans_arrays)
+
+
+def test_psi_method(bdta):
+    phi_rad = np.concatenate([
+        np.geomspace(1e-9, 1e-3, 50)
+        , np.linspace(0.1, np.pi - 0.1, 50)])
+    psi_atan2 = bsat.calc_psi(
+        phi_rad, height=2.0, offset=1.0, psi_method='atan2')
+    with np.errstate(invalid='ignore'):
+        psi_arccos = bsat.calc_psi(
+            phi_rad, height=2.0, offset=1.0, psi_method='arccos')
+    assert not np.isnan(psi_atan2).any()
+    assert np.allclose(psi_atan2[50:], psi_arccos[50:])
+    # psi -> phi as phi -> 0
+    assert np.allclose(psi_atan2[:50], phi_rad[:50], rtol=1e-3, atol=0.0)
+    inputs = E_rear_inputs(bdta)
+    ans = {
+        psi_method: bsat.calc_E_rear(
+            height=2.0
+            , offset=1.0
+            , GCR=0.493
+            , NearAlbedo=0.2
+            , psi_method=psi_method
+            , **inputs)
+        for psi_method in ('atan2', 'arccos')}
+    pd.testing.assert_frame_equal(ans['atan2'], ans['arccos'])
+    with pytest.raises(ValueError):
+        bsat.calc_psi(phi_rad, height=2.0, offset=1.0, psi_method='acos')
+
+
+def test_calc_E_rear_sensors(bdta):
+    inputs = E_rear_inputs(bdta)
+    sensors = pd.DataFrame(
+        {'height': [1.5, 2.0, 2.5], 'offset': [0.5, 1.0, 3.0]
+            , 'NearAlbedo': [0.2, 0.25, 0.3]}
+        , index=pd.Index(['s1', 's2', 's3'], name='sensor'))
+    ans = bsat.calc_E_rear(
+        height=sensors['height']
+        , offset=sensors['offset']
+        , GCR=0.493
+        , NearAlbedo=sensors['NearAlbedo'].to_numpy()
+        , sensors=sensors.index
+        , **inputs)
+    assert ['sensor'] == ans.columns.names[1:]
+    assert (len(bdta), 3 * len(bsat.E_rear_columns)) == ans.shape
+    for sensor, row in sensors.iterrows():
+        ans1 = bsat.calc_E_rear(
+            height=row['height']
+            , offset=row['offset']
+            , GCR=0.493
+            , NearAlbedo=row['NearAlbedo']
+            , **inputs)
+        assert np.allclose(ans1, ans.xs(sensor, axis=1, level='sensor'))
+    ans_list = bsat.calc_E_rear(
+        height=2.0
+        , offset=[0.5, 1.0]
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , sensors=['a', 'b']
+        , **inputs)
+    assert ['a', 'b'] == ans_list['E_rear'].columns.to_list()
+    # terms shared by all sensors, such as phi_rad, can be written
+    for col in bsat.E_rear_columns:
+        assert ans_list[col].to_numpy().flags.writeable
+        ans_list.loc[ans_list.index[0], (col, 'a')] = -1.0
+        assert -1.0 == ans_list[(col, 'a')].iloc[0]
+        assert -1.0 != ans_list[(col, 'b')].iloc[0]
+    with pytest.raises(ValueError, match='sensors'):
+        bsat.calc_E_rear(
+            height=2.0
+            , offset=[0.5, 1.0]
+            , GCR=0.493
+            , NearAlbedo=0.2
+            , **inputs)
+
+
+def test_calc_E_rear_time_aligned_array(bdta):
+    inputs = E_rear_inputs(bdta)
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **inputs)
+    # as long as the timeseries: one value per row, not per sensor
+    ans_array = bsat.calc_E_rear(
+        height=np.full(len(bdta), 2.0)
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **inputs)
+    pd.testing.assert_frame_equal(ans, ans_array)
+    # time-varying albedo alongside per-sensor offsets
+    albedo = pd.Series(np.linspace(0.15, 0.3, len(bdta)), index=bdta.index)
+    ans_sensors = bsat.calc_E_rear(
+        height=2.0
+        , offset=pd.Series([0.5, 1.0], index=['s1', 's2'])
+        , GCR=0.493
+        , NearAlbedo=albedo
+        , **inputs)
+    assert (len(bdta), 2 * len(bsat.E_rear_columns)) == ans_sensors.shape
+    ans1 = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=albedo
+        , **inputs)
+    assert np.allclose(ans1, ans_sensors.xs('s2', axis=1, level='sensor'))
+
+
+def test_monthly_albedo(bdta):
+    inputs = E_rear_inputs(bdta)
+    index = pd.DatetimeIndex(bdta.index)
+    inputs = {k: v.set_axis(index) for k, v in inputs.items()}
+    monthly = bsat.MonthlyValues(np.linspace(0.15, 0.7, 12))
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=monthly
+        , **inputs)
+    albedo = pd.Series(monthly.values[index.month - 1], index=index)
+    ans_series = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=albedo
+        , **inputs)
+    pd.testing.assert_frame_equal(ans, ans_series)
+    for month, df in ans.groupby(index.month):
+        ans_month = bsat.calc_E_rear(
+            height=2.0
+            , offset=1.0
+            , GCR=0.493
+            , NearAlbedo=monthly.values[month - 1]
+            , **{k: v.loc[df.index] for k, v in inputs.items()})
+        assert np.allclose(df, ans_month)
+    with pytest.raises(ValueError):
+        bsat.MonthlyValues(np.ones(11))
+
+
+def test_shade_polygon_fidelity(bdta):
+    # sun due south over a flat tracker: the sawtooth is a straight line
+    HSol = np.linspace(5.0, 85.0, 17)
+    F_unshd, F_shd = bsat.calc_gnd_view_factors(
+        AzSol=np.zeros_like(HSol)
+        , HSol=HSol
+        , PhiAng=0.0
+        , height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , pitch=5.0
+        , quadrature_points=4096)
+    W = bsat.calc_W(bsat.calc_psi(np.deg2rad(HSol), height=2.0, offset=1.0))
+    assert np.allclose(F_unshd, W, atol=2e-3)
+    assert np.allclose(F_unshd + F_shd, 1.0)
+    PhiAng = np.linspace(-60.0, 60.0, 13)
+    F_unshd, F_shd = bsat.calc_gnd_view_factors(
+        AzSol=30.0
+        , HSol=40.0
+        , PhiAng=PhiAng
+        , height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , pitch=5.0)
+    assert np.allclose(
+        F_unshd + F_shd
+        , 0.5 * (1 + np.cos(np.deg2rad(PhiAng)))
+        , atol=5e-3)
+    inputs = E_rear_inputs(bdta)
+    ans = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **inputs)
+    ans_polygon = bsat.calc_E_rear(
+        height=2.0
+        , offset=1.0
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , fidelity='shade_polygon'
+        , pitch=5.0
+        , **inputs)
+    rel = (ans_polygon['E_rear'] - ans['E_rear']) / ans['E_rear']
+    assert np.abs(rel).max() < 0.1
+    assert np.abs(np.median(rel)) < 0.01
+    with pytest.raises(ValueError):
+        bsat.calc_E_rear(
+            height=2.0
+            , offset=1.0
+            , GCR=0.493
+            , NearAlbedo=0.2
+            , fidelity='shade_polygon'
+            , **inputs)
+
+
+def test_slope_ns(bdta):
+    inputs = E_rear_inputs(bdta)
+    params = {'height': 2.0, 'offset': 1.0, 'GCR': 0.493, 'NearAlbedo': 0.2}
+    flat = bsat.calc_E_rear(**params, **inputs)
+    level = bsat.calc_E_rear(**params, **inputs, slope_ns=0.0)
+    pd.testing.assert_frame_equal(flat, level)
+    # same as flat ground with the sun rotated into the level frame
+    slope_rad = np.deg2rad(5.0)
+    AzSol_rad = np.deg2rad(bdta['AzSol'])
+    HSol_rad = np.deg2rad(bdta['HSol'])
+    along = (
+        np.cos(slope_rad) * np.cos(AzSol_rad) * np.cos(HSol_rad)
+        - np.sin(slope_rad) * np.sin(HSol_rad))
+    normal = (
+        np.sin(slope_rad) * np.cos(AzSol_rad) * np.cos(HSol_rad)
+        + np.cos(slope_rad) * np.sin(HSol_rad))
+    west = np.sin(AzSol_rad) * np.cos(HSol_rad)
+    rotated = bsat.calc_E_rear(
+        height=2.0 * np.cos(slope_rad)
+        , offset=1.0 / np.cos(slope_rad)
+        , GCR=0.493
+        , NearAlbedo=0.2
+        , **{
+            **inputs
+            , 'AzSol': np.rad2deg(np.arctan2(west, along))
+            , 'HSol': np.rad2deg(np.arcsin(np.clip(normal, -1.0, 1.0)))})
+    sloped = bsat.calc_E_rear(**params, **inputs, slope_ns=5.0)
+    assert np.allclose(sloped, rotated)
+    assert np.allclose(
+        bsat.calc_psi(
+            sloped['phi_rad'], height=2.0, offset=1.0, slope_ns_rad=slope_rad)
+        , sloped['psi_rad'])
+    # per-block slopes in one broadcast pass
+    blocks = pd.Series([0.0, 5.0], index=['flat', 'north_up'])
+    ans = bsat.calc_E_rear(**params, **inputs, slope_ns=blocks, skip_night=True)
+    assert np.allclose(ans[('E_rear', 'flat')], flat['E_rear'])
+    assert np.allclose(ans[('E_rear', 'north_up')], sloped['E_rear'])
+
+
+def test_numba_backend_matches_numpy(bdta):
+    pytest.importorskip('numba')
+    AzSol_rad = np.deg2rad(bdta['AzSol'])
+    HSol_rad = np.deg2rad(bdta['HSol'])
+    cosphi = {
+        backend: bsat.calc_cosphi(AzSol_rad, HSol_rad, backend=backend)
+        for backend in ('numpy', 'numba')}
+    assert isinstance(cosphi['numba'], pd.Series)
+    assert np.allclose(cosphi['numpy'], cosphi['numba'])
+    phi_rad = np.arccos(cosphi['numpy'])
+    psi = {
+        backend: bsat.calc_psi(phi_rad, height=2.0, offset=1.0, backend=backend)
+        for backend in ('numpy', 'numba')}
+    assert np.allclose(psi['numpy'], psi['numba'])
+    W = {
+        backend: bsat.calc_W(psi['numpy'], backend=backend)
+        for backend in ('numpy', 'numba')}
+    assert np.allclose(W['numpy'], W['numba'])
+    E_gnd_rear = {
+        backend: bsat.calc_E_gnd_rear(
+            GlobHor=bdta['GlobHor']
+            , GlobGnd=bdta['GlobGnd']
+            , PhiAng_rad=np.deg2rad(bdta['PhiAng'])
+            , BkVFLss=bdta['BkVFLss']
+            , W=W['numpy']
+            , albedo_near=0.2
+            , GCR=0.493
+            , backend=backend)
+        for backend in ('numpy', 'numba')}
+    assert np.allclose(E_gnd_rear['numpy'], E_gnd_rear['numba'])
+    sun = bsat.SunGeometry.from_degrees(bdta['AzSol'], bdta['HSol'])
+    for kwargs in ({}, {'sun': sun}, {'skip_night': True}):
+        E_rear = {
+            backend: bsat.calc_E_rear(
+                height=2.0
+                , offset=1.0
+                , GCR=0.493
+                , NearAlbedo=0.2
+                , backend=backend
+                , **E_rear_inputs(bdta)
+                , **kwargs)
+            for backend in ('numpy', 'numba')}
+        assert np.allclose(E_rear['numpy'], E_rear['numba'])
+    sweep = {
+        backend: bsat.calc_E_rear_sweep(
+            height=[1.5, 2.0]
+            , offset=[-100.0, 1.0]
+            , NearAlbedo=[0.2, 0.6]
+            , GCR=0.493
+            , product=True
+            , backend=backend
+            , **E_rear_inputs(bdta))
+        for backend in ('numpy', 'numba')}
+    assert np.allclose(sweep['numpy'], sweep['numba'])
+
+
+def test_psi_arccos_clamp_parity():
+    assert 'numpy' == bsat.resolve_backend()
+    # ratios that round past 1 near phi = 0 are clipped, not NaN
+    phi_rad = np.concatenate([
+        np.geomspace(1e-12, 1e-6, 200)
+        , np.pi - np.geomspace(1e-12, 1e-6, 200)])
+    psi = bsat.calc_psi(
+        phi_rad, height=2.0, offset=1.0, psi_method='arccos'
+        , backend='numpy')
+    assert not np.isnan(psi).any()
+    pytest.importorskip('numba')
+    psi_numba = bsat.calc_psi(
+        phi_rad, height=2.0, offset=1.0, psi_method='arccos'
+        , backend='numba')
+    assert not np.isnan(psi_numba).any()
+    # arccos resolves psi near 0 or pi only to about sqrt(eps)
+    np.testing.assert_allclose(psi, psi_numba, rtol=0.0, atol=1e-7)
@@ -0,0 +1,85 @@
+# test_pvsystcache.py
+
+import os
+import pathlib
+import shutil
+import zipfile
+import pandas as pd
+import pytest
+from bifi_outboard import pvsystcsv
+
+pytest.importorskip('pyarrow')
+from bifi_outboard import pvsystcache  # noqa: E402
+
+
+dta_dir = (
+    pathlib.Path(__file__).parent.parent
+    / 'src' / 'bifi_outboard' / 'captest_prototype' / 'tests' / 'data')
+src_fname = dta_dir / 'Test Bifi SAT_Project_VC1_HourlyRes_0.CSV'
+
+
+@pytest.mark.parametrize('file_format', ['feather', 'parquet'])
+def test_cache_hit_matches_parse(tmp_path, file_format):
+    cache = pvsystcache.PVsystCache(
+        tmp_path / 'cache', file_format=file_format)
+    expected, expected_header = pvsystcsv.read_pvsyst(src_fname)
+    first, _ = cache.read(src_fname)
+    assert 1 == len(cache.entries())
+    ans, header = cache.read(src_fname)
+    pd.testing.assert_frame_equal(ans, expected)
+    pd.testing.assert_frame_equal(first, expected)
+    assert 'h' == ans.index.freqstr
+    assert expected_header == header
+    # reader options are part of the key
+    ans = pvsystcsv.read_pvsyst_csv(
+        src_fname, sep=',', usecols=['GlobHor'], cache=cache)
+    assert ['GlobHor'] == list(ans.columns)
+    assert 2 == len(cache.entries())
+
+
+def test_cache_invalidation(tmp_path):
+    fname = tmp_path / 'sim.CSV'
+    shutil.copy(src_fname, fname)
+    cache = pvsystcache.PVsystCache(tmp_path / 'cache')
+    cache.read(fname)
+    entry = cache.entry_path(fname)
+    assert entry.exists()
+    # a changed file gets a new entry and the stale one is removed
+    st = os.stat(fname)
+    os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cache.read(fname)
+    assert not entry.exists()
+    assert [cache.entry_path(fname)] == list(cache.entries()['path'])
+    assert 1 == cache.invalidate(fname)
+    assert 0 == len(cache.entries())
+
+
+def test_cache_eviction(tmp_path):
+    names = []
+    for k in range(3):
+        names.append(tmp_path / f'sim{k}.CSV')
+        shutil.copy(src_fname, names[-1])
+    cache = pvsystcache.PVsystCache(tmp_path / 'cache')
+    for k, fname in enumerate(names):
+        cache.read(fname)
+        # distinct last use times regardless of clock resolution
+        os.utime(cache.entry_path(fname), ns=(k * 10**9, k * 10**9))
+    size = cache.entries()['bytes'].max()
+    assert 1 == cache.evict(2 * size)
+    assert not cache.entry_path(names[0]).exists()
+    assert 2 == len(cache.entries())
+    capped = pvsystcache.PVsystCache(tmp_path / 'cache', max_bytes=size)
+    capped.read(names[0])
+    assert [capped.entry_path(names[0])] == list(capped.entries()['path'])
+
+
+def test_cache_zip_member(tmp_path):
+    archive = tmp_path / 'sim.zip'
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.write(src_fname, arcname=src_fname.name)
+    fname = f'{archive}::{src_fname.name}'
+    cache = pvsystcache.PVsystCache(tmp_path / 'cache')
+    expected, _ = cache.read(fname)
+    ans, _ = cache.read(fname)
+    pd.testing.assert_frame_equal(ans, expected)
+    assert 1 == cache.invalidate(fname)